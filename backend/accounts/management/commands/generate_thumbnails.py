@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from accounts.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Render missing or stale profile image thumbnails, e.g. after changing PROFILE_THUMBNAIL_SIZES'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render thumbnails that are already up to date')
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(profile_image='').exclude(profile_image__isnull=True)
+        rendered = failed = 0
+        for user_id, image_name, thumbnails in users.values_list('id', 'profile_image', 'profile_thumbnails').iterator():
+            if not options['all'] and (thumbnails or {}).get('source') == image_name:
+                continue
+            try:
+                generate_thumbnails(user_id, image_name)
+                rendered += 1
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'User {user_id}: {error}')
+        self.stdout.write(self.style.SUCCESS(f'Rendered thumbnails for {rendered} users ({failed} failed)'))
@@ -48,6 +48,7 @@ class User(AbstractUser):
     first_name = models.CharField(_('first name'), max_length=150)
     last_name = models.CharField(_('last name'), max_length=150)
     profile_image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    profile_thumbnails = models.JSONField(blank=True, null=True, editable=False)  # Maintained by accounts.thumbnails
     date_of_birth = models.DateField(blank=True, null=True)
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
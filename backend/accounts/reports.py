@@ -0,0 +1,132 @@
+"""
+Progress reports for parents, built from enrollments, submissions and quiz answers.
+
+All of a parent's children are reported on together: each source table is
+aggregated once with ``GROUP BY student``, so the number of queries does not
+depend on how many children, courses or submissions there are. Finished
+reports are cached per child and dropped by ``accounts.signals`` when new
+grades arrive.
+"""
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, FloatField, Q
+from django.db.models.functions import Cast, NullIf
+
+from assignments.models import Submission, StudentAnswer
+from courses.models import Enrollment
+
+REPORT_CACHE_TIMEOUT = 15 * 60
+
+GRADE_BOUNDARIES = [
+    (93, 'A'), (90, 'A-'), (87, 'B+'), (83, 'B'), (80, 'B-'),
+    (77, 'C+'), (73, 'C'), (70, 'C-'), (60, 'D'), (0, 'F'),
+]
+
+
+def report_cache_key(child_id):
+    return f'progress-report:{child_id}'
+
+
+def invalidate_report(child_id):
+    cache.delete(report_cache_key(child_id))
+
+
+def invalidate_reports(child_ids):
+    cache.delete_many([report_cache_key(child_id) for child_id in child_ids])
+
+
+def letter_grade(percentage):
+    if percentage is None:
+        return None
+    for boundary, letter in GRADE_BOUNDARIES:
+        if percentage >= boundary:
+            return letter
+    return 'F'
+
+
+def rounded(value, digits=1):
+    return round(value, digits) if value is not None else None
+
+
+def build_reports(children):
+    """Compute reports for ``children`` (a queryset of users) in a fixed number of queries"""
+    children = list(children.values('id', 'first_name', 'last_name', 'grade_level'))
+    child_ids = [child['id'] for child in children]
+
+    graded = Q(status__in=['graded', 'returned'], score__isnull=False)
+    submissions = {
+        row['student']: row for row in Submission.objects.filter(student__in=child_ids)
+        .values('student')
+        .annotate(
+            total=Count('id'),
+            late=Count('id', filter=Q(submitted_at__gt=F('assignment__due_date'))),
+            graded_count=Count('id', filter=graded),
+            average_percentage=Avg(
+                # Zero-point assignments have no percentage rather than dividing by zero
+                Cast('score', FloatField()) * 100 / NullIf(F('assignment__total_points'), 0), filter=graded
+            ),
+        )
+        .order_by()
+    }
+    enrollments = {
+        row['student']: row for row in Enrollment.objects.filter(student__in=child_ids, is_active=True)
+        .values('student')
+        .annotate(
+            active_courses=Count('id'),
+            completed_courses=Count('id', filter=Q(completion_date__isnull=False)),
+            average_progress=Avg('progress'),
+        )
+        .order_by()
+    }
+    answers = {
+        row['submission__student']: row for row in StudentAnswer.objects.filter(
+            submission__student__in=child_ids, is_correct__isnull=False
+        )
+        .values('submission__student')
+        .annotate(answered=Count('id'), correct=Count('id', filter=Q(is_correct=True)))
+        .order_by()
+    }
+
+    reports = {}
+    for child in children:
+        child_id = child['id']
+        submission_stats = submissions.get(child_id, {})
+        enrollment_stats = enrollments.get(child_id, {})
+        answer_stats = answers.get(child_id, {})
+        total = submission_stats.get('total', 0)
+        answered = answer_stats.get('answered', 0)
+        average = submission_stats.get('average_percentage')
+        reports[child_id] = {
+            'child_id': child_id,
+            'name': f"{child['first_name']} {child['last_name']}",
+            'grade_level': child['grade_level'],
+            'average_score': rounded(average),
+            'average_grade': letter_grade(average),
+            'graded_submissions': submission_stats.get('graded_count', 0),
+            'total_submissions': total,
+            'late_submission_rate': rounded(submission_stats['late'] * 100 / total) if total else None,
+            'quiz_accuracy': rounded(answer_stats['correct'] * 100 / answered) if answered else None,
+            'active_courses': enrollment_stats.get('active_courses', 0),
+            'completed_courses': enrollment_stats.get('completed_courses', 0),
+            'course_progress': rounded(enrollment_stats.get('average_progress')),
+        }
+    return reports
+
+
+def reports_for_parent(parent):
+    """Return reports for every child of ``parent``, recomputing only the ones not cached"""
+    child_ids = list(parent.children.order_by('first_name', 'id').values_list('id', flat=True))
+    cached = cache.get_many([report_cache_key(child_id) for child_id in child_ids])
+    reports = {child_id: cached[report_cache_key(child_id)]
+               for child_id in child_ids if report_cache_key(child_id) in cached}
+
+    missing = [child_id for child_id in child_ids if child_id not in reports]
+    if missing:
+        fresh = build_reports(parent.children.filter(pk__in=missing))
+        cache.set_many(
+            {report_cache_key(child_id): report for child_id, report in fresh.items()},
+            timeout=REPORT_CACHE_TIMEOUT
+        )
+        reports.update(fresh)
+
+    return [reports[child_id] for child_id in child_ids if child_id in reports]
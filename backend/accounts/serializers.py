@@ -3,22 +3,33 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.validators import UniqueValidator
 
+from .thumbnails import thumbnail_urls
+
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class ProfileThumbnailsMixin(serializers.Serializer):
+    """Adds ``profile_thumbnails``: small/medium image URLs, the original until they are rendered"""
+    profile_thumbnails = serializers.SerializerMethodField()
+    
+    def get_profile_thumbnails(self, obj):
+        # Serializers built outside a view may have been given context=None
+        return thumbnail_urls(obj, (self.context or {}).get('request'))
+
+
+class UserSerializer(ProfileThumbnailsMixin, serializers.ModelSerializer):
     """Serializer for the User model"""
     class Meta:
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'role',
-            'profile_image', 'date_of_birth', 'phone_number', 
+            'profile_image', 'profile_thumbnails', 'date_of_birth', 'phone_number', 
             'bio', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(ProfileThumbnailsMixin, serializers.ModelSerializer):
     """Detailed serializer for user profiles"""
     full_name = serializers.SerializerMethodField()
     
@@ -26,7 +37,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name', 'role',
-            'profile_image', 'date_of_birth', 'phone_number', 'bio',
+            'profile_image', 'profile_thumbnails', 'date_of_birth', 'phone_number', 'bio',
             'subject_specialization', 'years_of_experience', 'grade_level',
             'created_at', 'updated_at', 'last_login_at'
         ]
@@ -83,7 +94,7 @@ class ChangePasswordSerializer(serializers.Serializer):
         return attrs
 
 
-class TeacherSerializer(serializers.ModelSerializer):
+class TeacherSerializer(ProfileThumbnailsMixin, serializers.ModelSerializer):
     """Serializer for teacher-specific data"""
     full_name = serializers.SerializerMethodField()
     
@@ -91,14 +102,14 @@ class TeacherSerializer(serializers.ModelSerializer):
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name',
-            'profile_image', 'subject_specialization', 'years_of_experience', 'bio'
+            'profile_image', 'profile_thumbnails', 'subject_specialization', 'years_of_experience', 'bio'
         ]
     
     def get_full_name(self, obj):
         return obj.full_name
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(ProfileThumbnailsMixin, serializers.ModelSerializer):
     """Serializer for student-specific data"""
     full_name = serializers.SerializerMethodField()
     
@@ -106,14 +117,14 @@ class StudentSerializer(serializers.ModelSerializer):
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name',
-            'profile_image', 'grade_level'
+            'profile_image', 'profile_thumbnails', 'grade_level'
         ]
     
     def get_full_name(self, obj):
         return obj.full_name
 
 
-class ParentSerializer(serializers.ModelSerializer):
+class ParentSerializer(ProfileThumbnailsMixin, serializers.ModelSerializer):
     """Serializer for parent-specific data"""
     full_name = serializers.SerializerMethodField()
     children = StudentSerializer(many=True, read_only=True)
@@ -122,7 +133,7 @@ class ParentSerializer(serializers.ModelSerializer):
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name',
-            'profile_image', 'children'
+            'profile_image', 'profile_thumbnails', 'children'
         ]
     
     def get_full_name(self, obj):
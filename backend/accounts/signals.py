@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from assignments.models import Submission
+from assignments.signals import submissions_changed
+from courses.models import Enrollment
+from courses.progress import progress_changed
+from .models import User
+from .reports import invalidate_report, invalidate_reports
+from .thumbnails import schedule_thumbnails
+
+
+@receiver([post_save, post_delete], sender=Submission)
+def invalidate_report_on_submission(sender, instance, **kwargs):
+    """New submissions and grades change a child's report"""
+    invalidate_report(instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def invalidate_report_on_enrollment(sender, instance, **kwargs):
+    invalidate_report(instance.student_id)
+
+
+@receiver(submissions_changed)
+@receiver(progress_changed)
+def invalidate_reports_on_bulk_change(sender, student_ids, **kwargs):
+    invalidate_reports(student_ids)
+
+
+@receiver(post_save, sender=User)
+def schedule_profile_thumbnails(sender, instance, **kwargs):
+    """A new profile image, from any code path, gets its thumbnails rendered off-request"""
+    if instance.profile_image and (instance.profile_thumbnails or {}).get('source') != instance.profile_image.name:
+        schedule_thumbnails(instance)
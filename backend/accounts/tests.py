@@ -1,3 +1,190 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from assignments.models import Assignment, Submission
+from courses.models import Subject, Course, Enrollment, Module, Lesson
+from courses.progress import complete_lesson
+from .serializers import TeacherSerializer
+
+User = get_user_model()
+
+
+class ProgressReportTests(TestCase):
+    """Parent progress reports are aggregated from real data and cached per child"""
+
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(
+            email='parent@example.com', password='pass', first_name='Pat', last_name='Parent',
+            role='parent', username='parent'
+        )
+        self.teacher = User.objects.create_user(
+            email='teacher@example.com', password='pass', first_name='Ada', last_name='Lovelace',
+            role='teacher', username='teacher'
+        )
+        subject = Subject.objects.create(name='Computing', category='Science')
+        self.course = Course.objects.create(
+            name='Intro', code='CS101', description='...', subject=subject, teacher=self.teacher
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.parent)
+
+    def add_child(self, index, score):
+        child = User.objects.create_user(
+            email=f'child{index}@example.com', password='pass', first_name=f'Kid{index}', last_name='Parent',
+            role='student', username=f'child{index}'
+        )
+        self.parent.children.add(child)
+        Enrollment.objects.create(student=child, course=self.course, progress=50)
+        assignment = Assignment.objects.create(
+            course=self.course, title=f'Essay {index}', description='...', created_by=self.teacher,
+            due_date=timezone.now() - timedelta(days=1), total_points=50
+        )
+        Submission.objects.create(assignment=assignment, student=child, score=score, status='graded')
+        return child
+
+    def get_reports(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('progress_reports'))
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_reports_use_constant_queries(self):
+        self.add_child(0, 45)
+        small, _ = self.get_reports()
+        cache.clear()
+        for index in range(1, 5):
+            self.add_child(index, 40)
+        large, reports = self.get_reports()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(reports), 5)
+        first = next(report for report in reports if report['name'] == 'Kid0 Parent')
+        self.assertEqual(first['average_score'], 90.0)
+        self.assertEqual(first['average_grade'], 'A-')
+        self.assertEqual(first['late_submission_rate'], 100.0)
+        self.assertEqual(first['course_progress'], 50.0)
+
+    def test_new_grades_invalidate_the_cached_report(self):
+        child = self.add_child(0, 45)
+        self.get_reports()
+        cached, _ = self.get_reports()
+
+        submission = Submission.objects.get(student=child)
+        submission.score = 25
+        submission.save()
+
+        refreshed, reports = self.get_reports()
+        self.assertLess(cached, refreshed)
+        self.assertEqual(reports[0]['average_score'], 50.0)
+
+    def test_lesson_completions_invalidate_the_cached_report(self):
+        child = self.add_child(0, 45)
+        module = Module.objects.create(course=self.course, title='Module', order=0)
+        lessons = [Lesson.objects.create(module=module, title=f'Lesson {i}', content='...', order=i) for i in range(4)]
+        self.get_reports()
+
+        complete_lesson(Enrollment.objects.get(student=child), lessons[0])
+
+        _, reports = self.get_reports()
+        self.assertEqual(reports[0]['course_progress'], 25.0)
+
+    def test_zero_point_assignments_are_left_out_of_the_average(self):
+        child = self.add_child(0, 45)
+        ungraded = Assignment.objects.create(
+            course=self.course, title='Practice', description='...', created_by=self.teacher,
+            due_date=timezone.now(), total_points=0
+        )
+        Submission.objects.create(assignment=ungraded, student=child, score=0, status='graded')
+
+        _, reports = self.get_reports()
+        self.assertEqual(reports[0]['average_score'], 90.0)
+
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='thumbnail-tests-')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BACKGROUND_WORKERS=0)
+class ProfileThumbnailTests(TestCase):
+    """Profile images get thumbnails after the upload commits; until then the original is served"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            email='teacher@example.com', password='pass', first_name='Ada', last_name='Lovelace',
+            role='teacher', username='teacher'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def upload(self, color='red'):
+        buffer = BytesIO()
+        Image.new('RGB', (640, 480), color).save(buffer, 'PNG')
+        image = SimpleUploadedFile('avatar.png', buffer.getvalue(), content_type='image/png')
+        return self.client.post(reverse('profile_image'), {'profile_image': image}, format='multipart')
+
+    def test_thumbnails_are_rendered_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.upload()
+        # Nothing rendered yet, so every size points at the original
+        self.assertTrue(all(url.endswith(response.data['image_url']) for url in response.data['thumbnails'].values()))
+
+        with mock.patch('accounts.thumbnails.bump_teacher_versions') as bump:
+            for callback in callbacks:
+                callback()
+        # Cached course trees embedding the teacher pick up the thumbnails
+        bump.assert_called_once_with(self.teacher.id)
+        self.teacher.refresh_from_db()
+        data = TeacherSerializer(self.teacher).data
+        self.assertNotEqual(data['profile_thumbnails']['small'], data['profile_image'])
+        for label, size in (('small', 64), ('medium', 256)):
+            with self.teacher.profile_image.storage.open(self.teacher.profile_thumbnails[label]) as thumb:
+                image = Image.open(thumb)
+                self.assertEqual(image.size, (size, size))
+
+    def test_replaced_image_drops_old_thumbnails(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload()
+        self.teacher.refresh_from_db()
+        old = self.teacher.profile_thumbnails
+        storage = self.teacher.profile_image.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload('blue')
+        self.teacher.refresh_from_db()
+        self.assertEqual(self.teacher.profile_thumbnails['source'], self.teacher.profile_image.name)
+        self.assertFalse(storage.exists(old['small']))
+
+    def test_streamed_course_list_includes_teacher_thumbnails(self):
+        Course.objects.create(
+            name='Art', code='ART1', description='', subject=Subject.objects.create(name='Art', category='Arts'),
+            teacher=self.teacher
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload()
+        self.teacher.refresh_from_db()
+
+        response = self.client.get(reverse('course-list'), {'stream': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        thumbnails = rows[0]['teacher']['profile_thumbnails']
+        self.assertTrue(thumbnails['small'].endswith(self.teacher.profile_thumbnails['small']))
+        self.assertTrue(thumbnails['small'].startswith('http://testserver/'))
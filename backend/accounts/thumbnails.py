@@ -0,0 +1,107 @@
+"""
+Fixed-size thumbnails of profile images.
+
+Uploading a profile image schedules ``generate_thumbnails`` on the worker
+pool; it writes one square WebP (JPEG where Pillow lacks WebP) per size in
+``PROFILE_THUMBNAIL_SIZES`` and records them in ``User.profile_thumbnails``
+along with the image they were made from. Until that record matches the
+current image, ``thumbnail_urls`` falls back to the original.
+"""
+
+import hashlib
+import os
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from courses.cache import bump_teacher_versions
+from techiekraft.workers import submit_on_commit
+
+THUMBNAIL_DIR = 'profile_images/thumbs'
+
+# (user id, image name) pairs queued or rendering, so repeated saves don't queue duplicates
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def thumbnail_format():
+    return ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+
+
+def render_thumbnail(image, size):
+    thumb = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    image_format, _ = thumbnail_format()
+    if image_format == 'JPEG' and thumb.mode not in ('RGB', 'L'):
+        thumb = thumb.convert('RGB')
+    buffer = BytesIO()
+    thumb.save(buffer, image_format, quality=settings.PROFILE_THUMBNAIL_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generate_thumbnails(user_id, image_name):
+    """Render every thumbnail size of ``image_name`` and record them on the user"""
+    from .models import User
+
+    try:
+        render_and_record(User, user_id, image_name)
+    finally:
+        with _pending_lock:
+            _pending.discard((user_id, image_name))
+
+
+def render_and_record(User, user_id, image_name):
+    _, extension = thumbnail_format()
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    thumbnails = {'source': image_name}
+    with default_storage.open(image_name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    for label, size in settings.PROFILE_THUMBNAIL_SIZES.items():
+        data = render_thumbnail(image, size)
+        # A content hash in the name keeps browsers from showing a cached old avatar
+        name = f'{THUMBNAIL_DIR}/{user_id}/{stem}-{size}-{hashlib.sha1(data).hexdigest()[:8]}.{extension}'
+        thumbnails[label] = default_storage.save(name, ContentFile(data))
+
+    previous = User.objects.filter(pk=user_id).values_list('profile_thumbnails', flat=True).first()
+    # Only record them if the image was not replaced meanwhile; update() leaves updated_at alone
+    if User.objects.filter(pk=user_id, profile_image=image_name).update(profile_thumbnails=thumbnails):
+        # update() sends no post_save, so cached course trees showing this teacher are invalidated here
+        bump_teacher_versions(user_id)
+        if previous and previous.get('source') != image_name:
+            delete_thumbnails(previous)
+    else:
+        delete_thumbnails(thumbnails)
+
+
+def schedule_thumbnails(user):
+    key = (user.id, user.profile_image.name)
+    with _pending_lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+    submit_on_commit(generate_thumbnails, *key)
+
+
+def delete_thumbnails(thumbnails):
+    for label, name in (thumbnails or {}).items():
+        if label != 'source':
+            default_storage.delete(name)
+
+
+def thumbnail_urls(user, request=None):
+    """``{size: url}`` for the user's thumbnails, or the original image until they exist"""
+    if not user.profile_image:
+        return None
+    thumbnails = user.profile_thumbnails or {}
+    ready = thumbnails.get('source') == user.profile_image.name
+    urls = {
+        label: default_storage.url(thumbnails[label]) if ready and label in thumbnails else user.profile_image.url
+        for label in settings.PROFILE_THUMBNAIL_SIZES
+    }
+    if request is not None:
+        urls = {label: request.build_absolute_uri(url) for label, url in urls.items()}
+    return urls
@@ -2,7 +2,7 @@ from django.urls import path
 from .views import (
     RegisterView, LoginView, LogoutView, SessionView,
     UserProfileView, ChangePasswordView, TeacherListView,
-    StudentListView
+    StudentListView, get_children, get_progress_reports
 )
 
 urlpatterns = [
@@ -15,4 +15,6 @@ urlpatterns = [
     path('password/', ChangePasswordView.as_view(), name='change_password'),
     path('teachers/', TeacherListView.as_view(), name='teacher_list'),
     path('students/', StudentListView.as_view(), name='student_list'),
+    path('children/', get_children, name='children'),
+    path('progress-reports/', get_progress_reports, name='progress_reports'),
 ]
\ No newline at end of file
@@ -12,6 +12,7 @@ from .serializers import (
     LoginSerializer, ChangePasswordSerializer, TeacherSerializer,
     StudentSerializer, ParentSerializer
 )
+from .thumbnails import delete_thumbnails, thumbnail_urls
 
 User = get_user_model()
 
@@ -113,16 +114,20 @@ class UserProfileView(APIView):
             )
             
         user = request.user
-        # Delete old image if it exists to save space
+        # Delete old image and its thumbnails if they exist to save space
         if user.profile_image:
             user.profile_image.delete(save=False)
+        delete_thumbnails(user.profile_thumbnails)
             
         user.profile_image = image
+        user.profile_thumbnails = None
+        # Saving schedules the thumbnails on a background worker (see accounts.signals)
         user.save()
         
         return Response({
             'message': 'Profile image updated successfully',
-            'image_url': user.profile_image.url if user.profile_image else None
+            'image_url': user.profile_image.url if user.profile_image else None,
+            'thumbnails': thumbnail_urls(user, request),
         })
 
 
@@ -182,6 +187,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import User
+from .reports import reports_for_parent
 from .serializers import UserSerializer
 
 @api_view(['GET'])
@@ -202,16 +208,4 @@ def get_progress_reports(request):
         return Response({'error': 'Only parents can access this endpoint'}, 
                        status=status.HTTP_403_FORBIDDEN)
 
-    children = request.user.children.all()
-    reports = []
-    for child in children:
-        # Get grades, attendance, and other metrics for each child
-        reports.append({
-            'child_id': child.id,
-            'name': child.full_name,
-            'grade_level': child.grade_level,
-            'attendance': '95%',  # This would come from an attendance model
-            'average_grade': 'A-', # This would come from a grades model
-            'behavior': 'Excellent'
-        })
-    return Response(reports)
\ No newline at end of file
+    return Response(reports_for_parent(request.user))
@@ -0,0 +1,113 @@
+"""
+Score statistics for a single assignment.
+
+Counts and late rates are aggregated in SQL; the score distribution comes
+from one ``values_list`` fetch of the graded scores, which is all the data
+a median, percentiles and a histogram need. Results are cached until the
+next grading event for the assignment (see ``assignments.signals``).
+"""
+
+import statistics
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Q
+
+from .models import Submission, StudentAnswer
+
+ANALYTICS_CACHE_TIMEOUT = 60 * 60
+HISTOGRAM_BUCKETS = 10
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def analytics_cache_key(assignment_id):
+    return f'assignment-analytics:{assignment_id}'
+
+
+def invalidate_analytics(assignment_ids):
+    cache.delete_many([analytics_cache_key(assignment_id) for assignment_id in assignment_ids])
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def histogram(scores, total_points):
+    """Bucket scores into equal-width bands of the assignment's points"""
+    counts = [0] * HISTOGRAM_BUCKETS
+    width = total_points / HISTOGRAM_BUCKETS if total_points else 1
+    for score in scores:
+        counts[max(0, min(int(score / width), HISTOGRAM_BUCKETS - 1))] += 1
+    return [
+        {'min': round(i * width, 2), 'max': round((i + 1) * width, 2), 'count': count}
+        for i, count in enumerate(counts)
+    ]
+
+
+def rounded(value, digits=2):
+    return round(value, digits) if value is not None else None
+
+
+def build_analytics(assignment):
+    submissions = Submission.objects.filter(assignment=assignment)
+    totals = submissions.aggregate(
+        submitted=Count('id'),
+        late=Count('id', filter=Q(submitted_at__gt=F('assignment__due_date'))),
+        graded=Count('id', filter=Q(score__isnull=False)),
+    )
+    scores = sorted(float(score) for score in submissions.filter(score__isnull=False).values_list('score', flat=True))
+
+    questions = list(
+        StudentAnswer.objects.filter(submission__assignment=assignment, is_correct__isnull=False)
+        .values('question_id', 'question__order', 'question__text', 'question__points')
+        .annotate(
+            answered=Count('id'),
+            correct=Count('id', filter=Q(is_correct=True)),
+            average_points=Avg('points_earned'),
+        )
+        .order_by('question__order', 'question_id')
+    )
+
+    return {
+        'assignment_id': assignment.id,
+        'total_points': assignment.total_points,
+        'submissions': totals['submitted'],
+        'graded': totals['graded'],
+        'late_rate': rounded(totals['late'] * 100 / totals['submitted']) if totals['submitted'] else None,
+        'scores': {
+            'mean': rounded(statistics.fmean(scores)) if scores else None,
+            'median': rounded(statistics.median(scores)) if scores else None,
+            'stdev': rounded(statistics.pstdev(scores)) if scores else None,
+            'min': scores[0] if scores else None,
+            'max': scores[-1] if scores else None,
+            'percentiles': {str(pct): rounded(percentile(scores, pct)) for pct in PERCENTILES},
+            'histogram': histogram(scores, assignment.total_points),
+        },
+        'questions': [
+            {
+                'question_id': row['question_id'],
+                'order': row['question__order'],
+                'text': row['question__text'],
+                'points': row['question__points'],
+                'answered': row['answered'],
+                # Share of students who got it right; lower means harder
+                'difficulty': rounded(row['correct'] / row['answered'], 3),
+                'average_points': rounded(float(row['average_points'])) if row['average_points'] is not None else None,
+            }
+            for row in questions
+        ],
+    }
+
+
+def get_analytics(assignment):
+    key = analytics_cache_key(assignment.id)
+    data = cache.get(key)
+    if data is None:
+        data = build_analytics(assignment)
+        cache.set(key, data, timeout=ANALYTICS_CACHE_TIMEOUT)
+    return data
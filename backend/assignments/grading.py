@@ -0,0 +1,139 @@
+"""
+Automatic grading of quiz submissions.
+
+A quiz's answer key (question points and correct answer ids) is loaded once
+into a lookup table, every ``StudentAnswer`` of the submissions being graded
+is fetched in one query and scored against it in memory, and the results are
+written back with ``bulk_update``. Grading a whole class therefore costs a
+handful of queries, not one per answer.
+"""
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Submission, Question, Answer, StudentAnswer
+from .signals import submissions_changed
+
+# Question types scored by comparing the selected answer with the correct ones
+CHOICE_TYPES = {'multiple_choice', 'true_false'}
+# Question types scored by comparing free text with the correct answers' text
+TEXT_TYPES = {'short_answer'}
+
+BATCH_SIZE = 1000
+TWO_PLACES = Decimal('0.01')
+
+
+def normalize_text(text):
+    return ' '.join((text or '').split()).casefold()
+
+
+class AnswerKey:
+    """Correct answers and points for every question of a quiz"""
+
+    def __init__(self, quiz_id):
+        self.points = {}
+        self.question_types = {}
+        for question_id, question_type, points in Question.objects.filter(quiz_id=quiz_id).values_list(
+            'id', 'question_type', 'points'
+        ):
+            self.points[question_id] = points
+            self.question_types[question_id] = question_type
+
+        self.correct_ids = defaultdict(set)
+        self.correct_texts = defaultdict(set)
+        for question_id, answer_id, text in Answer.objects.filter(
+            question__quiz_id=quiz_id, is_correct=True
+        ).values_list('question_id', 'id', 'text'):
+            self.correct_ids[question_id].add(answer_id)
+            self.correct_texts[question_id].add(normalize_text(text))
+
+        self.total_points = sum(self.points.values())
+
+    def is_auto_gradable(self, question_id):
+        question_type = self.question_types.get(question_id)
+        if question_type in CHOICE_TYPES:
+            return True
+        return question_type in TEXT_TYPES and bool(self.correct_texts[question_id])
+
+    def score(self, answer):
+        """Return ``(is_correct, points_earned)`` for a StudentAnswer, or None if it needs a human"""
+        question_id = answer.question_id
+        if not self.is_auto_gradable(question_id):
+            return None
+        if self.question_types[question_id] in CHOICE_TYPES:
+            correct = answer.selected_answer_id in self.correct_ids[question_id]
+        else:
+            correct = normalize_text(answer.text_answer) in self.correct_texts[question_id]
+        return correct, Decimal(self.points[question_id] if correct else 0)
+
+
+def grade_submissions(submissions):
+    """
+    Auto-grade every StudentAnswer of ``submissions`` (a queryset of quiz submissions).
+
+    Submissions whose answers are all auto-gradable get a score scaled to the
+    assignment's ``total_points`` and the ``graded`` status; the rest keep
+    their status so a teacher can finish them. Returns the number of
+    submissions fully graded.
+    """
+    submissions = list(
+        submissions.filter(assignment__quiz__isnull=False)
+        .select_related('assignment__quiz')
+        .only('id', 'status', 'score', 'graded_at', 'student_id',
+              'assignment__id', 'assignment__total_points', 'assignment__quiz__id')
+    )
+    if not submissions:
+        return 0
+
+    keys = {}
+    for submission in submissions:
+        quiz_id = submission.assignment.quiz.id
+        if quiz_id not in keys:
+            keys[quiz_id] = AnswerKey(quiz_id)
+
+    answers_by_submission = defaultdict(list)
+    for answer in StudentAnswer.objects.filter(submission__in=[s.id for s in submissions]).only(
+        'id', 'submission_id', 'question_id', 'selected_answer_id', 'text_answer', 'is_correct', 'points_earned'
+    ):
+        answers_by_submission[answer.submission_id].append(answer)
+
+    now = timezone.now()
+    changed_answers = []
+    graded = []
+    for submission in submissions:
+        key = keys[submission.assignment.quiz.id]
+        earned = Decimal(0)
+        pending = False
+        for answer in answers_by_submission[submission.id]:
+            result = key.score(answer)
+            if result is None:
+                pending = True
+                continue
+            answer.is_correct, answer.points_earned = result
+            earned += answer.points_earned
+            changed_answers.append(answer)
+
+        if pending:
+            continue
+        total = key.total_points
+        score = earned * submission.assignment.total_points / total if total else Decimal(0)
+        submission.score = score.quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+        submission.status = 'graded'
+        submission.graded_at = now
+        graded.append(submission)
+
+    with transaction.atomic():
+        StudentAnswer.objects.bulk_update(changed_answers, ['is_correct', 'points_earned'], batch_size=BATCH_SIZE)
+        Submission.objects.bulk_update(graded, ['score', 'status', 'graded_at'], batch_size=BATCH_SIZE)
+
+    if graded:
+        # bulk_update sends no post_save, so tell cache owners explicitly
+        submissions_changed.send(
+            sender=Submission,
+            assignment_ids={s.assignment.id for s in graded},
+            student_ids={s.student_id for s in graded},
+        )
+    return len(graded)
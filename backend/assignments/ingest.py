@@ -0,0 +1,68 @@
+"""
+Bulk ingestion of submissions.
+
+``bulk_create`` bypasses ``Submission.save``, so this module applies the same
+late rule set-wise: the due dates of every assignment involved are fetched in
+one query and each new submission is stamped before the insert.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Assignment, Submission, SubmissionFile
+from .signals import submissions_changed
+
+BATCH_SIZE = 1000
+
+
+def ingest_submissions(rows):
+    """
+    Create one submission per row with a constant number of queries.
+
+    Each row is a dict with ``assignment_id``, ``student_id`` and optionally
+    ``text_response``, ``attempt_number`` and ``files`` (a list of
+    ``(title, file)`` pairs). Returns the created submissions in row order.
+    """
+    now = timezone.now()
+    due_dates = dict(
+        Assignment.objects.filter(pk__in={row['assignment_id'] for row in rows}).values_list('id', 'due_date')
+    )
+
+    submissions = []
+    for row in rows:
+        due_date = due_dates.get(row['assignment_id'])
+        if due_date is None:
+            raise Assignment.DoesNotExist(f"Assignment {row['assignment_id']} does not exist")
+        submissions.append(Submission(
+            assignment_id=row['assignment_id'],
+            student_id=row['student_id'],
+            text_response=row.get('text_response'),
+            attempt_number=row.get('attempt_number', 1),
+            status='late' if now > due_date else 'submitted',
+        ))
+
+    with transaction.atomic():
+        submissions = Submission.objects.bulk_create(submissions, batch_size=BATCH_SIZE)
+
+        files = [
+            SubmissionFile(submission=submission, title=title, file=file)
+            for submission, row in zip(submissions, rows)
+            for title, file in row.get('files', ())
+        ]
+        SubmissionFile.objects.bulk_create(files, batch_size=BATCH_SIZE)
+
+    submissions_changed.send(
+        sender=Submission,
+        assignment_ids=set(due_dates),
+        student_ids={row['student_id'] for row in rows},
+    )
+
+    return submissions
+
+
+def stamp_late_submissions(submissions=None):
+    """Mark every still-``submitted`` submission past its due date as late with one UPDATE"""
+    if submissions is None:
+        submissions = Submission.objects.all()
+    return submissions.filter(status='submitted', submitted_at__gt=F('assignment__due_date')).update(status='late')
@@ -0,0 +1,71 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from assignments.ingest import ingest_submissions
+from assignments.models import Assignment, Submission
+from courses.models import Subject, Course
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare per-row Submission.save with bulk ingestion (all data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000])
+        parser.add_argument('--assignments', type=int, default=10)
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            with transaction.atomic():
+                rows = self.populate(size, options['assignments'])
+
+                start = time.perf_counter()
+                for row in rows:
+                    Submission.objects.create(assignment_id=row['assignment_id'], student_id=row['student_id'])
+                per_row = time.perf_counter() - start
+
+                # Reuse the same students with a second attempt number
+                for row in rows:
+                    row['attempt_number'] = 2
+                start = time.perf_counter()
+                ingest_submissions(rows)
+                bulk = time.perf_counter() - start
+
+                self.stdout.write(
+                    f'{size:>7} submissions  save() {size / per_row:10.0f}/s   '
+                    f'ingest {size / bulk:10.0f}/s   ({per_row / bulk:.1f}x)'
+                )
+                transaction.set_rollback(True)
+
+    def populate(self, size, assignment_count):
+        teacher = User.objects.create_user(
+            email=f'bench-teacher-{size}@example.com', first_name='Bench', last_name='Teacher', role='teacher'
+        )
+        subject = Subject.objects.create(name='Benchmark', category='Benchmark')
+        course = Course.objects.create(
+            name='Benchmark', code=f'BENCH-{size}', description='...', subject=subject, teacher=teacher
+        )
+        now = timezone.now()
+        assignments = Assignment.objects.bulk_create([
+            Assignment(
+                course=course, title=f'Assignment {i}', description='...', created_by=teacher,
+                # Half the assignments are already past due
+                due_date=now + timedelta(days=1 if i % 2 else -1),
+            )
+            for i in range(assignment_count)
+        ])
+        students = User.objects.bulk_create([
+            User(email=f'bench-{size}-{i}@example.com', username=f'bench-{size}-{i}',
+                 first_name='Bench', last_name=str(i), role='student')
+            for i in range(size)
+        ], batch_size=1000)
+        return [
+            {'assignment_id': assignments[i % assignment_count].pk, 'student_id': student.pk}
+            for i, student in enumerate(students)
+        ]
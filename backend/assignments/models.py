@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from uploads.storage import attachment_storage
 
 
 class Assignment(models.Model):
@@ -45,7 +47,7 @@ class AssignmentFile(models.Model):
     """Files associated with assignments"""
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='files')
     title = models.CharField(max_length=100)
-    file = models.FileField(upload_to='assignment_files/')
+    file = models.FileField(upload_to='assignment_files/', storage=attachment_storage)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -88,9 +90,20 @@ class Submission(models.Model):
         return self.status == 'graded' or self.status == 'returned'
     
     def save(self, *args, **kwargs):
-        if self.is_late and self.status == 'submitted':
-            self.status = 'late'
+        # Lateness is decided once, when the submission is first stored; later
+        # saves (grading, feedback) never need the assignment's due date.
+        if self._state.adding and self.status == 'submitted':
+            if self.submitted_at is None:
+                self.submitted_at = timezone.now()
+            if self.submitted_at > self.get_due_date():
+                self.status = 'late'
         super().save(*args, **kwargs)
+    
+    def get_due_date(self):
+        """Due date of the assignment, without loading the whole assignment row"""
+        if Submission.assignment.is_cached(self):
+            return self.assignment.due_date
+        return Assignment.objects.filter(pk=self.assignment_id).values_list('due_date', flat=True).get()
 
 
 class SubmissionFile(models.Model):
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .analytics import invalidate_analytics
+from .models import Assignment, Submission, Question, StudentAnswer
+
+# Sent after submissions are created or graded in bulk, where no post_save fires.
+# Receives ``assignment_ids`` and ``student_ids`` (sets of ints).
+submissions_changed = Signal()
+
+
+@receiver(submissions_changed)
+def invalidate_analytics_on_bulk_change(sender, assignment_ids, **kwargs):
+    invalidate_analytics(assignment_ids)
+
+
+@receiver([post_save, post_delete], sender=Submission)
+def invalidate_analytics_on_submission(sender, instance, **kwargs):
+    invalidate_analytics([instance.assignment_id])
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+def invalidate_analytics_on_assignment(sender, instance, **kwargs):
+    """Total points and due date feed the histogram and late rate"""
+    invalidate_analytics([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_analytics_on_question(sender, instance, **kwargs):
+    invalidate_analytics(Assignment.objects.filter(quiz=instance.quiz_id).values_list('id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=StudentAnswer)
+def invalidate_analytics_on_answer(sender, instance, **kwargs):
+    """Manually graded answers reach their assignment through the submission"""
+    invalidate_analytics(Submission.objects.filter(pk=instance.submission_id).values_list('assignment_id', flat=True))
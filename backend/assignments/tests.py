@@ -1,3 +1,223 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Subject, Course
+from .grading import grade_submissions
+from .ingest import ingest_submissions
+from .models import Assignment, Submission, SubmissionFile, Quiz, Question, Answer, StudentAnswer
+
+User = get_user_model()
+
+
+class QuizTestCase(TestCase):
+    """Creates a quiz with true/false, multiple choice, short answer and essay questions"""
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            email='teacher@example.com', password='pass', first_name='Ada', last_name='Lovelace',
+            role='teacher', username='teacher'
+        )
+        subject = Subject.objects.create(name='Computing', category='Science')
+        self.course = Course.objects.create(
+            name='Intro', code='CS101', description='...', subject=subject, teacher=self.teacher
+        )
+        self.assignment = Assignment.objects.create(
+            course=self.course, title='Quiz 1', description='...', created_by=self.teacher,
+            due_date=timezone.now() + timedelta(days=1), total_points=50, status='published'
+        )
+        self.quiz = Quiz.objects.create(assignment=self.assignment)
+        self.questions = {}
+        self.correct = {}
+        self.wrong = {}
+        for order, (question_type, points) in enumerate(
+            [('true_false', 1), ('multiple_choice', 2), ('short_answer', 2)]
+        ):
+            question = Question.objects.create(
+                quiz=self.quiz, text=question_type, question_type=question_type, points=points, order=order
+            )
+            self.questions[question_type] = question
+            self.correct[question_type] = Answer.objects.create(question=question, text='Right  Answer', is_correct=True)
+            self.wrong[question_type] = Answer.objects.create(question=question, text='Wrong', order=1)
+
+    def add_student(self, index, right_types):
+        student = User.objects.create_user(
+            email=f'student{index}@example.com', password='pass', first_name='Stu', last_name=str(index),
+            role='student', username=f'student{index}'
+        )
+        submission = Submission.objects.bulk_create([Submission(assignment=self.assignment, student=student)])[0]
+        answers = []
+        for question_type, question in self.questions.items():
+            chosen = self.correct[question_type] if question_type in right_types else self.wrong[question_type]
+            if question_type == 'short_answer':
+                answers.append(StudentAnswer(submission=submission, question=question, text_answer=chosen.text.lower()))
+            else:
+                answers.append(StudentAnswer(submission=submission, question=question, selected_answer=chosen))
+        StudentAnswer.objects.bulk_create(answers)
+        return submission
+
+
+class GradingTests(QuizTestCase):
+
+    def test_scores_are_scaled_to_assignment_points(self):
+        perfect = self.add_student(0, {'true_false', 'multiple_choice', 'short_answer'})
+        partial = self.add_student(1, {'multiple_choice'})
+
+        self.assertEqual(grade_submissions(Submission.objects.all()), 2)
+
+        perfect.refresh_from_db()
+        partial.refresh_from_db()
+        self.assertEqual((perfect.status, perfect.score), ('graded', Decimal('50.00')))
+        self.assertEqual(partial.score, Decimal('20.00'))
+        answer = StudentAnswer.objects.get(submission=partial, question=self.questions['multiple_choice'])
+        self.assertEqual((answer.is_correct, answer.points_earned), (True, Decimal('2.00')))
+
+    def test_essay_answers_leave_submission_for_a_teacher(self):
+        essay = Question.objects.create(quiz=self.quiz, text='Essay', question_type='essay', points=5, order=9)
+        submission = self.add_student(0, {'true_false'})
+        StudentAnswer.objects.create(submission=submission, question=essay, text_answer='...')
+
+        self.assertEqual(grade_submissions(Submission.objects.all()), 0)
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, 'submitted')
+        self.assertTrue(StudentAnswer.objects.get(submission=submission, question=self.questions['true_false']).is_correct)
+
+    def test_query_count_does_not_grow_with_class_size(self):
+        self.add_student(0, {'true_false'})
+        with CaptureQueriesContext(connection) as small:
+            grade_submissions(Submission.objects.all())
+        Submission.objects.update(status='submitted')
+        for index in range(1, 30):
+            self.add_student(index, {'multiple_choice'})
+        with CaptureQueriesContext(connection) as large:
+            grade_submissions(Submission.objects.all())
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_grade_endpoint(self):
+        self.add_student(0, {'true_false'})
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        response = client.post(reverse('quiz-grade', args=[self.assignment.pk]))
+        self.assertEqual(response.json(), {'graded': 1, 'needs_manual_grading': 0})
+
+    def test_grade_endpoint_rejects_malformed_ids(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        url = reverse('quiz-grade', args=[self.assignment.pk])
+        for submission_ids in ('12', {'id': 1}, ['a'], [True]):
+            response = client.post(url, {'submission_ids': submission_ids}, format='json')
+            self.assertEqual(response.status_code, 400, submission_ids)
+
+
+class AnalyticsTests(QuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def get_analytics(self):
+        response = self.client.get(reverse('assignment-analytics', args=[self.assignment.pk]))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_statistics_and_cache_invalidation(self):
+        self.add_student(0, {'true_false', 'multiple_choice', 'short_answer'})
+        self.add_student(1, {'multiple_choice'})
+        self.add_student(2, set())
+        grade_submissions(Submission.objects.all())
+
+        data = self.get_analytics()
+        self.assertEqual(data['graded'], 3)
+        self.assertEqual(data['scores']['median'], 20.0)
+        self.assertEqual(data['scores']['max'], 50.0)
+        self.assertEqual(sum(bucket['count'] for bucket in data['scores']['histogram']), 3)
+        difficulty = {q['question_id']: q['difficulty'] for q in data['questions']}
+        self.assertAlmostEqual(difficulty[self.questions['multiple_choice'].pk], 0.667)
+
+        with self.assertNumQueries(1):  # Only the assignment lookup; statistics come from cache
+            self.get_analytics()
+
+        self.add_student(3, {'true_false', 'multiple_choice', 'short_answer'})
+        grade_submissions(Submission.objects.filter(status='submitted'))
+        self.assertEqual(self.get_analytics()['graded'], 4)
+
+    def test_edits_outside_bulk_grading_invalidate_the_cache(self):
+        submission = self.add_student(0, {'multiple_choice'})
+        grade_submissions(Submission.objects.all())
+        self.assertEqual(self.get_analytics()['total_points'], 50)
+
+        self.assignment.total_points = 100
+        self.assignment.save()
+        self.assertEqual(self.get_analytics()['total_points'], 100)
+
+        answer = StudentAnswer.objects.get(submission=submission, question=self.questions['true_false'])
+        answer.is_correct = True
+        answer.points_earned = 1
+        answer.save()
+        difficulty = {q['question_id']: q['difficulty'] for q in self.get_analytics()['questions']}
+        self.assertEqual(difficulty[self.questions['true_false'].pk], 1.0)
+
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='ingest-tests-')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SubmissionIngestTests(QuizTestCase):
+    """Submissions are stamped late on create and can be ingested in bulk"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_save_stamps_late_status_on_create_only(self):
+        student = User.objects.create_user(
+            email='student@example.com', password='pass', first_name='Stu', last_name='Dent',
+            role='student', username='student'
+        )
+        self.assignment.due_date = timezone.now() - timedelta(hours=1)
+        self.assignment.save()
+
+        submission = Submission.objects.create(assignment_id=self.assignment.pk, student=student)
+        self.assertEqual(submission.status, 'late')
+
+        submission.status = 'graded'
+        with self.assertNumQueries(1):
+            submission.save()
+
+    def test_ingest_resolves_due_dates_set_wise(self):
+        past_due = Assignment.objects.create(
+            course=self.course, title='Old', description='...', created_by=self.teacher,
+            due_date=timezone.now() - timedelta(days=1)
+        )
+        students = [
+            User.objects.create_user(
+                email=f'student{i}@example.com', password='pass', first_name='Stu', last_name=str(i),
+                role='student', username=f'student{i}'
+            )
+            for i in range(4)
+        ]
+        rows = [
+            {'assignment_id': (past_due if i % 2 else self.assignment).pk, 'student_id': student.pk,
+             'files': [('notes.txt', ContentFile(b'notes', name='notes.txt'))]}
+            for i, student in enumerate(students)
+        ]
+
+        with self.assertNumQueries(3 + 2):  # due dates, two inserts and the savepoint pair
+            submissions = ingest_submissions(rows)
+
+        self.assertEqual([s.status for s in submissions], ['submitted', 'late', 'submitted', 'late'])
+        self.assertEqual(SubmissionFile.objects.filter(submission__in=submissions).count(), 4)
+        self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, 'submission_files')))
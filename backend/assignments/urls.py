@@ -1,3 +1,7 @@
 from django.urls import path
+from .views import QuizGradeView, AssignmentAnalyticsView
 
-urlpatterns = []
\ No newline at end of file
+urlpatterns = [
+    path('<int:assignment_id>/grade/', QuizGradeView.as_view(), name='quiz-grade'),
+    path('<int:assignment_id>/analytics/', AssignmentAnalyticsView.as_view(), name='assignment-analytics'),
+]
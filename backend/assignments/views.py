@@ -1,3 +1,55 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
 
-# Create your views here.
+from courses.views import IsTeacherOrAdmin
+from .analytics import get_analytics
+from .grading import grade_submissions
+from .models import Assignment, Submission
+
+
+class QuizGradeView(APIView):
+    """View for auto-grading the submissions of a quiz"""
+    permission_classes = [IsTeacherOrAdmin]
+    
+    def post(self, request, assignment_id):
+        assignment = get_object_or_404(Assignment.objects.select_related('course'), pk=assignment_id)
+        
+        # Only admins and the course teacher can grade
+        if request.user.role not in ['admin', 'admin_teacher'] and assignment.course.teacher_id != request.user.id:
+            return Response({"message": "You don't have permission to grade this assignment"}, 
+                           status=status.HTTP_403_FORBIDDEN)
+        if not hasattr(assignment, 'quiz'):
+            return Response({"message": "Only quizzes can be graded automatically"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        submissions = Submission.objects.filter(assignment=assignment, status__in=['submitted', 'late'])
+        submission_ids = request.data.get('submission_ids')
+        if submission_ids is not None:
+            if not isinstance(submission_ids, list) or not all(
+                isinstance(pk, int) and not isinstance(pk, bool) for pk in submission_ids
+            ):
+                return Response({"message": "submission_ids must be a list of submission ids"}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+            if submission_ids:
+                submissions = submissions.filter(pk__in=submission_ids)
+        
+        pending = submissions.count()
+        graded = grade_submissions(submissions)
+        return Response({"graded": graded, "needs_manual_grading": pending - graded})
+
+
+class AssignmentAnalyticsView(APIView):
+    """View for score statistics of an assignment"""
+    permission_classes = [IsTeacherOrAdmin]
+    
+    def get(self, request, assignment_id):
+        assignment = get_object_or_404(Assignment.objects.select_related('course'), pk=assignment_id)
+        
+        # Only admins and the course teacher can see class-wide results
+        if request.user.role not in ['admin', 'admin_teacher'] and assignment.course.teacher_id != request.user.id:
+            return Response({"message": "You don't have permission to view this assignment's analytics"}, 
+                           status=status.HTTP_403_FORBIDDEN)
+        
+        return Response(get_analytics(assignment))
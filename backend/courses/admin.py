@@ -45,7 +45,7 @@ class LessonAdmin(admin.ModelAdmin):
 
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
-    list_display = ('student', 'course', 'progress', 'enrollment_date', 'is_active')
+    list_display = ('student', 'course', 'progress', 'completed_lessons', 'enrollment_date', 'is_active')
     list_filter = ('course', 'is_active')
     search_fields = ('student__email', 'student__first_name', 'student__last_name', 'course__name')
     readonly_fields = ('enrollment_date', 'last_accessed')
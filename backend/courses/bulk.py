@@ -0,0 +1,157 @@
+"""
+Set-wise roster import for enrollments.
+
+A roster of N ``(student_id, course_id)`` pairs is validated with a constant
+number of ``IN`` queries and inserted with ``bulk_create``, instead of the
+per-row lookups done by ``EnrollmentCreateView``.
+"""
+
+import csv
+import io
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from .models import Course, Enrollment
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+CREATED = 'created'
+REACTIVATED = 'reactivated'
+ALREADY_ENROLLED = 'already_enrolled'
+DUPLICATE = 'duplicate'
+ERROR = 'error'
+
+
+class RosterError(ValueError):
+    """The uploaded roster could not be read"""
+
+
+def parse_rows(rows):
+    """Normalise dicts or 2-item sequences into ``(student_id, course_id)``, or an error message"""
+    parsed = []
+    for row in rows:
+        try:
+            if isinstance(row, dict):
+                pair = (int(row['student_id']), int(row['course_id']))
+            else:
+                student_id, course_id = row
+                pair = (int(student_id), int(course_id))
+        except (KeyError, TypeError, ValueError):
+            parsed.append("Each row needs an integer student_id and course_id")
+        else:
+            parsed.append(pair)
+    return parsed
+
+
+def read_csv(uploaded_file):
+    """Read ``student_id,course_id`` rows from an uploaded CSV; a header row is optional"""
+    text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text, strict=True)
+    try:
+        rows = [row for row in reader if row]
+    except UnicodeDecodeError:
+        raise RosterError("The CSV file must be UTF-8 encoded")
+    except csv.Error as e:
+        raise RosterError(f"Malformed CSV on line {reader.line_num}: {e}")
+    if rows and not rows[0][0].strip().isdigit():
+        header = [name.strip() for name in rows[0]]
+        return [dict(zip(header, row)) for row in rows[1:]]
+    return rows
+
+
+def bulk_enroll(rows):
+    """
+    Enroll every valid ``(student_id, course_id)`` in ``rows``.
+
+    Returns one outcome dict per input row, in input order.
+    """
+    parsed = parse_rows(rows)
+    pairs = [pair for pair in parsed if isinstance(pair, tuple)]
+    student_ids = {student_id for student_id, _ in pairs}
+    course_ids = {course_id for _, course_id in pairs}
+
+    # Three IN queries validate the whole roster
+    known_students = set(User.objects.filter(pk__in=student_ids).values_list('id', flat=True))
+    course_active = dict(Course.objects.filter(pk__in=course_ids).values_list('id', 'is_active'))
+    existing = {
+        (student_id, course_id): (pk, is_active)
+        for pk, student_id, course_id, is_active in Enrollment.objects.filter(
+            student_id__in=student_ids, course_id__in=course_ids
+        ).values_list('id', 'student_id', 'course_id', 'is_active')
+    }
+
+    results = []
+    seen = set()
+    to_create = []
+    to_reactivate = []
+    for index, pair in enumerate(parsed):
+        if not isinstance(pair, tuple):
+            results.append({'row': index, 'status': ERROR, 'message': pair})
+            continue
+        student_id, course_id = pair
+        outcome = {'row': index, 'student_id': student_id, 'course_id': course_id}
+        if pair in seen:
+            outcome['status'] = DUPLICATE
+        elif student_id not in known_students:
+            outcome.update(status=ERROR, message="Student not found")
+        elif course_id not in course_active:
+            outcome.update(status=ERROR, message="Course not found")
+        elif not course_active[course_id]:
+            outcome.update(status=ERROR, message="This course is not currently active")
+        elif pair in existing:
+            pk, is_active = existing[pair]
+            if is_active:
+                outcome['status'] = ALREADY_ENROLLED
+            else:
+                outcome['status'] = REACTIVATED
+                to_reactivate.append(pk)
+        else:
+            outcome['status'] = CREATED
+            to_create.append(Enrollment(student_id=student_id, course_id=course_id))
+        seen.add(pair)
+        results.append(outcome)
+
+    with transaction.atomic():
+        created = insert_enrollments(to_create)
+        # Pairs a concurrent import enrolled first were not created by this one
+        for outcome in results:
+            if outcome['status'] == CREATED and (outcome['student_id'], outcome['course_id']) not in created:
+                outcome.update(status=ALREADY_ENROLLED, message="Enrolled by a concurrent import")
+        for start in range(0, len(to_reactivate), BATCH_SIZE):
+            Enrollment.objects.filter(pk__in=to_reactivate[start:start + BATCH_SIZE]).update(is_active=True)
+
+    return results
+
+
+def insert_enrollments(enrollments):
+    """Insert ``enrollments``; returns the ``(student_id, course_id)`` pairs that were actually created"""
+    try:
+        with transaction.atomic():
+            Enrollment.objects.bulk_create(enrollments, batch_size=BATCH_SIZE)
+    except IntegrityError:
+        pass
+    else:
+        return {(e.student_id, e.course_id) for e in enrollments}
+
+    # A concurrent import won the unique (student, course) race for some rows; find them one at a time
+    created = set()
+    for enrollment in enrollments:
+        pair = (enrollment.student_id, enrollment.course_id)
+        try:
+            with transaction.atomic():
+                Enrollment.objects.bulk_create([Enrollment(student_id=pair[0], course_id=pair[1])])
+        except IntegrityError:
+            continue
+        created.add(pair)
+    return created
+
+
+def summarize(results):
+    """Count outcomes by status"""
+    summary = {status: 0 for status in (CREATED, REACTIVATED, ALREADY_ENROLLED, DUPLICATE, ERROR)}
+    for outcome in results:
+        summary[outcome['status']] += 1
+    return summary
@@ -0,0 +1,118 @@
+"""
+Versioned cache of rendered course trees.
+
+Every course has a version token in the cache. Cached payloads embed the
+version in their key, so replacing the token (from the signals in
+``courses.signals``) invalidates every payload for that course at once
+without having to know which keys exist.
+
+Payloads may live in each process's own cache, but the tokens are kept in
+the ``shared`` cache so a write handled by one worker invalidates the trees
+every other worker holds.
+"""
+
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+KEY_PREFIX = 'course-tree'
+
+
+class CacheStats:
+    """Process-wide hit/miss counters for the course tree cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+stats = CacheStats()
+
+
+def get_timeout():
+    return getattr(settings, 'COURSE_CACHE_TIMEOUT', 60 * 60)
+
+
+def version_cache():
+    return caches[settings.COURSE_CACHE_VERSION_ALIAS]
+
+
+def version_key(course_id):
+    return f'{KEY_PREFIX}:version:{course_id}'
+
+
+def new_version():
+    # A counter restarts when its key is evicted and could meet payloads cached under an old
+    # number; a random token never repeats, so eviction only costs a cache miss
+    return uuid.uuid4().hex
+
+
+def get_version(course_id):
+    versions = version_cache()
+    key = version_key(course_id)
+    version = versions.get(key)
+    if version is None:
+        # add() is a no-op if another worker initialised the version first
+        versions.add(key, new_version(), timeout=None)
+        version = versions.get(key)
+    return version
+
+
+def bump_version(course_id):
+    """Invalidate every cached payload of ``course_id`` once the current transaction commits"""
+    # Bumping before commit would let a concurrent reader cache uncommitted-era data under the new version
+    key = version_key(course_id)
+    transaction.on_commit(lambda: version_cache().set(key, new_version(), timeout=None))
+
+
+def bump_teacher_versions(teacher_id):
+    """Course payloads embed their teacher, so invalidate every course they teach"""
+    from .models import Course
+
+    for course_id in Course.objects.filter(teacher_id=teacher_id).values_list('id', flat=True).iterator():
+        bump_version(course_id)
+
+
+def payload_key(name, course_id, version, *parts):
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{KEY_PREFIX}:{name}:{course_id}:v{version}:{suffix}'
+
+
+def cached_json_response(name, course_id, build, *parts):
+    """
+    Return a JSON response for ``name`` of ``course_id``, rendering ``build()``
+    only on a cache miss. The rendered bytes are cached, not the Python data.
+    """
+    key = payload_key(name, course_id, get_version(course_id), *parts)
+    content = cache.get(key)
+    hit = content is not None
+    stats.record(hit)
+    if not hit:
+        content = JSONRenderer().render(build())
+        cache.set(key, content, timeout=get_timeout())
+
+    response = HttpResponse(content, content_type='application/json')
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
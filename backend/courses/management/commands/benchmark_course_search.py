@@ -0,0 +1,73 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from courses.models import Subject, Course
+from courses.search import full_text_enabled, search_courses, update_search_vectors
+
+WORDS = [
+    'algebra', 'biology', 'chemistry', 'design', 'economics', 'french', 'geometry',
+    'history', 'introduction', 'javascript', 'literature', 'music', 'physics',
+    'programming', 'python', 'statistics', 'writing', 'advanced', 'foundations', 'applied',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare icontains and full-text course search on synthetic catalogs (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000])
+        parser.add_argument('--queries', nargs='+', default=['pyth', 'intro physics', 'statistics'])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            with transaction.atomic():
+                self.populate(size)
+                for text in options['queries']:
+                    legacy = self.time_query(options['repeat'], lambda: Course.objects.filter(
+                        Q(name__icontains=text) | Q(description__icontains=text) | Q(code__icontains=text)
+                    ))
+                    indexed = self.time_query(options['repeat'], lambda: search_courses(Course.objects.all(), text))
+                    self.stdout.write(
+                        f'{size:>7} courses  {text!r:<18} icontains {legacy * 1000:8.2f} ms   '
+                        f'search {indexed * 1000:8.2f} ms'
+                    )
+                transaction.set_rollback(True)
+        if not full_text_enabled():
+            self.stdout.write(self.style.WARNING('Not running on PostgreSQL: both columns use icontains'))
+
+    def populate(self, size):
+        rng = random.Random(size)
+        teacher = get_user_model().objects.create_user(
+            email=f'bench-{size}@example.com', first_name='Bench', last_name='Teacher', role='teacher'
+        )
+        subject = Subject.objects.create(name='Benchmark', category='Benchmark')
+        Course.objects.bulk_create(
+            (
+                Course(
+                    name=' '.join(rng.sample(WORDS, 3)).title(),
+                    code=f'BENCH{i}',
+                    description=' '.join(rng.choices(WORDS, k=40)),
+                    subject=subject,
+                    teacher=teacher,
+                )
+                for i in range(size)
+            ),
+            batch_size=5000,
+        )
+        # bulk_create skips post_save, so build the search documents in one pass
+        update_search_vectors(Course.objects.filter(subject=subject))
+
+    def time_query(self, repeat, build):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(build().values_list('id', flat=True)[:20])
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
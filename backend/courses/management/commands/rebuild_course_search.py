@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.search import full_text_enabled, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search document of every course'
+
+    def handle(self, *args, **options):
+        if not full_text_enabled():
+            self.stdout.write(self.style.WARNING('Full-text search requires PostgreSQL; nothing to do'))
+            return
+        updated = update_search_vectors(Course.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search documents for {updated} courses'))
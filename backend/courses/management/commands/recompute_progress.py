@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.progress import refresh_course_progress
+
+
+class Command(BaseCommand):
+    help = 'Rebuild lesson counts, enrollment progress and course completion counts from lesson completions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help='Only recompute this course id (may be repeated)')
+
+    def handle(self, *args, **options):
+        courses = Course.objects.all()
+        if options['courses']:
+            courses = courses.filter(pk__in=options['courses'])
+        refresh_course_progress(courses)
+        self.stdout.write(self.style.SUCCESS('Recomputed course progress'))
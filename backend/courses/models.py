@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from uploads.storage import attachment_storage
 
 
 class Subject(models.Model):
@@ -28,8 +31,18 @@ class Course(models.Model):
     is_active = models.BooleanField(default=True)
     level = models.CharField(max_length=50, default='Beginner')  # Beginner, Intermediate, Advanced
     credit_hours = models.PositiveIntegerField(default=3)
+    lesson_count = models.PositiveIntegerField(default=0, editable=False)  # Active lessons, maintained by courses.progress
+    completion_count = models.PositiveIntegerField(default=0, editable=False)  # Enrollments that finished the course
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)  # Maintained by courses.signals
+    
+    class Meta:
+        indexes = [
+            # Backs keyset pagination of the catalog on (name, id)
+            models.Index(fields=['name', 'id'], name='course_name_id_idx'),
+            GinIndex(fields=['search_vector'], name='course_search_vector_idx'),
+        ]
     
     def __str__(self):
         return f"{self.code} - {self.name}"
@@ -77,6 +90,7 @@ class Enrollment(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
     enrollment_date = models.DateTimeField(auto_now_add=True)
     progress = models.PositiveIntegerField(default=0)  # Percentage of course completion
+    completed_lessons = models.PositiveIntegerField(default=0)  # Maintained by courses.progress
     last_accessed = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     completion_date = models.DateTimeField(blank=True, null=True)
@@ -84,11 +98,28 @@ class Enrollment(models.Model):
     
     class Meta:
         unique_together = ['student', 'course']
+        indexes = [
+            # Backs keyset pagination of enrollment listings, newest first
+            models.Index(fields=['-enrollment_date', '-id'], name='enrollment_date_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.email} - {self.course.name}"
 
 
+class LessonCompletion(models.Model):
+    """Record of a student completing a lesson within an enrollment"""
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE, related_name='lesson_completions')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='completions')
+    completed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['enrollment', 'lesson']
+    
+    def __str__(self):
+        return f"{self.enrollment} - {self.lesson.title}"
+
+
 class LearningTool(models.Model):
     """Learning tools that can be used across courses"""
     name = models.CharField(max_length=100)
@@ -109,7 +140,7 @@ class CourseResource(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='resources')
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
-    file = models.FileField(upload_to='course_resources/', blank=True, null=True)
+    file = models.FileField(upload_to='course_resources/', blank=True, null=True, storage=attachment_storage)
     url = models.URLField(blank=True, null=True)
     resource_type = models.CharField(max_length=50, default='Document')  # Document, Video, Link, etc.
     is_required = models.BooleanField(default=False)
@@ -0,0 +1,116 @@
+"""
+Course progress derived from lesson completions.
+
+``Enrollment.completed_lessons``/``progress`` and ``Course.lesson_count``/
+``completion_count`` are denormalized aggregates. A completion event updates
+them with a constant number of ``F()`` updates; curriculum edits and the
+``recompute_progress`` command rebuild them with set-based ``UPDATE``s.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Least, NullIf
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Course, Enrollment, Lesson, LessonCompletion
+
+# Sent after enrollment progress is updated in place, where no post_save fires.
+# Receives ``student_ids`` (a set of ints).
+progress_changed = Signal()
+
+
+def count_subquery(queryset, group_field):
+    """Correlated ``COUNT(*)`` of ``queryset`` grouped on ``group_field``, 0 when empty"""
+    counts = queryset.order_by().values(group_field).annotate(total=Count('pk')).values('total')[:1]
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def countable_lessons():
+    """Lessons that count towards progress"""
+    return Lesson.objects.filter(is_active=True, module__is_active=True)
+
+
+def progress_expression(completed, lesson_count):
+    """``completed`` as a percentage of ``lesson_count``, capped at 100 and 0 for empty courses"""
+    return Coalesce(
+        Least(Value(100), completed * 100 / NullIf(lesson_count, Value(0))),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def complete_lesson(enrollment, lesson):
+    """
+    Record that the enrollment's student completed ``lesson``.
+
+    Returns True if this was a new completion. Aggregates are adjusted in place
+    with ``F()`` expressions, so the cost does not depend on course size.
+    """
+    try:
+        with transaction.atomic():
+            LessonCompletion.objects.create(enrollment=enrollment, lesson=lesson)
+    except IntegrityError:
+        # Completing a lesson twice is a no-op
+        return False
+
+    with transaction.atomic():
+        lesson_count = Course.objects.filter(pk=enrollment.course_id).values_list('lesson_count', flat=True).get()
+        completed = F('completed_lessons') + 1
+        Enrollment.objects.filter(pk=enrollment.pk).update(
+            completed_lessons=completed,
+            progress=progress_expression(completed, Value(lesson_count)),
+        )
+        # Only the event that crosses the finish line stamps the completion
+        finished = lesson_count > 0 and Enrollment.objects.filter(
+            pk=enrollment.pk, completion_date__isnull=True, completed_lessons__gte=lesson_count
+        ).update(completion_date=timezone.now())
+        if finished:
+            Course.objects.filter(pk=enrollment.course_id).update(completion_count=F('completion_count') + 1)
+
+    progress_changed.send(sender=Enrollment, student_ids={enrollment.student_id})
+    enrollment.refresh_from_db(fields=['completed_lessons', 'progress', 'completion_date'])
+    return True
+
+
+def refresh_course_progress(courses):
+    """
+    Recount lessons for ``courses`` and rescale their enrollments' progress.
+
+    Runs a fixed number of set-based UPDATEs however many courses, lessons and
+    enrollments are involved.
+    """
+    course_ids = courses.values('pk')
+    with transaction.atomic():
+        courses.update(lesson_count=count_subquery(
+            countable_lessons().filter(module__course=OuterRef('pk')), 'module__course'
+        ))
+
+        enrollments = Enrollment.objects.filter(course__in=course_ids)
+        completed = count_subquery(
+            LessonCompletion.objects.filter(
+                enrollment=OuterRef('pk'), lesson__is_active=True, lesson__module__is_active=True
+            ),
+            'enrollment'
+        )
+        enrollments.update(completed_lessons=completed)
+
+        lesson_count = Subquery(
+            Course.objects.filter(pk=OuterRef('course_id')).values('lesson_count')[:1],
+            output_field=IntegerField(),
+        )
+        enrollments.update(progress=progress_expression(F('completed_lessons'), lesson_count))
+        # New lessons take a finished enrollment back below 100, so it is no longer complete
+        enrollments.update(completion_date=Case(
+            When(progress__lt=100, then=Value(None)),
+            When(completion_date__isnull=True, then=Value(timezone.now())),
+            default=F('completion_date'),
+        ))
+
+        courses.update(completion_count=count_subquery(
+            Enrollment.objects.filter(course=OuterRef('pk'), completion_date__isnull=False), 'course'
+        ))
+
+    student_ids = set(Enrollment.objects.filter(course__in=course_ids).values_list('student_id', flat=True))
+    if student_ids:
+        progress_changed.send(sender=Enrollment, student_ids=student_ids)
@@ -0,0 +1,74 @@
+"""
+Full-text search over the course catalog.
+
+On PostgreSQL each course carries a weighted ``tsvector`` (name and code
+rank highest, then the subject name, then the description) kept in a GIN
+index, so catalog search is an index lookup instead of a sequential
+``ILIKE`` scan. Other database backends fall back to the ``icontains`` path.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = 'english'
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def full_text_enabled():
+    """Return True when the database supports the tsvector search path"""
+    return connection.vendor == 'postgresql'
+
+
+def course_search_vector():
+    """Weighted search document for a course"""
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('code', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('subject__name', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def build_prefix_query(text):
+    """Turn free text into a tsquery matching every term as a prefix, e.g. ``intro pyth`` -> ``intro:* & pyth:*``"""
+    terms = TERM_RE.findall(text)
+    if not terms:
+        return None
+    raw = ' & '.join(f'{term}:*' for term in terms)
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_courses(queryset, text):
+    """Filter ``queryset`` to courses matching ``text``, annotated with ``search_rank`` when ranked"""
+    if not full_text_enabled():
+        return queryset.filter(
+            Q(name__icontains=text) |
+            Q(description__icontains=text) |
+            Q(code__icontains=text)
+        )
+
+    query = build_prefix_query(text)
+    if query is None:
+        return queryset.none()
+    # ts_rank returns a float4; keyset cursors round-trip through JSON as doubles, so compare as float8
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+    )
+
+
+def update_search_vectors(queryset):
+    """Recompute the stored search document for every course in ``queryset`` with one UPDATE"""
+    if not full_text_enabled():
+        return 0
+    from .models import Course
+
+    # UPDATE cannot join, so read the document (which spans subject) through a correlated subquery
+    document = Course.objects.filter(pk=OuterRef('pk')).annotate(
+        document=course_search_vector()
+    ).values('document')[:1]
+    return queryset.update(search_vector=Subquery(document))
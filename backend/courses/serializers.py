@@ -92,9 +92,11 @@ class EnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
         fields = [
-            'id', 'student', 'course', 'progress', 'enrollment_date',
+            'id', 'student', 'course', 'progress', 'completed_lessons', 'enrollment_date',
             'last_accessed', 'is_active', 'completion_date', 'grade'
         ]
+        # Progress is derived from lesson completions, see courses.progress
+        read_only_fields = ['progress', 'completed_lessons']
 
 
 class EnrollmentCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import bump_version, bump_teacher_versions
+from .models import Subject, Course, Module, Lesson, CourseResource
+from .progress import refresh_course_progress
+from .search import update_search_vectors
+
+
+@receiver(post_save, sender=Course)
+def refresh_course_search_vector(sender, instance, raw=False, **kwargs):
+    """Keep the course's search document in step with its text fields"""
+    if raw:
+        return
+    update_search_vectors(Course.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Subject)
+def refresh_subject_course_search_vectors(sender, instance, created=False, raw=False, **kwargs):
+    """A renamed subject changes the search document of all of its courses"""
+    if raw or created:
+        return
+    update_search_vectors(Course.objects.filter(subject=instance))
+
+
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Module)
+@receiver([post_save, post_delete], sender=CourseResource)
+def invalidate_course_tree(sender, instance, **kwargs):
+    """Any change to a course, its modules or its resources invalidates its cached tree"""
+    bump_version(instance.pk if sender is Course else instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def invalidate_lesson_course_tree(sender, instance, **kwargs):
+    """Lessons reach their course through the module"""
+    course_id = Module.objects.filter(pk=instance.module_id).values_list('course_id', flat=True).first()
+    if course_id is not None:
+        bump_version(course_id)
+
+
+# Fields whose change alters which lessons count towards a course
+COUNTED_FIELDS = {Module: ('is_active', 'course_id'), Lesson: ('is_active', 'module_id')}
+
+
+def counted_state(instance):
+    # __dict__ rather than getattr so deferred fields are not loaded one query at a time
+    return {name: instance.__dict__.get(name) for name in COUNTED_FIELDS[type(instance)]}
+
+
+@receiver(post_init, sender=Module)
+@receiver(post_init, sender=Lesson)
+def remember_counted_state(sender, instance, **kwargs):
+    instance._counted_state = counted_state(instance)
+
+
+def counted_change(instance, signal, created):
+    """The counted fields as they were before this save or delete, or None if lesson counts are unaffected"""
+    previous = getattr(instance, '_counted_state', {})
+    current = counted_state(instance)
+    instance._counted_state = current
+    if signal is post_save and not created and previous == current:
+        return None
+    return previous
+
+
+@receiver([post_save, post_delete], sender=Module)
+def refresh_module_course_progress(sender, instance, signal, created=False, raw=False, **kwargs):
+    """Adding, removing, (de)activating or moving a module changes how many lessons a course has"""
+    if raw:
+        return
+    previous = counted_change(instance, signal, created)
+    if previous is None:
+        return
+    course_ids = {previous.get('course_id'), instance.course_id} - {None}
+    refresh_course_progress(Course.objects.filter(pk__in=course_ids))
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def refresh_lesson_course_progress(sender, instance, signal, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = counted_change(instance, signal, created)
+    if previous is None:
+        return
+    module_ids = {previous.get('module_id'), instance.module_id} - {None}
+    refresh_course_progress(Course.objects.filter(modules__in=module_ids))
+
+
+@receiver(post_save, sender=Subject)
+def invalidate_subject_course_trees(sender, instance, created=False, **kwargs):
+    """Course payloads embed their subject"""
+    if created:
+        return
+    for course_id in Course.objects.filter(subject=instance).values_list('id', flat=True).iterator():
+        bump_version(course_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_teacher_course_trees(sender, instance, created=False, update_fields=None, **kwargs):
+    """Course payloads embed their teacher; login bookkeeping does not change it"""
+    if created or (update_fields and set(update_fields) <= {'last_login', 'last_login_at'}):
+        return
+    bump_teacher_versions(instance.pk)
@@ -1,3 +1,605 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from techiekraft.pagination import KeysetPagination
+
+from . import cache as course_cache
+from .models import Subject, Course, Module, Lesson, Enrollment, CourseResource
+from .bulk import insert_enrollments
+from .search import SEARCH_CONFIG, build_prefix_query, search_courses
+
+User = get_user_model()
+
+
+class CourseTreeTestCase(TestCase):
+    """Creates a teacher with one course and an authenticated client"""
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        course_cache.stats.reset()
+        self.teacher = User.objects.create_user(
+            email='teacher@example.com', password='pass', first_name='Ada', last_name='Lovelace',
+            role='teacher', username='teacher'
+        )
+        self.subject = Subject.objects.create(name='Computing', category='Science')
+        self.course = Course.objects.create(
+            name='Intro to Computing', code='CS101', description='Basics',
+            subject=self.subject, teacher=self.teacher
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+
+class CourseDetailQueryCountTests(CourseTreeTestCase):
+    """The course detail tree must load in a constant number of queries"""
+
+    def add_modules(self, count, lessons_per_module):
+        start = self.course.modules.count()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(start, start + count):
+                module = Module.objects.create(course=self.course, title=f'Module {i}', order=i)
+                for j in range(lessons_per_module):
+                    Lesson.objects.create(module=module, title=f'Lesson {i}.{j}', content='...', order=j)
+            CourseResource.objects.create(course=self.course, title=f'Resource {start}')
+
+    def count_detail_queries(self):
+        url = reverse('course-detail', args=[self.course.pk])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_query_count_is_constant(self):
+        self.add_modules(2, 2)
+        small, _ = self.count_detail_queries()
+
+        self.add_modules(20, 10)
+        large, data = self.count_detail_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['modules']), 22)
+        self.assertEqual(len(data['modules'][-1]['lessons']), 10)
+
+    def test_inactive_items_are_hidden_and_order_is_kept(self):
+        self.add_modules(3, 3)
+        hidden_module = self.course.modules.get(order=1)
+        hidden_module.is_active = False
+        hidden_module.save()
+        Lesson.objects.filter(module__order=0, order=2).update(is_active=False)
+        Module.objects.filter(order=2).update(order=0)
+
+        _, data = self.count_detail_queries()
+
+        self.assertEqual([m['title'] for m in data['modules']], ['Module 0', 'Module 2'])
+        self.assertEqual([l['title'] for l in data['modules'][0]['lessons']], ['Lesson 0.0', 'Lesson 0.1'])
+
+
+class CourseTreeCacheTests(CourseTreeTestCase):
+    """Course tree payloads are served from cache until something in the tree changes"""
+
+    def get(self, name, *args):
+        response = self.client.get(reverse(name, args=args))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_detail_is_cached_until_a_lesson_changes(self):
+        module = Module.objects.create(course=self.course, title='Module', order=0)
+        lesson = Lesson.objects.create(module=module, title='Old title', content='...')
+
+        self.assertEqual(self.get('course-detail', self.course.pk)['X-Cache'], 'MISS')
+        # Only the version token is read, from the cache every worker shares
+        with self.assertNumQueries(1):
+            response = self.get('course-detail', self.course.pk)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        key = course_cache.version_key(self.course.pk)
+        self.assertIsNotNone(caches['shared'].get(key))
+        self.assertIsNone(cache.get(key))
+
+        # Versions move once the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson.title = 'New title'
+            lesson.save()
+
+        response = self.get('course-detail', self.course.pk)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['modules'][0]['lessons'][0]['title'], 'New title')
+        self.assertEqual(course_cache.stats.as_dict(), {'hits': 1, 'misses': 2})
+
+    def test_module_and_lesson_lists_are_invalidated(self):
+        module = Module.objects.create(course=self.course, title='Module', order=0)
+        self.get('module-list', self.course.pk)
+        self.get('lesson-list', module.pk)
+        self.assertEqual(self.get('module-list', self.course.pk)['X-Cache'], 'HIT')
+        self.assertEqual(self.get('lesson-list', module.pk)['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(module=module, title='Lesson', content='...')
+
+        self.assertEqual(len(self.get('module-list', self.course.pk).json()[0]['lessons']), 1)
+        self.assertEqual(len(self.get('lesson-list', module.pk).json()), 1)
+
+    def test_deleting_a_resource_invalidates_detail(self):
+        resource = CourseResource.objects.create(course=self.course, title='Slides')
+        self.assertEqual(len(self.get('course-detail', self.course.pk).json()['resources']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resource.delete()
+
+        self.assertEqual(self.get('course-detail', self.course.pk).json()['resources'], [])
+
+
+class CourseListTests(CourseTreeTestCase):
+    """Keyset pages and the NDJSON stream both cover every course exactly once"""
+
+    def setUp(self):
+        super().setUp()
+        # Repeated names make the id tiebreaker matter
+        for i in range(6):
+            Course.objects.create(
+                name=f'Course {i // 2}', code=f'C{i}', description='More', subject=self.subject, teacher=self.teacher
+            )
+        self.url = reverse('course-list')
+        self.expected = list(Course.objects.order_by('name', 'id').values_list('id', flat=True))
+
+    def test_pages_cover_every_course_once(self):
+        seen = []
+        response = self.client.get(self.url, {'page_size': 3}).json()
+        while True:
+            seen.extend(course['id'] for course in response['results'])
+            if not response['next']:
+                break
+            response = self.client.get(response['next']).json()
+        self.assertEqual(seen, self.expected)
+
+    def test_invalid_cursors_are_not_found(self):
+        paginator = KeysetPagination()
+        for position in (['x', None], ['x', 'notint'], ['x'], [{}, 1]):
+            response = self.client.get(self.url, {'cursor': paginator.encode_cursor(position)})
+            self.assertEqual(response.status_code, 404, position)
+        self.assertEqual(self.client.get(self.url, {'cursor': '!!!'}).status_code, 404)
+
+    def test_ndjson_stream(self):
+        response = self.client.get(self.url, {'stream': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], self.expected)
+        self.assertEqual(rows[0]['teacher']['id'], self.teacher.id)
+
+
+class CourseSearchTests(CourseTreeTestCase):
+    """Search builds prefix queries, pages by rank and keeps search documents fresh"""
+
+    def test_build_prefix_query(self):
+        self.assertEqual(
+            build_prefix_query('intro  Pyth!'),
+            SearchQuery('intro:* & Pyth:*', search_type='raw', config=SEARCH_CONFIG),
+        )
+        self.assertIsNone(build_prefix_query(' !? '))
+
+    def test_icontains_fallback(self):
+        Course.objects.create(
+            name='Python Basics', code='PY1', description='', subject=self.subject, teacher=self.teacher
+        )
+        response = self.client.get(reverse('course-list'), {'search': 'pyth'}).json()
+        self.assertEqual([c['code'] for c in response['results']], ['PY1'])
+
+    def test_rank_ordering_pages_with_cursor(self):
+        for i in range(5):
+            Course.objects.create(
+                name=f'Search {i}', code=f'{"A" if i % 2 else "B"}{i}', description='', subject=self.subject,
+                teacher=self.teacher
+            )
+
+        def ranked(queryset, text):
+            # Stands in for SearchRank: tied float scores exercise the id tiebreaker
+            rank = Case(When(code__startswith='A', then=Value(0.9)), default=Value(0.1), output_field=FloatField())
+            return queryset.filter(name__icontains=text).annotate(search_rank=rank)
+
+        with mock.patch('courses.views.full_text_enabled', return_value=True), \
+                mock.patch('courses.views.search_courses', side_effect=ranked):
+            seen = []
+            response = self.client.get(reverse('course-list'), {'search': 'search', 'page_size': 2}).json()
+            while True:
+                seen.extend(c['code'] for c in response['results'])
+                if not response['next']:
+                    break
+                response = self.client.get(response['next']).json()
+        self.assertEqual(seen, ['A1', 'A3', 'B0', 'B2', 'B4'])
+
+    def test_rank_is_cast_to_double_for_cursors(self):
+        with mock.patch('courses.search.full_text_enabled', return_value=True):
+            rank = search_courses(Course.objects.all(), 'intro').query.annotations['search_rank']
+        self.assertIsInstance(rank, Cast)
+        self.assertIsInstance(rank.output_field, FloatField)
+
+    @skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL full-text search')
+    def test_ranked_pages_cover_tied_courses_once(self):
+        for i in range(7):
+            Course.objects.create(
+                name=f'Intro {i}', code=f'T{i}', description='', subject=self.subject, teacher=self.teacher
+            )
+        seen = []
+        response = self.client.get(reverse('course-list'), {'search': 'intro', 'page_size': 3}).json()
+        while True:
+            seen.extend(c['id'] for c in response['results'])
+            if not response['next']:
+                break
+            response = self.client.get(response['next']).json()
+        self.assertEqual(sorted(seen), sorted(Course.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_saves_refresh_search_vectors(self):
+        with mock.patch('courses.signals.update_search_vectors') as update:
+            self.course.description = 'Updated'
+            self.course.save()
+            self.assertEqual(list(update.call_args.args[0]), [self.course])
+
+            other = Course.objects.create(
+                name='Other', code='OT1', description='', subject=self.subject, teacher=self.teacher
+            )
+            update.reset_mock()
+            self.subject.name = 'Informatics'
+            self.subject.save()
+            self.assertEqual(sorted(c.pk for c in update.call_args.args[0]), [self.course.pk, other.pk])
+
+
+class EnrollmentListQueryCountTests(TestCase):
+    """Every role branch of the enrollment list runs a fixed number of queries"""
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            email='teacher@example.com', password='pass', first_name='Ada', last_name='Lovelace',
+            role='teacher', username='teacher'
+        )
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='pass', first_name='Grace', last_name='Hopper',
+            role='admin', username='admin'
+        )
+        self.parent = User.objects.create_user(
+            email='parent@example.com', password='pass', first_name='Pat', last_name='Parent',
+            role='parent', username='parent'
+        )
+        self.subject = Subject.objects.create(name='Computing', category='Science')
+        self.courses = []
+        self.students = []
+        self.client = APIClient()
+
+    def add_enrollments(self, count):
+        """Add ``count`` courses and ``count`` children, each child enrolled in every new course"""
+        offset = len(self.courses)
+        for i in range(offset, offset + count):
+            self.courses.append(Course.objects.create(
+                name=f'Course {i}', code=f'C{i}', description='...',
+                subject=self.subject, teacher=self.teacher
+            ))
+            student = User.objects.create_user(
+                email=f'student{i}@example.com', password='pass', first_name='Stu', last_name=str(i),
+                role='student', username=f'student{i}'
+            )
+            self.students.append(student)
+            self.parent.children.add(student)
+        for student in self.students:
+            for course in self.courses[offset:]:
+                Enrollment.objects.create(student=student, course=course)
+        for student in self.students[offset:]:
+            for course in self.courses[:offset]:
+                Enrollment.objects.create(student=student, course=course)
+
+    def count_queries(self, user, params=''):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('enrollment-list') + params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def assert_constant(self, user, params=''):
+        self.add_enrollments(2)
+        small, _ = self.count_queries(user, params)
+        self.add_enrollments(6)
+        large, data = self.count_queries(user, params)
+        self.assertEqual(small, large)
+        return data
+
+    def test_student(self):
+        self.add_enrollments(1)
+        data = self.assert_constant(self.students[0])
+        self.assertEqual(len(data['results']), 9)
+
+    def test_teacher(self):
+        data = self.assert_constant(self.teacher)
+        self.assertEqual(len(data['results']), 10)
+        self.assertIsNotNone(data['next'])
+
+    def test_teacher_with_course(self):
+        self.add_enrollments(1)
+        self.assert_constant(self.teacher, f'?course_id={self.courses[0].pk}')
+
+    def test_admin(self):
+        self.assert_constant(self.admin)
+
+    def test_parent(self):
+        self.add_enrollments(1)
+        self.assert_constant(self.parent, f'?student_id={self.students[0].pk}')
+
+    def test_pages_cover_every_enrollment_once(self):
+        self.add_enrollments(5)
+        self.client.force_authenticate(self.admin)
+        seen = []
+        url = reverse('enrollment-list') + '?view=ids&page_size=7'
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(data['results'])
+            url = data['next']
+        self.assertEqual(sorted(seen), sorted(Enrollment.objects.values_list('id', flat=True)))
+
+    def test_summary_view(self):
+        self.add_enrollments(1)
+        _, data = self.count_queries(self.parent, '?view=summary')
+        self.assertEqual(data['results'][0]['course__code'], 'C0')
+
+
+class EnrollmentBulkCreateTests(TestCase):
+    """Roster imports are validated set-wise and report an outcome per row"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='pass', first_name='Grace', last_name='Hopper',
+            role='admin', username='admin'
+        )
+        subject = Subject.objects.create(name='Computing', category='Science')
+        self.course = Course.objects.create(
+            name='Intro', code='CS101', description='...', subject=subject, teacher=self.admin
+        )
+        self.closed = Course.objects.create(
+            name='Closed', code='CS999', description='...', subject=subject, teacher=self.admin, is_active=False
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f'student{i}@example.com', password='pass', first_name='Stu', last_name=str(i),
+                role='student', username=f'student{i}'
+            )
+            for i in range(4)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_outcomes(self):
+        s0, s1, s2, s3 = [student.pk for student in self.students]
+        Enrollment.objects.create(student_id=s1, course=self.course)
+        Enrollment.objects.create(student_id=s2, course=self.course, is_active=False)
+        rows = [
+            {'student_id': s0, 'course_id': self.course.pk},
+            {'student_id': s0, 'course_id': self.course.pk},
+            {'student_id': s1, 'course_id': self.course.pk},
+            {'student_id': s2, 'course_id': self.course.pk},
+            {'student_id': s3, 'course_id': self.closed.pk},
+            {'student_id': 0, 'course_id': self.course.pk},
+            {'student_id': 'x'},
+        ]
+
+        response = self.client.post(reverse('enrollment-bulk-create'), {'enrollments': rows}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        statuses = [outcome['status'] for outcome in response.json()['results']]
+        self.assertEqual(statuses, [
+            'created', 'duplicate', 'already_enrolled', 'reactivated', 'error', 'error', 'error'
+        ])
+        self.assertEqual(response.json()['summary']['created'], 1)
+        self.assertTrue(Enrollment.objects.get(student_id=s2, course=self.course).is_active)
+        self.assertEqual(Enrollment.objects.filter(course=self.course, is_active=True).count(), 3)
+
+    def test_csv_upload_uses_constant_queries(self):
+        lines = ['student_id,course_id'] + [f'{student.pk},{self.course.pk}' for student in self.students]
+        upload = SimpleUploadedFile('roster.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('enrollment-bulk-create'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.json()['summary']['created'], 4)
+        self.assertLessEqual(len(context.captured_queries), 8)
+
+    def test_unreadable_csv_is_rejected(self):
+        uploads = {
+            'encoding': SimpleUploadedFile('roster.csv', 'student_id,course_id\nJosé,1'.encode('latin-1')),
+            'malformed': SimpleUploadedFile('roster.csv', b'student_id,course_id\n1,"2\n'),
+        }
+        for problem, upload in uploads.items():
+            with self.subTest(problem):
+                response = self.client.post(reverse('enrollment-bulk-create'), {'file': upload}, format='multipart')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('message', response.json())
+
+    def test_concurrently_inserted_pairs_are_not_reported_as_created(self):
+        s0, s1 = [student.pk for student in self.students[:2]]
+        Enrollment.objects.create(student_id=s0, course=self.course)
+
+        created = insert_enrollments([
+            Enrollment(student_id=s0, course_id=self.course.pk),
+            Enrollment(student_id=s1, course_id=self.course.pk),
+        ])
+
+        self.assertEqual(created, {(s1, self.course.pk)})
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 2)
+
+
+class LessonProgressTests(CourseTreeTestCase):
+    """Enrollment progress follows lesson completions"""
+
+    def setUp(self):
+        super().setUp()
+        self.student = User.objects.create_user(
+            email='student@example.com', password='pass', first_name='Stu', last_name='Dent',
+            role='student', username='student'
+        )
+        module = Module.objects.create(course=self.course, title='Module', order=0)
+        self.lessons = [
+            Lesson.objects.create(module=module, title=f'Lesson {i}', content='...', order=i) for i in range(4)
+        ]
+        self.enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        self.client.force_authenticate(self.student)
+
+    def complete(self, lesson):
+        return self.client.post(reverse('lesson-complete', args=[lesson.pk]))
+
+    def test_completion_updates_aggregates(self):
+        self.assertEqual(self.complete(self.lessons[0]).json()['progress'], 25)
+        self.assertEqual(self.complete(self.lessons[0]).status_code, 200)
+
+        with self.assertNumQueries(11):
+            response = self.complete(self.lessons[1])
+        self.assertEqual(response.json()['progress'], 50)
+
+        self.complete(self.lessons[2])
+        self.assertIsNotNone(self.complete(self.lessons[3]).json()['completion_date'])
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.completion_count, 1)
+
+    def test_curriculum_changes_rescale_progress(self):
+        self.complete(self.lessons[0])
+        self.lessons[3].is_active = False
+        self.lessons[3].save()
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.progress, 33)
+
+    def test_only_counted_changes_refresh_progress(self):
+        lesson = Lesson.objects.get(pk=self.lessons[0].pk)
+        with mock.patch('courses.signals.refresh_course_progress') as refresh:
+            lesson.title = 'Renamed'
+            lesson.save()
+            refresh.assert_not_called()
+
+            lesson.is_active = False
+            lesson.save()
+            refresh.assert_called_once()
+
+    def test_moved_lesson_rescales_both_courses(self):
+        other = Course.objects.create(
+            name='Databases', code='CS102', description='...', subject=self.subject, teacher=self.teacher
+        )
+        target = Module.objects.create(course=other, title='Module', order=0)
+        self.complete(self.lessons[0])
+
+        self.lessons[3].module = target
+        self.lessons[3].save()
+
+        self.enrollment.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.enrollment.progress, 33)
+        self.assertEqual(other.lesson_count, 1)
+
+    def test_new_lesson_reopens_finished_enrollment(self):
+        for lesson in self.lessons:
+            self.complete(lesson)
+
+        Lesson.objects.create(module=self.lessons[0].module, title='Extra', content='...', order=4)
+
+        self.enrollment.refresh_from_db()
+        self.course.refresh_from_db()
+        self.assertEqual(self.enrollment.progress, 80)
+        self.assertIsNone(self.enrollment.completion_date)
+        self.assertEqual(self.course.completion_count, 0)
+
+    def test_recompute_command_rebuilds_drifted_aggregates(self):
+        self.complete(self.lessons[0])
+        self.complete(self.lessons[1])
+        Enrollment.objects.update(progress=0, completed_lessons=0)
+        Course.objects.update(lesson_count=0)
+
+        call_command('recompute_progress', stdout=StringIO())
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual((self.enrollment.completed_lessons, self.enrollment.progress), (2, 50))
+
+    def test_students_cannot_patch_progress(self):
+        response = self.client.patch(reverse('enrollment-update', args=[self.enrollment.pk]), {'progress': 100})
+        self.assertEqual(response.status_code, 403)
+
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='resource-tests-')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ResourceDownloadTests(CourseTreeTestCase):
+    """Resource files are served with ranges and validators to enrolled users only"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        self.body = bytes(range(256)) * 4
+        self.resource = CourseResource.objects.create(
+            course=self.course, title='Lecture', file=ContentFile(self.body, 'lecture.mp4')
+        )
+        self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, self.resource.file.name)))
+        self.url = reverse('course-resource-download', args=[self.resource.id])
+        self.student = User.objects.create_user(
+            email='student@example.com', password='pass', role='student', username='student'
+        )
+        self.client.force_authenticate(self.student)
+
+    def test_requires_enrollment(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        Enrollment.objects.create(student=self.student, course=self.course)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range_requests(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.body)}')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join(response.streaming_content), self.body[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.body[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.body)}')
+
+        # A stale If-Range validator gets the whole file
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+    @override_settings(MEDIA_SERVE_MODE='x-accel')
+    def test_offload_to_front_end_server(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.resource.file.name)
+        self.assertEqual(response.content, b'')
@@ -3,8 +3,8 @@ from .views import (
     SubjectListView, SubjectDetailView, SubjectCreateUpdateDeleteView,
     CourseListView, CourseDetailView, CourseCreateUpdateDeleteView,
     ModuleListCreateView, ModuleDetailView,
-    LessonListCreateView, LessonDetailView,
-    EnrollmentListView, EnrollmentCreateView, EnrollmentDetailView,
+    LessonListCreateView, LessonDetailView, LessonCompleteView, CourseResourceDownloadView,
+    EnrollmentListView, EnrollmentCreateView, EnrollmentBulkCreateView, EnrollmentDetailView,
     LearningToolListView, LearningToolDetailView, LearningToolCreateUpdateDeleteView
 )
 
@@ -34,10 +34,15 @@ urlpatterns = [
     path('lessons/<int:pk>/', LessonDetailView.as_view(), name='lesson-detail'),
     path('lessons/<int:pk>/update/', LessonDetailView.as_view(), name='lesson-update'),
     path('lessons/<int:pk>/delete/', LessonDetailView.as_view(), name='lesson-delete'),
+    path('lessons/<int:pk>/complete/', LessonCompleteView.as_view(), name='lesson-complete'),
+    
+    # Resource endpoints
+    path('resources/<int:pk>/download/', CourseResourceDownloadView.as_view(), name='course-resource-download'),
     
     # Enrollment endpoints
     path('enrollments/', EnrollmentListView.as_view(), name='enrollment-list'),
     path('enrollments/create/', EnrollmentCreateView.as_view(), name='enrollment-create'),
+    path('enrollments/bulk/', EnrollmentBulkCreateView.as_view(), name='enrollment-bulk-create'),
     path('enrollments/<int:pk>/', EnrollmentDetailView.as_view(), name='enrollment-detail'),
     path('enrollments/<int:pk>/update/', EnrollmentDetailView.as_view(), name='enrollment-update'),
     path('enrollments/<int:pk>/delete/', EnrollmentDetailView.as_view(), name='enrollment-delete'),
@@ -1,10 +1,20 @@
+import os
+
 from rest_framework import status, permissions, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count
-
+from django.db.models import Prefetch
+
+from techiekraft.media import serve_file
+from techiekraft.pagination import KeysetPagination
+from techiekraft.streaming import wants_ndjson, ndjson_response
+from .bulk import RosterError, bulk_enroll, read_csv, summarize
+from .cache import cached_json_response
+from .progress import complete_lesson
+from .search import search_courses, full_text_enabled
 from .models import Subject, Course, Module, Lesson, Enrollment, LearningTool, CourseResource
 from .serializers import (
     SubjectSerializer, CourseSerializer, CourseDetailSerializer, CourseCreateUpdateSerializer,
@@ -25,6 +35,15 @@ class IsAdminUser(permissions.BasePermission):
         return request.user.is_authenticated and request.user.role in ['admin', 'admin_teacher']
 
 
+def can_view_course(user, course):
+    """Staff, the course teacher and actively enrolled students may view an active course's content"""
+    if not course.is_active:
+        return False
+    return (user.role in ['admin', 'admin_teacher', 'teacher'] or 
+            course.teacher_id == user.id or 
+            Enrollment.objects.filter(student=user, course=course, is_active=True).exists())
+
+
 class SubjectListView(generics.ListAPIView):
     """View for listing all subjects"""
     queryset = Subject.objects.all().order_by('name')
@@ -76,7 +95,8 @@ class CourseListView(APIView):
         level = request.query_params.get('level')
         
         # Base queryset
-        courses = Course.objects.select_related('subject', 'teacher').all()
+        courses = Course.objects.select_related('subject', 'teacher').defer('search_vector')
+        ordering = ('name', 'id')
         
         # Apply filters
         if subject_id:
@@ -84,31 +104,48 @@ class CourseListView(APIView):
         if teacher_id:
             courses = courses.filter(teacher_id=teacher_id)
         if search_query:
-            courses = courses.filter(
-                Q(name__icontains=search_query) | 
-                Q(description__icontains=search_query) |
-                Q(code__icontains=search_query)
-            )
+            courses = search_courses(courses, search_query)
+            if full_text_enabled():
+                # Best matches first
+                ordering = ('-search_rank', 'id')
         if is_active:
             is_active_bool = is_active.lower() == 'true'
             courses = courses.filter(is_active=is_active_bool)
         if level:
             courses = courses.filter(level=level)
         
-        # Ordering
-        courses = courses.order_by('name')
-        
-        serializer = CourseSerializer(courses, many=True)
-        return Response(serializer.data)
+        # Stream every matching course as NDJSON when asked to
+        if wants_ndjson(request):
+            return ndjson_response(courses.order_by(*ordering), CourseSerializer, context={'request': request})
+
+        # Keyset pagination on (name, id), or on rank when searching
+        paginator = KeysetPagination(ordering=ordering)
+        page = paginator.paginate_queryset(courses, request, view=self)
+        serializer = CourseSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+def course_detail_queryset():
+    """Course queryset that loads the whole detail tree in a fixed number of queries"""
+    lessons = Lesson.objects.filter(is_active=True).order_by('order', 'id')
+    modules = Module.objects.filter(is_active=True).order_by('order', 'id').prefetch_related(
+        Prefetch('lessons', queryset=lessons)
+    )
+    return Course.objects.select_related('subject', 'teacher').defer('search_vector').prefetch_related(
+        Prefetch('modules', queryset=modules),
+        Prefetch('resources', queryset=CourseResource.objects.order_by('id')),
+    )
 
 
 class CourseDetailView(APIView):
     """View for retrieving course details"""
     
     def get(self, request, pk):
-        course = get_object_or_404(Course.objects.select_related('subject', 'teacher'), pk=pk)
-        serializer = CourseDetailSerializer(course)
-        return Response(serializer.data)
+        def build():
+            course = get_object_or_404(course_detail_queryset(), pk=pk)
+            return CourseDetailSerializer(course).data
+        
+        return cached_json_response('detail', pk, build)
 
 
 class CourseCreateUpdateDeleteView(APIView):
@@ -155,9 +192,13 @@ class ModuleListCreateView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request, course_id):
-        modules = Module.objects.filter(course_id=course_id).order_by('order')
-        serializer = ModuleSerializer(modules, many=True)
-        return Response(serializer.data)
+        def build():
+            modules = Module.objects.filter(course_id=course_id).order_by('order').prefetch_related(
+                Prefetch('lessons', queryset=Lesson.objects.order_by('order'))
+            )
+            return ModuleSerializer(modules, many=True).data
+        
+        return cached_json_response('modules', course_id, build)
     
     def post(self, request, course_id):
         course = get_object_or_404(Course, pk=course_id)
@@ -216,9 +257,15 @@ class LessonListCreateView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request, module_id):
-        lessons = Lesson.objects.filter(module_id=module_id).order_by('order')
-        serializer = LessonSerializer(lessons, many=True)
-        return Response(serializer.data)
+        course_id = Module.objects.filter(pk=module_id).values_list('course_id', flat=True).first()
+        if course_id is None:
+            return Response([])
+        
+        def build():
+            lessons = Lesson.objects.filter(module_id=module_id).order_by('order')
+            return LessonSerializer(lessons, many=True).data
+        
+        return cached_json_response('lessons', course_id, build, module_id)
     
     def post(self, request, module_id):
         module = get_object_or_404(Module, pk=module_id)
@@ -245,15 +292,10 @@ class LessonDetailView(APIView):
     def get(self, request, pk):
         lesson = get_object_or_404(Lesson, pk=pk)
         
-        # For public courses or enrolled students, any authenticated user can view
-        course = lesson.module.course
-        if course.is_active:
-            # Check if user is enrolled or is a teacher/admin
-            if (request.user.role in ['admin', 'admin_teacher', 'teacher'] or 
-                course.teacher_id == request.user.id or 
-                Enrollment.objects.filter(student=request.user, course=course, is_active=True).exists()):
-                serializer = LessonSerializer(lesson)
-                return Response(serializer.data)
+        # Check if user is enrolled or is a teacher/admin
+        if can_view_course(request.user, lesson.module.course):
+            serializer = LessonSerializer(lesson)
+            return Response(serializer.data)
         
         return Response({"message": "You don't have permission to view this lesson"}, status=status.HTTP_403_FORBIDDEN)
     
@@ -283,10 +325,57 @@ class LessonDetailView(APIView):
         return Response({"message": "You don't have permission to delete this lesson"}, status=status.HTTP_403_FORBIDDEN)
 
 
+class LessonCompleteView(APIView):
+    """View for marking a lesson as completed by the current student"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        lesson = get_object_or_404(Lesson.objects.select_related('module'), pk=pk)
+        if not (lesson.is_active and lesson.module.is_active):
+            return Response({"message": "This lesson is not currently active"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        enrollment = Enrollment.objects.filter(
+            student=request.user, course_id=lesson.module.course_id, is_active=True
+        ).first()
+        if enrollment is None:
+            return Response({"message": "You are not enrolled in this course"}, status=status.HTTP_403_FORBIDDEN)
+        
+        created = complete_lesson(enrollment, lesson)
+        return Response({
+            "enrollment_id": enrollment.id,
+            "completed_lessons": enrollment.completed_lessons,
+            "progress": enrollment.progress,
+            "completion_date": enrollment.completion_date,
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class CourseResourceDownloadView(APIView):
+    """View for downloading a course resource file, with range and conditional request support"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        resource = get_object_or_404(CourseResource.objects.select_related('course'), pk=pk)
+        if not can_view_course(request.user, resource.course):
+            return Response({"message": "You don't have permission to view this resource"}, 
+                           status=status.HTTP_403_FORBIDDEN)
+        if not resource.file:
+            return Response({"message": "This resource has no file"}, status=status.HTTP_404_NOT_FOUND)
+        
+        extension = os.path.splitext(resource.file.name)[1]
+        return serve_file(request, resource.file.storage, resource.file.name, filename=f"{resource.title}{extension}",
+                          as_attachment=request.query_params.get('download') == '1')
+
+
 class EnrollmentListView(APIView):
     """View for listing enrollments"""
     permission_classes = [IsAuthenticated]
     
+    # Fields returned by the compact ?view=summary representation
+    summary_fields = [
+        'id', 'student_id', 'course_id', 'course__name', 'course__code',
+        'progress', 'enrollment_date', 'is_active', 'grade'
+    ]
+    
     def get(self, request):
         user = request.user
         course_id = request.query_params.get('course_id')
@@ -301,18 +390,18 @@ class EnrollmentListView(APIView):
         # Teachers can see enrollments for their courses
         elif user.role == 'teacher':
             if course_id:
-                course = get_object_or_404(Course, pk=course_id)
-                if course.teacher != user:
+                teacher_id = Course.objects.filter(pk=course_id).values_list('teacher_id', flat=True).first()
+                if teacher_id is None:
+                    raise Http404
+                if teacher_id != user.id:
                     return Response({"message": "You can only view enrollments for your own courses"}, 
                                    status=status.HTTP_403_FORBIDDEN)
-                enrollments = Enrollment.objects.filter(course=course)
-                if student_id:
-                    enrollments = enrollments.filter(student_id=student_id)
+                enrollments = Enrollment.objects.filter(course_id=course_id)
             else:
                 # Get all enrollments for courses taught by this teacher
                 enrollments = Enrollment.objects.filter(course__teacher=user)
-                if student_id:
-                    enrollments = enrollments.filter(student_id=student_id)
+            if student_id:
+                enrollments = enrollments.filter(student_id=student_id)
         
         # Admin users can see all enrollments
         elif user.role in ['admin', 'admin_teacher']:
@@ -324,22 +413,34 @@ class EnrollmentListView(APIView):
         
         # Parents can see enrollments for their children
         elif user.role == 'parent':
-            children = user.children.all()
-            enrollments = Enrollment.objects.filter(student__in=children)
+            # Join through the parent link instead of materialising the children first
+            enrollments = Enrollment.objects.filter(student__parents=user)
             if course_id:
                 enrollments = enrollments.filter(course_id=course_id)
-            if student_id and int(student_id) in children.values_list('id', flat=True):
-                enrollments = enrollments.filter(student_id=student_id)
-            else:
-                if student_id:
+            if student_id:
+                if not user.children.filter(pk=student_id).exists():
                     return Response({"message": "You can only view enrollments for your children"}, 
                                    status=status.HTTP_403_FORBIDDEN)
+                enrollments = enrollments.filter(student_id=student_id)
         
         else:
             return Response({"message": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
         
-        serializer = EnrollmentSerializer(enrollments, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination(ordering=('-enrollment_date', '-id'))
+        view = request.query_params.get('view')
+        
+        # Compact representations for dashboards skip the nested serializers entirely
+        if view == 'ids':
+            page = paginator.paginate_queryset(enrollments.values('id', 'enrollment_date'), request, view=self)
+            return paginator.get_paginated_response([row['id'] for row in page])
+        if view == 'summary':
+            page = paginator.paginate_queryset(enrollments.values(*self.summary_fields), request, view=self)
+            return paginator.get_paginated_response(page)
+        
+        enrollments = enrollments.select_related('student', 'course__subject', 'course__teacher')
+        page = paginator.paginate_queryset(enrollments.defer('course__search_vector'), request, view=self)
+        serializer = EnrollmentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class EnrollmentCreateView(APIView):
@@ -407,6 +508,35 @@ class EnrollmentCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class EnrollmentBulkCreateView(APIView):
+    """View for importing a roster of enrollments in one request"""
+    permission_classes = [IsTeacherOrAdmin]
+    
+    max_rows = 20000
+    
+    def post(self, request):
+        # Accept a CSV upload, a JSON list, or {"enrollments": [...]}
+        if 'file' in request.FILES:
+            try:
+                rows = read_csv(request.FILES['file'])
+            except RosterError as e:
+                return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            rows = request.data.get('enrollments')
+        
+        if not isinstance(rows, list) or not rows:
+            return Response({"message": "Provide a non-empty list of enrollments or a CSV file"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > self.max_rows:
+            return Response({"message": f"A roster can contain at most {self.max_rows} rows"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        results = bulk_enroll(rows)
+        return Response({"summary": summarize(results), "results": results})
+
+
 class EnrollmentDetailView(APIView):
     """View for retrieving, updating, and deleting enrollments"""
     permission_classes = [IsAuthenticated]
@@ -432,13 +562,13 @@ class EnrollmentDetailView(APIView):
         # Check permissions
         user = request.user
         if user.role == 'student':
-            # Students can only update their progress
+            # Students cannot update their enrollments directly
             if enrollment.student != user:
                 return Response({"message": "You can only update your own enrollments"}, 
                                status=status.HTTP_403_FORBIDDEN)
             
-            # Students can only update progress field
-            allowed_fields = ['progress']
+            # Progress follows lesson completions, see LessonCompleteView
+            allowed_fields = []
             for field in request.data:
                 if field not in allowed_fields:
                     return Response({"message": f"You don't have permission to update the {field} field"}, 
@@ -0,0 +1,74 @@
+"""
+Denormalized forum activity counters.
+
+``ForumTopic`` and ``ForumCategory`` carry ``post_count``, ``last_post`` and
+``last_activity_at``. Creating or deleting a post adjusts them with ``F()``
+updates in the same transaction as the post's own write, so listing pages
+never count posts. ``reconcile_forum_counters`` rebuilds them with one
+set-based UPDATE per table if they ever drift.
+"""
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from courses.progress import count_subquery
+from .models import ForumCategory, ForumTopic, ForumPost
+
+
+def latest_post(field, **filters):
+    return Subquery(ForumPost.objects.filter(**filters).order_by('-created_at', '-id').values(field)[:1])
+
+
+def latest_activity(**filters):
+    """Column values pointing at the latest post matching ``filters``, for set-based updates"""
+    return {
+        'last_post': latest_post('id', **filters),
+        'last_activity_at': latest_post('created_at', **filters),
+    }
+
+
+def post_added(post):
+    """Count ``post`` and make it the latest post unless a newer one already is"""
+    newer = Q(last_activity_at__isnull=True) | Q(last_activity_at__lte=post.created_at)
+    changes = {
+        'post_count': F('post_count') + 1,
+        'last_post': Case(When(newer, then=Value(post.pk)), default=F('last_post'), output_field=BigIntegerField()),
+        'last_activity_at': Greatest(Coalesce('last_activity_at', Value(post.created_at)), Value(post.created_at)),
+    }
+    ForumTopic.objects.filter(pk=post.topic_id).update(**changes)
+    ForumCategory.objects.filter(topics=post.topic_id).update(**changes)
+
+
+def post_removed(post):
+    """Uncount a deleted post; the latest post is looked up again through the topic index"""
+    ForumTopic.objects.filter(pk=post.topic_id).update(
+        post_count=Greatest(F('post_count') - 1, 0),
+        **latest_activity(topic=OuterRef('pk')),
+    )
+    ForumCategory.objects.filter(topics=post.topic_id).update(
+        post_count=Greatest(F('post_count') - 1, 0),
+        **latest_activity(topic__category=OuterRef('pk')),
+    )
+
+
+def topic_removed(topic):
+    """Recount the category of a deleted topic once rather than once per cascaded post"""
+    ForumCategory.objects.filter(pk=topic.category_id).update(
+        post_count=count_subquery(ForumPost.objects.filter(topic__category=OuterRef('pk')), 'topic__category'),
+        **latest_activity(topic__category=OuterRef('pk')),
+    )
+
+
+def reconcile_forum_counters():
+    """Rebuild every topic and category counter; returns the numbers of topics and categories written"""
+    with transaction.atomic():
+        topics = ForumTopic.objects.update(
+            post_count=count_subquery(ForumPost.objects.filter(topic=OuterRef('pk')), 'topic'),
+            **latest_activity(topic=OuterRef('pk')),
+        )
+        categories = ForumCategory.objects.update(
+            post_count=count_subquery(ForumPost.objects.filter(topic__category=OuterRef('pk')), 'topic__category'),
+            **latest_activity(topic__category=OuterRef('pk')),
+        )
+    return topics, categories
@@ -0,0 +1,60 @@
+"""
+Forum index, topic list and thread queries.
+
+Post counts and each topic's latest post are the columns maintained by
+``forum.counters``; only the category topic count is a correlated ``COUNT``
+subquery. A page of categories or topics therefore costs a single query no
+matter how many topics and posts sit behind it. Thread pages join in post
+creators, look up the topic's first post once and load reactions and
+attachments for the whole page, so long threads cost the same per page as
+short ones.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, OuterRef, Q, prefetch_related_objects
+
+from courses.progress import count_subquery
+from .models import ForumCategory, ForumTopic, ForumPost, ForumReaction
+
+
+def category_list():
+    """Active categories annotated with ``topic_count``"""
+    return ForumCategory.objects.filter(is_active=True).annotate(
+        topic_count=count_subquery(ForumTopic.objects.filter(category=OuterRef('pk')), 'category'),
+    )
+
+
+def topic_list(category):
+    """The category's topics with their creators and latest posts joined in"""
+    return ForumTopic.objects.filter(category=category).select_related('creator', 'last_post__creator')
+
+
+def thread_posts(topic):
+    return ForumPost.objects.filter(topic=topic).select_related('creator')
+
+
+def first_post_id(topic):
+    return ForumPost.objects.filter(topic=topic).order_by('created_at', 'id').values_list('id', flat=True).first()
+
+
+def attach_thread_details(posts, topic, user):
+    """Set ``is_first_post``, ``reaction_counts`` and ``user_reactions`` on a page of posts"""
+    first_id = first_post_id(topic) if posts else None
+    reactions = (
+        ForumReaction.objects.filter(post__in=posts).order_by()
+        .values('post_id', 'reaction_type')
+        .annotate(total=Count('id'), mine=Count('id', filter=Q(user=user)))
+    )
+    counts = defaultdict(dict)
+    mine = defaultdict(list)
+    for row in reactions:
+        counts[row['post_id']][row['reaction_type']] = row['total']
+        if row['mine']:
+            mine[row['post_id']].append(row['reaction_type'])
+    prefetch_related_objects(posts, 'attachments')
+    for post in posts:
+        post.is_first_post = post.id == first_id
+        post.reaction_counts = counts[post.id]
+        post.user_reactions = sorted(mine[post.id])
+    return posts
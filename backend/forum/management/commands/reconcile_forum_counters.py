@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from forum.counters import reconcile_forum_counters
+from forum.polls import recount_poll_tallies
+
+
+class Command(BaseCommand):
+    help = 'Rebuild forum post counts, latest posts and poll tallies from the post and vote tables'
+
+    def handle(self, *args, **options):
+        topics, categories = reconcile_forum_counters()
+        polls = recount_poll_tallies()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {topics} topics, {categories} categories and {polls} polls'))
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from uploads.storage import attachment_storage
 
 
 class ForumCategory(models.Model):
@@ -9,6 +10,11 @@ class ForumCategory(models.Model):
     icon_class = models.CharField(max_length=50, blank=True, null=True)
     order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    # Maintained by forum.counters
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    last_post = models.ForeignKey('ForumPost', on_delete=models.SET_NULL, blank=True, null=True,
+                                  related_name='+', editable=False)
+    last_activity_at = models.DateTimeField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -18,14 +24,6 @@ class ForumCategory(models.Model):
     
     def __str__(self):
         return self.name
-    
-    @property
-    def topic_count(self):
-        return self.topics.count()
-    
-    @property
-    def post_count(self):
-        return sum(topic.post_count for topic in self.topics.all())
 
 
 class ForumTopic(models.Model):
@@ -37,22 +35,23 @@ class ForumTopic(models.Model):
     is_pinned = models.BooleanField(default=False)
     is_locked = models.BooleanField(default=False)
     view_count = models.PositiveIntegerField(default=0)
+    # Maintained by forum.counters
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    last_post = models.ForeignKey('ForumPost', on_delete=models.SET_NULL, blank=True, null=True,
+                                  related_name='+', editable=False)
+    last_activity_at = models.DateTimeField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-is_pinned', '-updated_at']
+        indexes = [
+            # Keyset pages of a category's topic list
+            models.Index(fields=['category', '-is_pinned', '-updated_at', '-id'], name='forumtopic_category_idx'),
+        ]
     
     def __str__(self):
         return self.title
-    
-    @property
-    def post_count(self):
-        return self.posts.count()
-    
-    @property
-    def last_post(self):
-        return self.posts.order_by('-created_at').first()
 
 
 class ForumPost(models.Model):
@@ -67,20 +66,24 @@ class ForumPost(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Post counts and the latest post per topic
+            models.Index(fields=['topic', 'created_at', 'id'], name='forumpost_topic_created_idx'),
+        ]
     
     def __str__(self):
         return f"Post by {self.creator.email} in {self.topic.title}"
     
-    @property
-    def is_first_post(self):
-        first_post = self.topic.posts.order_by('created_at').first()
-        return first_post.id == self.id if first_post else False
+    def save(self, *args, **kwargs):
+        # post_save receivers adjust the topic and category counters; commit them with the post
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class ForumAttachment(models.Model):
     """File attachments for forum posts"""
     post = models.ForeignKey(ForumPost, on_delete=models.CASCADE, related_name='attachments')
-    file = models.FileField(upload_to='forum_attachments/')
+    file = models.FileField(upload_to='forum_attachments/', storage=attachment_storage)
     filename = models.CharField(max_length=255)
     file_type = models.CharField(max_length=100)
     size = models.PositiveIntegerField()  # Size in bytes
@@ -134,14 +137,12 @@ class ForumPoll(models.Model):
     allow_multiple_choices = models.BooleanField(default=False)
     end_date = models.DateTimeField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    # Maintained by forum.polls
+    total_votes = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"Poll: {self.question}"
-    
-    @property
-    def total_votes(self):
-        return sum(choice.votes.count() for choice in self.choices.all())
 
 
 class PollChoice(models.Model):
@@ -149,23 +150,14 @@ class PollChoice(models.Model):
     poll = models.ForeignKey(ForumPoll, on_delete=models.CASCADE, related_name='choices')
     text = models.CharField(max_length=255)
     order = models.PositiveIntegerField(default=0)
+    # Maintained by forum.polls
+    vote_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         ordering = ['order']
     
     def __str__(self):
         return self.text
-    
-    @property
-    def vote_count(self):
-        return self.votes.count()
-    
-    @property
-    def percentage(self):
-        total = self.poll.total_votes
-        if total > 0:
-            return (self.vote_count / total) * 100
-        return 0
 
 
 class PollVote(models.Model):
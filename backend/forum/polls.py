@@ -0,0 +1,101 @@
+"""
+Poll tallies and voting.
+
+``ForumPoll.total_votes`` and ``PollChoice.vote_count`` are cached tallies.
+``cast_vote`` replaces a user's votes and moves the tallies by the difference
+with ``F()`` updates in the same transaction, so results are read from one
+query over the poll's choices with percentages worked out in Python. If the
+tallies drift, ``recount_poll_tallies`` rebuilds them from one grouped
+aggregate over the votes.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ForumPoll, PollChoice, PollVote
+
+
+class VoteError(Exception):
+    pass
+
+
+def is_open(poll):
+    return poll.is_active and (poll.end_date is None or poll.end_date > timezone.now())
+
+
+def poll_results(poll, user=None):
+    """Tallies and percentages for every choice, plus the choices ``user`` voted for"""
+    choices = list(poll.choices.values('id', 'text', 'vote_count'))
+    total = sum(choice['vote_count'] for choice in choices)
+    for choice in choices:
+        choice['percentage'] = round(choice['vote_count'] * 100 / total, 1) if total else 0
+    results = {
+        'id': poll.id,
+        'question': poll.question,
+        'allow_multiple_choices': poll.allow_multiple_choices,
+        'is_open': is_open(poll),
+        'total_votes': total,
+        'choices': choices,
+    }
+    if user is not None:
+        results['user_choices'] = list(
+            PollVote.objects.filter(poll=poll, user=user).order_by('choice_id').values_list('choice_id', flat=True)
+        )
+    return results
+
+
+def cast_vote(poll, user, choice_ids):
+    """
+    Make ``choice_ids`` the user's votes in ``poll``, replacing earlier ones.
+
+    Only choices that changed touch the tallies, so re-submitting the same
+    vote writes nothing.
+    """
+    choice_ids = set(choice_ids)
+    if not is_open(poll):
+        raise VoteError("This poll is closed")
+    if not choice_ids:
+        raise VoteError("Choose at least one option")
+    if len(choice_ids) > 1 and not poll.allow_multiple_choices:
+        raise VoteError("This poll allows only one choice")
+    if PollChoice.objects.filter(poll=poll, pk__in=choice_ids).count() != len(choice_ids):
+        raise VoteError("Choices must belong to this poll")
+
+    with transaction.atomic():
+        # Lock the poll row: a first vote has no rows of its own to lock, so without this two
+        # concurrent submissions by one user could both insert and double-count
+        ForumPoll.objects.select_for_update().only('pk').get(pk=poll.pk)
+        previous = set(PollVote.objects.filter(poll=poll, user=user).values_list('choice_id', flat=True))
+        removed = previous - choice_ids
+        added = choice_ids - previous
+        if removed:
+            PollVote.objects.filter(poll=poll, user=user, choice_id__in=removed).delete()
+            PollChoice.objects.filter(pk__in=removed).update(vote_count=Greatest(F('vote_count') - 1, 0))
+        if added:
+            PollVote.objects.bulk_create([PollVote(poll=poll, user=user, choice_id=pk) for pk in added])
+            PollChoice.objects.filter(pk__in=added).update(vote_count=F('vote_count') + 1)
+        if len(added) != len(removed):
+            ForumPoll.objects.filter(pk=poll.pk).update(
+                total_votes=Greatest(F('total_votes') + len(added) - len(removed), 0)
+            )
+    return bool(added or removed)
+
+
+def recount_poll_tallies(polls=None):
+    """Rebuild cached tallies from one grouped aggregate; returns the number of polls written"""
+    polls = list(polls if polls is not None else ForumPoll.objects.all())
+    votes = PollVote.objects.filter(poll__in=polls).values('choice_id').annotate(n=Count('id'))
+    tallies = dict(votes.values_list('choice_id', 'n'))
+    choices = list(PollChoice.objects.filter(poll__in=polls))
+    totals = dict.fromkeys([poll.pk for poll in polls], 0)
+    for choice in choices:
+        choice.vote_count = tallies.get(choice.pk, 0)
+        totals[choice.poll_id] += choice.vote_count
+    for poll in polls:
+        poll.total_votes = totals[poll.pk]
+    with transaction.atomic():
+        PollChoice.objects.bulk_update(choices, ['vote_count'], batch_size=1000)
+        ForumPoll.objects.bulk_update(polls, ['total_votes'], batch_size=1000)
+    return len(polls)
@@ -0,0 +1,66 @@
+from rest_framework import serializers
+
+from messaging.serializers import ParticipantSerializer
+from .models import ForumCategory, ForumTopic, ForumPost, ForumAttachment
+
+
+class ForumCategorySerializer(serializers.ModelSerializer):
+    """Serializer for the forum index, built from ``forum.listings.category_list``"""
+    topic_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = ForumCategory
+        fields = ['id', 'name', 'description', 'icon_class', 'order', 'topic_count', 'post_count', 'last_activity_at']
+
+
+class ForumPostSummarySerializer(serializers.ModelSerializer):
+    """Compact post representation for topic lists"""
+    creator = ParticipantSerializer(read_only=True)
+    
+    class Meta:
+        model = ForumPost
+        fields = ['id', 'creator', 'created_at']
+
+
+class ForumTopicListSerializer(serializers.ModelSerializer):
+    """Serializer for topic lists with post counts and the latest post"""
+    creator = ParticipantSerializer(read_only=True)
+    last_post = ForumPostSummarySerializer(read_only=True)
+    
+    class Meta:
+        model = ForumTopic
+        fields = [
+            'id', 'category', 'title', 'creator', 'is_pinned', 'is_locked', 'view_count',
+            'post_count', 'last_post', 'last_activity_at', 'created_at', 'updated_at'
+        ]
+
+
+class ForumTopicDetailSerializer(ForumTopicListSerializer):
+    """Serializer for a single topic including its opening content"""
+    
+    class Meta(ForumTopicListSerializer.Meta):
+        fields = ForumTopicListSerializer.Meta.fields + ['content']
+
+
+class ForumAttachmentSerializer(serializers.ModelSerializer):
+    """Serializer for post attachment metadata"""
+    
+    class Meta:
+        model = ForumAttachment
+        fields = ['id', 'filename', 'file_type', 'size', 'uploaded_at']
+
+
+class ForumPostSerializer(serializers.ModelSerializer):
+    """Serializer for thread posts, built from ``forum.listings.attach_thread_details``"""
+    creator = ParticipantSerializer(read_only=True)
+    attachments = ForumAttachmentSerializer(many=True, read_only=True)
+    is_first_post = serializers.BooleanField(read_only=True)
+    reaction_counts = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    user_reactions = serializers.ListField(child=serializers.CharField(), read_only=True)
+    
+    class Meta:
+        model = ForumPost
+        fields = [
+            'id', 'topic', 'content', 'creator', 'is_edited', 'edited_at', 'created_at', 'updated_at',
+            'is_first_post', 'reaction_counts', 'user_reactions', 'attachments'
+        ]
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from messaging.fanout import schedule_forum_reply_notifications
+from .counters import post_added, post_removed, topic_removed
+from .models import ForumCategory, ForumTopic, ForumPost
+
+
+@receiver(post_save, sender=ForumPost)
+def count_new_post(sender, instance, created, **kwargs):
+    if created:
+        post_added(instance)
+
+
+@receiver(post_delete, sender=ForumPost)
+def uncount_deleted_post(sender, instance, origin=None, **kwargs):
+    # Posts removed along with their topic or category are accounted for once, below
+    if not isinstance(origin, (ForumTopic, ForumCategory)):
+        post_removed(instance)
+
+
+@receiver(post_delete, sender=ForumTopic)
+def uncount_deleted_topic(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, ForumTopic):
+        topic_removed(instance)
+
+
+@receiver(post_save, sender=ForumPost)
+def notify_subscribers(sender, instance, created, **kwargs):
+    """Topic subscribers are notified off-request, in batches"""
+    if created:
+        schedule_forum_reply_notifications(instance)
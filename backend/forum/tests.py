@@ -1,3 +1,302 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from messaging.models import Notification
+from .models import (
+    ForumCategory, ForumTopic, ForumPost, ForumSubscription, ForumReaction, ForumPoll, PollChoice, PollVote
+)
+from .view_counts import ViewCounter
+
+User = get_user_model()
+
+
+@override_settings(BACKGROUND_WORKERS=0)
+class ForumTestCase(TestCase):
+    """Creates a category with one topic, a few users and an authenticated client for the first one"""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                email=f'user{i}@example.com', password='pass', first_name=f'User{i}', last_name='Test',
+                role='student', username=f'user{i}'
+            )
+            for i in range(4)
+        ]
+        self.category = ForumCategory.objects.create(name='General')
+        self.topic = ForumTopic.objects.create(
+            category=self.category, title='Welcome', content='Say hello', creator=self.users[0]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def add_topic(self, title, posts=0, category=None, **kwargs):
+        topic = ForumTopic.objects.create(
+            category=category or self.category, title=title, content=title, creator=self.users[0], **kwargs
+        )
+        for i in range(posts):
+            ForumPost.objects.create(topic=topic, content=f'{title} {i}', creator=self.users[1 + i % 3])
+        return topic
+
+
+class ReplyNotificationTests(ForumTestCase):
+    """Subscribers get one coalesced notification per topic"""
+
+    def test_replies_notify_subscribers(self):
+        for user in self.users[:3]:
+            ForumSubscription.objects.create(user=user, topic=self.topic)
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                ForumPost.objects.create(topic=self.topic, content='Hello', creator=self.users[1])
+
+        notifications = Notification.objects.filter(topic=self.topic).order_by('user_id')
+        self.assertEqual([(n.user_id, n.count) for n in notifications], [(self.users[0].id, 2), (self.users[2].id, 2)])
+        self.assertEqual(notifications[0].text, 'New replies in Welcome')
+
+
+class ListingTests(ForumTestCase):
+    """Category and topic lists cost a fixed number of queries"""
+
+    def test_category_list(self):
+        other = ForumCategory.objects.create(name='Homework', order=1)
+        ForumCategory.objects.create(name='Archived', order=2, is_active=False)
+        for i in range(3):
+            self.add_topic(f'Topic {i}', posts=2)
+        self.add_topic('Elsewhere', posts=1, category=other)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('forum-category-list'))
+        self.assertEqual([c['name'] for c in response.data], ['General', 'Homework'])
+        self.assertEqual([c['topic_count'] for c in response.data], [4, 1])
+        self.assertEqual([c['post_count'] for c in response.data], [6, 1])
+
+    def test_topic_list_query_count_is_constant(self):
+        self.add_topic('Pinned', posts=1, is_pinned=True)
+        self.add_topic('Busy', posts=3)
+        url = reverse('forum-topic-list', args=[self.category.pk])
+
+        # Category, then topics with their creators and latest posts
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        topics = response.data['results']
+        self.assertEqual([t['title'] for t in topics], ['Pinned', 'Busy', 'Welcome'])
+        self.assertEqual([t['post_count'] for t in topics], [1, 3, 0])
+        self.assertEqual(topics[1]['last_post']['creator']['id'], self.users[3].id)
+        self.assertIsNone(topics[2]['last_post'])
+
+        for i in range(10):
+            self.add_topic(f'More {i}', posts=2)
+        with self.assertNumQueries(2):
+            self.client.get(url, {'page_size': 20})
+
+    def test_topic_list_pages(self):
+        for i in range(4):
+            self.add_topic(f'Topic {i}')
+        url = reverse('forum-topic-list', args=[self.category.pk])
+        first = self.client.get(url, {'page_size': 3}).data
+        second = self.client.get(first['next']).data
+        self.assertIsNone(second['next'])
+        titles = [t['title'] for t in first['results'] + second['results']]
+        self.assertEqual(sorted(titles), sorted(ForumTopic.objects.values_list('title', flat=True)))
+
+
+class CounterTests(ForumTestCase):
+    """Topic and category counters follow post writes and can be reconciled"""
+
+    def assertCounters(self, obj, post_count, last_post):
+        obj.refresh_from_db()
+        self.assertEqual(obj.post_count, post_count)
+        self.assertEqual(obj.last_post_id, last_post.id if last_post else None)
+        self.assertEqual(obj.last_activity_at, last_post.created_at if last_post else None)
+
+    def test_posts_adjust_counters(self):
+        first = ForumPost.objects.create(topic=self.topic, content='First', creator=self.users[1])
+        second = ForumPost.objects.create(topic=self.topic, content='Second', creator=self.users[2])
+        other = self.add_topic('Other', posts=1)
+        self.assertCounters(self.topic, 2, second)
+        self.assertCounters(self.category, 3, other.posts.get())
+
+        second.delete()
+        self.assertCounters(self.topic, 1, first)
+        other.posts.get().delete()
+        self.assertCounters(self.category, 1, first)
+
+    def test_deleting_topic_recounts_category(self):
+        self.add_topic('Doomed', posts=3)
+        kept = ForumPost.objects.create(topic=self.topic, content='Kept', creator=self.users[1])
+        ForumTopic.objects.get(title='Doomed').delete()
+        self.assertCounters(self.category, 1, kept)
+
+    def test_counter_failure_rolls_back_post(self):
+        with mock.patch('forum.signals.post_added', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                ForumPost.objects.create(topic=self.topic, content='Lost', creator=self.users[1])
+        self.assertFalse(ForumPost.objects.exists())
+
+    def test_reconcile_repairs_drift(self):
+        post = ForumPost.objects.create(topic=self.topic, content='Hello', creator=self.users[1])
+        ForumTopic.objects.update(post_count=7, last_post=None)
+        ForumCategory.objects.update(post_count=0, last_activity_at=None)
+
+        call_command('reconcile_forum_counters', stdout=mock.MagicMock())
+        self.assertCounters(self.topic, 1, post)
+        self.assertCounters(self.category, 1, post)
+
+
+@override_settings(FORUM_VIEW_FLUSH_INTERVAL=3600, FORUM_VIEW_FLUSH_THRESHOLD=5)
+class ViewCountTests(ForumTestCase):
+    """Topic views are buffered and flushed without touching updated_at"""
+
+    def test_views_are_buffered_and_grouped(self):
+        other = self.add_topic('Other')
+        updated_at = ForumTopic.objects.get(pk=self.topic.pk).updated_at
+        counter = ViewCounter()
+        for topic_id in [self.topic.pk, self.topic.pk, other.pk, other.pk]:
+            counter.record(topic_id)
+        self.assertEqual(ForumTopic.objects.get(pk=self.topic.pk).view_count, 0)
+
+        # Both topics gained two views, so one UPDATE covers them
+        with self.assertNumQueries(1):
+            self.assertEqual(counter.flush(), 2)
+        self.assertEqual(dict(ForumTopic.objects.values_list('title', 'view_count')), {'Welcome': 2, 'Other': 2})
+        self.assertEqual(ForumTopic.objects.get(pk=self.topic.pk).updated_at, updated_at)
+
+    def test_threshold_triggers_flush(self):
+        counter = ViewCounter()
+        for _ in range(5):
+            counter.record(self.topic.pk)
+        self.assertEqual(ForumTopic.objects.get(pk=self.topic.pk).view_count, 5)
+        self.assertFalse(counter.pending)
+
+    def test_only_one_flush_is_scheduled_at_a_time(self):
+        counter = ViewCounter()
+        with mock.patch('forum.view_counts.submit') as submit:
+            for _ in range(8):
+                counter.record(self.topic.pk)
+            submit.assert_called_once_with(counter.flush)
+
+            counter.flush()
+            for _ in range(5):
+                counter.record(self.topic.pk)
+        self.assertEqual(submit.call_count, 2)
+        counter.timer.cancel()
+
+    def test_timer_flushes_a_quiet_process(self):
+        counter = ViewCounter()
+        counter.record(self.topic.pk)
+        self.assertTrue(counter.timer.is_alive())
+        counter.timer.cancel()
+
+        # What the timer runs once the interval passes with no further views
+        counter.flush_due()
+        self.assertEqual(ForumTopic.objects.get(pk=self.topic.pk).view_count, 1)
+        self.assertIsNone(counter.timer)
+        self.assertFalse(counter.flush_scheduled)
+
+    def test_detail_view_counts_pending_views(self):
+        with mock.patch('forum.view_counts.view_counter', ViewCounter()):
+            url = reverse('forum-topic-detail', args=[self.topic.pk])
+            self.assertEqual(self.client.get(url).data['view_count'], 1)
+            self.assertEqual(self.client.get(url).data['view_count'], 2)
+
+
+class PollTests(ForumTestCase):
+    """Poll results come from cached tallies kept up to date by voting"""
+
+    def setUp(self):
+        super().setUp()
+        self.poll = ForumPoll.objects.create(topic=self.topic, question='Best day?')
+        self.choices = [PollChoice.objects.create(poll=self.poll, text=day, order=i)
+                        for i, day in enumerate(['Mon', 'Tue', 'Wed', 'Thu'])]
+        self.vote_url = reverse('forum-poll-vote', args=[self.topic.pk])
+
+    def vote(self, user, *choices):
+        self.client.force_authenticate(user)
+        return self.client.post(self.vote_url, {'choices': [c.pk for c in choices]}, format='json')
+
+    def test_results_query_count_is_constant(self):
+        for user, choice in zip(self.users, [0, 0, 1, 3]):
+            self.vote(user, self.choices[choice])
+
+        # Poll, choices and the user's own votes, however many choices there are
+        with self.assertNumQueries(3):
+            results = self.client.get(reverse('forum-poll', args=[self.topic.pk])).data
+        self.assertEqual(results['total_votes'], 4)
+        self.assertEqual([c['vote_count'] for c in results['choices']], [2, 1, 0, 1])
+        self.assertEqual([c['percentage'] for c in results['choices']], [50.0, 25.0, 0, 25.0])
+        self.assertEqual(results['user_choices'], [self.choices[3].pk])
+
+    def test_changing_vote_moves_tallies(self):
+        self.vote(self.users[0], self.choices[0])
+        response = self.vote(self.users[0], self.choices[1])
+        self.assertEqual([c['vote_count'] for c in response.data['choices']], [0, 1, 0, 0])
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.total_votes, 1)
+
+    def test_votes_lock_the_poll_row(self):
+        manager = ForumPoll.objects
+        with mock.patch.object(manager, 'select_for_update', wraps=manager.select_for_update) as lock:
+            self.vote(self.users[0], self.choices[0])
+        lock.assert_called_once_with()
+
+    def test_invalid_votes_are_rejected(self):
+        other = PollChoice.objects.create(
+            poll=ForumPoll.objects.create(topic=self.add_topic('Other'), question='?'), text='Elsewhere'
+        )
+        self.assertEqual(self.vote(self.users[0], self.choices[0], self.choices[1]).status_code, 400)
+        self.assertEqual(self.vote(self.users[0], other).status_code, 400)
+        for choices in ([True], [str(self.choices[0].pk)], self.choices[0].pk):
+            response = self.client.post(self.vote_url, {'choices': choices}, format='json')
+            self.assertEqual(response.status_code, 400)
+        ForumPoll.objects.filter(pk=self.poll.pk).update(is_active=False)
+        self.assertEqual(self.vote(self.users[0], self.choices[0]).status_code, 400)
+        self.assertFalse(PollVote.objects.exists())
+
+    def test_reconcile_recounts_tallies(self):
+        self.poll.allow_multiple_choices = True
+        self.poll.save()
+        self.vote(self.users[0], self.choices[0], self.choices[2])
+        self.vote(self.users[1], self.choices[2])
+        PollChoice.objects.update(vote_count=9)
+
+        call_command('reconcile_forum_counters', stdout=mock.MagicMock())
+        self.assertEqual(list(PollChoice.objects.values_list('vote_count', flat=True)), [1, 0, 2, 0])
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.total_votes, 3)
+
+
+class ThreadTests(ForumTestCase):
+    """Thread pages cost a fixed number of queries however long the thread is"""
+
+    def setUp(self):
+        super().setUp()
+        self.posts = [
+            ForumPost.objects.create(topic=self.topic, content=f'Post {i}', creator=self.users[i % 4])
+            for i in range(12)
+        ]
+        for user in self.users[:3]:
+            ForumReaction.objects.create(post=self.posts[1], user=user, reaction_type='like')
+        ForumReaction.objects.create(post=self.posts[1], user=self.users[0], reaction_type='thanks')
+        self.url = reverse('forum-thread', args=[self.topic.pk])
+
+    def test_thread_pages(self):
+        # Topic, posts with creators, first post, reactions and attachments
+        with self.assertNumQueries(5):
+            first = self.client.get(self.url, {'page_size': 5}).data
+        posts = first['results']
+        self.assertEqual([p['is_first_post'] for p in posts], [True] + [False] * 4)
+        self.assertEqual(posts[1]['reaction_counts'], {'like': 3, 'thanks': 1})
+        self.assertEqual(posts[1]['user_reactions'], ['like', 'thanks'])
+        self.assertEqual(posts[2]['creator']['id'], self.users[2].id)
+
+        with self.assertNumQueries(5):
+            second = self.client.get(first['next']).data
+        self.assertFalse(any(p['is_first_post'] for p in second['results']))
+
+        with self.assertNumQueries(5):
+            everything = self.client.get(self.url, {'page_size': 50}).data
+        self.assertEqual([p['id'] for p in everything['results']], [p.id for p in self.posts])
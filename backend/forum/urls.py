@@ -1,3 +1,14 @@
 from django.urls import path
+from .views import (
+    ForumCategoryListView, ForumTopicListView, ForumTopicDetailView, ForumThreadView, ForumPollView,
+    ForumPollVoteView
+)
 
-urlpatterns = []
\ No newline at end of file
+urlpatterns = [
+    path('categories/', ForumCategoryListView.as_view(), name='forum-category-list'),
+    path('categories/<int:pk>/topics/', ForumTopicListView.as_view(), name='forum-topic-list'),
+    path('topics/<int:pk>/', ForumTopicDetailView.as_view(), name='forum-topic-detail'),
+    path('topics/<int:pk>/posts/', ForumThreadView.as_view(), name='forum-thread'),
+    path('topics/<int:pk>/poll/', ForumPollView.as_view(), name='forum-poll'),
+    path('topics/<int:pk>/poll/vote/', ForumPollVoteView.as_view(), name='forum-poll-vote'),
+]
@@ -0,0 +1,95 @@
+"""
+Buffered topic view counts.
+
+Viewing a topic only bumps an in-process counter. Pending views are written
+back by a timer ``FORUM_VIEW_FLUSH_INTERVAL`` seconds after the first of them
+was buffered, as soon as ``FORUM_VIEW_FLUSH_THRESHOLD`` views have piled up,
+and once more at exit. Only one flush is scheduled at a time.
+A flush issues one ``UPDATE ... SET view_count = view_count + n`` per distinct
+``n`` on the worker pool, so hot topics take one row lock per flush instead of
+one per view. ``update()`` skips ``auto_now``, so views never touch
+``updated_at`` or reorder the topic list. Each process buffers its own views;
+increments are additive, so processes never overwrite each other.
+"""
+
+import atexit
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import F
+
+from techiekraft.workers import submit
+from .models import ForumTopic
+
+
+class ViewCounter:
+    """Accumulates topic views and flushes them in grouped UPDATEs"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.flush_scheduled = False
+        self.timer = None
+
+    def record(self, topic_id, views=1):
+        """Buffer views of a topic; returns the views of it not yet written"""
+        with self.lock:
+            self.pending[topic_id] += views
+            unwritten = self.pending[topic_id]
+            self.start_timer()
+            due = not self.flush_scheduled and sum(self.pending.values()) >= settings.FORUM_VIEW_FLUSH_THRESHOLD
+            if due:
+                self.flush_scheduled = True
+        if due:
+            submit(self.flush)
+        return unwritten
+
+    def start_timer(self):
+        # Called with the lock held. The timer bounds how long views wait in a quiet process
+        if self.timer is None:
+            self.timer = threading.Timer(settings.FORUM_VIEW_FLUSH_INTERVAL, self.flush_due)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush_due(self):
+        """Timer callback: flush pending views unless a flush is already on its way"""
+        with self.lock:
+            self.timer = None
+            due = bool(self.pending) and not self.flush_scheduled
+            if due:
+                self.flush_scheduled = True
+        if due:
+            submit(self.flush)
+
+    def take(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.flush_scheduled = False
+        return pending
+
+    def flush(self):
+        """Write pending views; returns the number of topics updated"""
+        pending = self.take()
+        by_increment = defaultdict(list)
+        for topic_id, views in pending.items():
+            by_increment[views].append(topic_id)
+        try:
+            for views, topic_ids in by_increment.items():
+                ForumTopic.objects.filter(pk__in=topic_ids).update(view_count=F('view_count') + views)
+        except Exception:
+            # Put the views back for the next flush rather than losing them
+            with self.lock:
+                self.pending.update(pending)
+                self.start_timer()
+            raise
+        return len(pending)
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
+
+
+def record_view(topic):
+    """Count a view of ``topic`` and reflect it on the instance without saving"""
+    topic.view_count += view_counter.record(topic.pk)
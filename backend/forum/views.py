@@ -1,9 +1,19 @@
 
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .models import ForumCategory, ForumTopic, ForumPost
+from rest_framework.views import APIView
+
+from techiekraft.pagination import KeysetPagination
+from .listings import category_list, topic_list, thread_posts, attach_thread_details
+from .models import ForumCategory, ForumTopic, ForumPost, ForumPoll
+from .polls import VoteError, cast_vote, poll_results
+from .serializers import (
+    ForumCategorySerializer, ForumTopicListSerializer, ForumTopicDetailSerializer, ForumPostSerializer
+)
+from .view_counts import record_view
 
 class ParentForumViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
@@ -42,3 +52,77 @@ def get_school_announcements(request):
         'created_at': a.created_at,
         'is_pinned': a.is_pinned
     } for a in announcements])
+
+
+class ForumCategoryListView(APIView):
+    """View for listing active forum categories with topic and post counts"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        serializer = ForumCategorySerializer(category_list(), many=True, context={'request': request})
+        return Response(serializer.data)
+
+
+class ForumTopicListView(APIView):
+    """View for listing a category's topics, pinned and most recently updated first"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        category = get_object_or_404(ForumCategory, pk=pk, is_active=True)
+        paginator = KeysetPagination(ordering=('-is_pinned', '-updated_at', '-id'))
+        page = paginator.paginate_queryset(topic_list(category), request, view=self)
+        serializer = ForumTopicListSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ForumTopicDetailView(APIView):
+    """View for reading a topic; each read counts as a view"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        topic = get_object_or_404(
+            ForumTopic.objects.select_related('creator', 'last_post__creator'), pk=pk, category__is_active=True
+        )
+        record_view(topic)
+        serializer = ForumTopicDetailSerializer(topic, context={'request': request})
+        return Response(serializer.data)
+
+
+class ForumThreadView(APIView):
+    """View for listing a topic's posts, oldest first"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        topic = get_object_or_404(ForumTopic, pk=pk, category__is_active=True)
+        paginator = KeysetPagination(ordering=('created_at', 'id'))
+        page = paginator.paginate_queryset(thread_posts(topic), request, view=self)
+        attach_thread_details(page, topic, request.user)
+        serializer = ForumPostSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ForumPollView(APIView):
+    """View for a topic's poll results"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        poll = get_object_or_404(ForumPoll, topic_id=pk, topic__category__is_active=True)
+        return Response(poll_results(poll, request.user))
+
+
+class ForumPollVoteView(APIView):
+    """View for casting or changing a vote in a topic's poll"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        poll = get_object_or_404(ForumPoll, topic_id=pk, topic__category__is_active=True)
+        choice_ids = request.data.get('choices')
+        if not isinstance(choice_ids, list) or not all(
+            isinstance(c, int) and not isinstance(c, bool) for c in choice_ids
+        ):
+            return Response({"message": "choices must be a list of choice ids"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            cast_vote(poll, request.user, choice_ids)
+        except VoteError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(poll_results(poll, request.user))
@@ -0,0 +1,68 @@
+"""
+Denormalized unread counters.
+
+``UnreadCounter`` rows are adjusted with ``F()`` updates by the number of
+rows a write actually changed, so showing a badge never counts messages. A
+user's row is created from a one-off count the first time it is read, so
+adjustments simply skip users without one; ``recount_unread`` rebuilds rows
+if they ever drift.
+"""
+
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Message, Notification, UnreadCounter
+
+
+def count_unread(user_id):
+    return {
+        'messages': Message.objects.filter(receiver_id=user_id, is_read=False).count(),
+        'notifications': Notification.objects.filter(user_id=user_id, is_read=False).count(),
+    }
+
+
+def get_unread(user_id):
+    counter = UnreadCounter.objects.filter(user_id=user_id).first()
+    if counter is None:
+        counter, _ = UnreadCounter.objects.get_or_create(user_id=user_id, defaults=count_unread(user_id))
+    return counter
+
+
+def adjust_unread(user_id, messages=0, notifications=0):
+    """Add the given deltas to a user's counters, never going below zero"""
+    changes = {}
+    if messages:
+        changes['messages'] = Greatest(F('messages') + messages, 0)
+    if notifications:
+        changes['notifications'] = Greatest(F('notifications') + notifications, 0)
+    # Users without a row yet get an exact count the first time it is read
+    if changes:
+        UnreadCounter.objects.filter(user_id=user_id).update(**changes)
+
+
+def adjust_unread_many(user_ids, notifications=0):
+    """Add the same notification delta to many users' counters with one UPDATE"""
+    if user_ids and notifications:
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(
+            notifications=Greatest(F('notifications') + notifications, 0)
+        )
+
+
+def recount_unread(user_ids=None):
+    """Rebuild existing counters with two GROUP BY queries; returns the number of rows written"""
+    counters = UnreadCounter.objects.all()
+    messages = Message.objects.filter(is_read=False)
+    notifications = Notification.objects.filter(is_read=False)
+    if user_ids is not None:
+        counters = counters.filter(user_id__in=user_ids)
+        messages = messages.filter(receiver_id__in=user_ids)
+        notifications = notifications.filter(user_id__in=user_ids)
+
+    unread_messages = dict(messages.values('receiver_id').annotate(n=Count('id')).values_list('receiver_id', 'n'))
+    unread_notifications = dict(notifications.values('user_id').annotate(n=Count('id')).values_list('user_id', 'n'))
+    counters = list(counters)
+    for counter in counters:
+        counter.messages = unread_messages.get(counter.user_id, 0)
+        counter.notifications = unread_notifications.get(counter.user_id, 0)
+    UnreadCounter.objects.bulk_update(counters, ['messages', 'notifications'], batch_size=1000)
+    return len(counters)
@@ -0,0 +1,105 @@
+"""
+Notification fan-out.
+
+Events with many recipients (a message to a class-wide conversation, a reply
+in a topic with hundreds of subscribers) are turned into notifications on
+the worker pool after the triggering transaction commits. Recipients are
+resolved with one query, and each chunk of ``NOTIFICATION_BATCH_SIZE``
+recipients costs a constant number of statements: recipients who still have
+an unread notification with the same ``group_key`` get it coalesced
+("3 new replies") with one UPDATE, the rest get one ``bulk_create``, and
+their unread counters are bumped with one UPDATE.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from techiekraft.workers import submit_on_commit
+from .counters import adjust_unread_many
+from .models import Conversation, GroupMessage, Notification
+from .realtime import publish_to_users, notification_event
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def deliver_notifications(recipient_ids, notification_type, text, coalesced_text=None, group_key='', **targets):
+    """
+    Notify every user in ``recipient_ids``.
+    
+    ``targets`` are the notification's foreign keys (``group_message_id``,
+    ``topic_id``, ...); coalesced notifications are repointed at them and
+    their text replaced by ``coalesced_text``. Returns the number of rows
+    created.
+    """
+    created_total = 0
+    for chunk in chunked(sorted(set(recipient_ids)), settings.NOTIFICATION_BATCH_SIZE):
+        with transaction.atomic():
+            coalesced = {}
+            if group_key:
+                coalesced = dict(
+                    Notification.objects.filter(group_key=group_key, is_read=False, user_id__in=chunk)
+                    .values_list('user_id', 'id')
+                )
+                Notification.objects.filter(pk__in=coalesced.values()).update(
+                    count=F('count') + 1, text=coalesced_text or text, **targets
+                )
+            created = Notification.objects.bulk_create([
+                Notification(user_id=user_id, notification_type=notification_type, text=text,
+                             group_key=group_key, **targets)
+                for user_id in chunk if user_id not in coalesced
+            ])
+            # bulk_create skips post_save, so counters and pushes are handled here
+            adjust_unread_many([notification.user_id for notification in created], notifications=1)
+            updated = list(Notification.objects.filter(pk__in=coalesced.values())) if coalesced else []
+        for notification in created + updated:
+            publish_to_users([notification.user_id], notification_event(notification))
+        created_total += len(created)
+    return created_total
+
+
+def notify_group_message(group_message_id):
+    group_message = GroupMessage.objects.select_related('conversation', 'sender').filter(pk=group_message_id).first()
+    if group_message is None:
+        return 0
+    conversation = group_message.conversation
+    recipient_ids = Conversation.participants.through.objects.filter(
+        conversation_id=conversation.id
+    ).exclude(user_id=group_message.sender_id).values_list('user_id', flat=True)
+    title = conversation.title or 'a conversation'
+    return deliver_notifications(
+        list(recipient_ids), 'group_message',
+        text=f'{group_message.sender.full_name} sent a message in {title}'[:255],
+        coalesced_text=f'New messages in {title}'[:255],
+        group_key=f'conversation:{conversation.id}',
+        group_message_id=group_message.id,
+    )
+
+
+def notify_forum_reply(post_id):
+    from forum.models import ForumPost, ForumSubscription
+
+    post = ForumPost.objects.select_related('topic', 'creator').filter(pk=post_id).first()
+    if post is None:
+        return 0
+    recipient_ids = ForumSubscription.objects.filter(topic_id=post.topic_id).exclude(
+        user_id=post.creator_id
+    ).values_list('user_id', flat=True)
+    return deliver_notifications(
+        list(recipient_ids), 'forum_reply',
+        text=f'{post.creator.full_name} replied in {post.topic.title}'[:255],
+        coalesced_text=f'New replies in {post.topic.title}'[:255],
+        group_key=f'topic:{post.topic_id}',
+        topic_id=post.topic_id,
+    )
+
+
+def schedule_group_message_notifications(group_message):
+    submit_on_commit(notify_group_message, group_message.id)
+
+
+def schedule_forum_reply_notifications(post):
+    submit_on_commit(notify_forum_reply, post.id)
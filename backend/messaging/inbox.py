@@ -0,0 +1,67 @@
+"""
+Inbox and conversation list queries.
+
+Direct messages have no conversation row, so the inbox groups a user's sent
+and received messages by the other participant: one aggregate query yields
+each thread's latest timestamp, latest message id and unread count, and one
+``in_bulk`` fetch loads the latest messages of the page. Group conversations
+get their latest message id from a correlated subquery served by the
+``(conversation, sent_at, id)`` index and their unread count from the
+user's read watermark (``messaging.watermarks``). Both are ordered for keyset
+pagination, so every page costs the same handful of queries.
+"""
+
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce
+
+from .models import Message, GroupMessage, Conversation
+from .watermarks import annotate_unread_counts
+
+
+def inbox_threads(user):
+    """``values()`` rows of ``other_id``, ``last_sent_at``, ``last_message_id`` and ``unread_count``"""
+    other = Case(When(sender=user, then=F('receiver_id')), default=F('sender_id'))
+    return (
+        Message.objects.filter(Q(sender=user) | Q(receiver=user))
+        .annotate(other_id=other)
+        .values('other_id')
+        .annotate(
+            last_sent_at=Max('sent_at'),
+            # Ids grow with sent_at, so the highest id is the latest message
+            last_message_id=Max('id'),
+            unread_count=Count('id', filter=Q(receiver=user, is_read=False)),
+        )
+    )
+
+
+def attach_last_messages(rows):
+    """Set ``row['last_message']`` for a page of inbox rows with one query"""
+    latest = Message.objects.select_related('sender', 'receiver').in_bulk([row['last_message_id'] for row in rows])
+    for row in rows:
+        row['last_message'] = latest.get(row['last_message_id'])
+    return rows
+
+
+def latest_group_message(field):
+    return Subquery(
+        GroupMessage.objects.filter(conversation=OuterRef('pk'))
+        .order_by('-sent_at', '-id').values(field)[:1]
+    )
+
+
+def conversation_list(user):
+    """The user's conversations annotated with their latest message, activity time and unread count"""
+    conversations = Conversation.objects.filter(participants=user).annotate(
+        last_group_message_id=latest_group_message('id'),
+        last_activity_at=Coalesce(latest_group_message('sent_at'), 'created_at'),
+    )
+    return annotate_unread_counts(conversations, user)
+
+
+def attach_last_group_messages(conversations):
+    latest = GroupMessage.objects.select_related('sender').in_bulk(
+        [c.last_group_message_id for c in conversations if c.last_group_message_id is not None]
+    )
+    for conversation in conversations:
+        conversation.latest_message = latest.get(conversation.last_group_message_id)
+    return conversations
@@ -0,0 +1,123 @@
+import asyncio
+import resource
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+
+from messaging.realtime import get_broker, user_channel
+from techiekraft.asgi import application
+
+User = get_user_model()
+
+
+class Connection:
+    """One simulated browser holding an event stream open against the ASGI application"""
+
+    def __init__(self, index, session_key):
+        self.scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': '/api/messages/stream/', 'raw_path': b'/api/messages/stream/',
+            'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'cookie', f'{settings.SESSION_COOKIE_NAME}={session_key}'.encode())],
+            'client': ('127.0.0.1', 10000 + index), 'server': ('localhost', 80),
+        }
+        self.requested = False
+        self.disconnected = asyncio.Event()
+        self.status = None
+        self.received = 0
+        self.delivered = asyncio.Event()
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        elif message['type'] == 'http.response.body' and message.get('body', b'').startswith(b'id:'):
+            self.received += 1
+            self.delivered.set()
+
+    def run(self):
+        return asyncio.ensure_future(application(self.scope, self.receive, self.send))
+
+
+class Command(BaseCommand):
+    help = ('Hold many event-stream connections open on one event loop (one core) and measure fan-out; '
+            'the benchmark users are deleted afterwards')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=2000)
+        parser.add_argument('--rounds', type=int, default=20, help='Events published to every connection')
+        parser.add_argument('--rate', type=float, default=6,
+                            help='Events per connection per minute assumed for the connections-per-core estimate')
+
+    def handle(self, *args, **options):
+        count = options['connections']
+        User.objects.bulk_create(
+            User(email=f'realtime-bench-{i}@example.com', username=f'realtime-bench-{i}', password='!',
+                 first_name='Bench', last_name=str(i))
+            for i in range(count)
+        )
+        users = list(User.objects.filter(email__startswith='realtime-bench-').order_by('id'))
+        try:
+            session_keys = [self.login(user) for user in users]
+            asyncio.run(self.run(users, session_keys, options))
+        finally:
+            User.objects.filter(email__startswith='realtime-bench-').delete()
+
+    def login(self, user):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
+
+    async def run(self, users, session_keys, options):
+        broker = get_broker()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        connections = [Connection(i, key) for i, key in enumerate(session_keys)]
+        tasks = [connection.run() for connection in connections]
+        while broker.connection_count() < len(connections):
+            if any(task.done() for task in tasks):
+                failed = next(c for c, t in zip(connections, tasks) if t.done())
+                raise RuntimeError(f'A stream closed during setup with status {failed.status}')
+            await asyncio.sleep(0.01)
+        setup = time.perf_counter() - started
+        rss_per_connection = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / len(connections)
+
+        latencies = []
+        cpu_started = time.process_time()
+        for _ in range(options['rounds']):
+            for connection in connections:
+                connection.delivered.clear()
+            sent = time.perf_counter()
+            for user in users:
+                broker.publish(user_channel(user.id), {'type': 'notification', 'id': 0, 'text': 'benchmark'})
+            await asyncio.gather(*(connection.delivered.wait() for connection in connections))
+            latencies.append(time.perf_counter() - sent)
+        cpu = time.process_time() - cpu_started
+
+        for connection in connections:
+            connection.disconnected.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        deliveries = sum(connection.received for connection in connections)
+        per_core = deliveries / cpu if cpu else float('inf')
+        self.stdout.write(f'{len(connections)} connections opened in {setup:.2f}s '
+                          f'(~{rss_per_connection:.1f} KB peak RSS each)')
+        self.stdout.write(f'{deliveries} events delivered in {cpu:.2f} CPU s: {per_core:,.0f} deliveries/s per core')
+        self.stdout.write(f'Fan-out to all connections: median {statistics.median(latencies) * 1000:.1f} ms, '
+                          f'max {max(latencies) * 1000:.1f} ms')
+        self.stdout.write(self.style.SUCCESS(
+            f'~{per_core * 60 / options["rate"]:,.0f} connections per core at {options["rate"]:g} events/minute each'
+        ))
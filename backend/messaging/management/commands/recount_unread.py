@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from messaging.counters import recount_unread
+
+
+class Command(BaseCommand):
+    help = 'Rebuild unread message and notification counters from the message tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only recount this user id (may be repeated)')
+
+    def handle(self, *args, **options):
+        rebuilt = recount_unread(options['users'])
+        self.stdout.write(self.style.SUCCESS(f'Recounted unread totals for {rebuilt} users'))
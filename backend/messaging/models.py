@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from uploads.storage import attachment_storage
 
 
 class Message(models.Model):
@@ -14,16 +15,22 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['-sent_at']
+        indexes = [
+            # Unread counts and the inbox scan of both sides of a user's threads
+            models.Index(fields=['receiver', 'is_read'], name='message_receiver_read_idx'),
+            models.Index(fields=['receiver', '-sent_at'], name='message_receiver_sent_idx'),
+            models.Index(fields=['sender', '-sent_at'], name='message_sender_sent_idx'),
+        ]
     
     def __str__(self):
         return f"From: {self.sender.email} To: {self.receiver.email} ({self.sent_at.strftime('%Y-%m-%d %H:%M')})"
     
     def mark_as_read(self):
         """Mark the message as read and set the read timestamp"""
-        from django.utils import timezone
-        self.is_read = True
-        self.read_at = timezone.now()
-        self.save()
+        from .receipts import mark_messages_read
+        if not self.is_read:
+            mark_messages_read(self.receiver, Message.objects.filter(pk=self.pk))
+            self.refresh_from_db(fields=['is_read', 'read_at'])
 
 
 class Conversation(models.Model):
@@ -38,10 +45,11 @@ class Conversation(models.Model):
     
     @property
     def last_message(self):
-        return self.messages.order_by('-sent_at').first()
+        return self.messages.order_by('-sent_at', '-id').first()
     
     def unread_count(self, user):
-        return self.messages.filter(receiver=user, is_read=False).count()
+        watermark = self.read_states.filter(user=user).values_list('last_read_message_id', flat=True).first()
+        return self.messages.filter(id__gt=watermark or 0).count()
 
 
 class GroupMessage(models.Model):
@@ -53,16 +61,43 @@ class GroupMessage(models.Model):
     
     class Meta:
         ordering = ['sent_at']
+        indexes = [
+            # Latest message per conversation and keyset pages of a conversation
+            models.Index(fields=['conversation', 'sent_at', 'id'], name='groupmessage_conv_sent_idx'),
+            # Unread counts are a range count above a read watermark
+            models.Index(fields=['conversation', 'id'], name='groupmessage_conv_id_idx'),
+        ]
     
     def __str__(self):
         return f"Group message from {self.sender.email} in {self.conversation}"
 
 
+class ConversationReadState(models.Model):
+    """
+    How far a participant has read a group conversation.
+    
+    One row per (conversation, user) holding the id of the newest message read,
+    instead of a read flag per participant per message; see ``messaging.watermarks``.
+    """
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='read_states')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='conversation_read_states')
+    last_read_message_id = models.BigIntegerField(default=0)
+    last_read_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['conversation', 'user'], name='unique_conversation_read_state'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} read {self.conversation_id} up to {self.last_read_message_id}"
+
+
 class MessageAttachment(models.Model):
     """File attachments for messages"""
     message = models.ForeignKey(Message, on_delete=models.CASCADE, related_name='attachments', null=True, blank=True)
     group_message = models.ForeignKey(GroupMessage, on_delete=models.CASCADE, related_name='attachments', null=True, blank=True)
-    file = models.FileField(upload_to='message_attachments/')
+    file = models.FileField(upload_to='message_attachments/', storage=attachment_storage)
     filename = models.CharField(max_length=255)
     file_type = models.CharField(max_length=100)
     size = models.PositiveIntegerField()  # Size in bytes
@@ -79,18 +114,39 @@ class Notification(models.Model):
         ('message', 'New Message'),
         ('group_message', 'New Group Message'),
         ('mention', 'Mention'),
+        ('forum_reply', 'Forum Reply'),
     )
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     message = models.ForeignKey(Message, on_delete=models.CASCADE, null=True, blank=True)
     group_message = models.ForeignKey(GroupMessage, on_delete=models.CASCADE, null=True, blank=True)
+    topic = models.ForeignKey('forum.ForumTopic', on_delete=models.CASCADE, null=True, blank=True)
     text = models.CharField(max_length=255)
+    # Unread notifications sharing a group_key (e.g. "topic:12") are coalesced into one row
+    group_key = models.CharField(max_length=50, blank=True)
+    count = models.PositiveIntegerField(default=1)  # Events coalesced into this notification
     is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'id'], name='notification_user_read_idx'),
+            models.Index(fields=['group_key', 'is_read', 'user'], name='notification_group_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Notification for {self.user.email}: {self.text}"
+
+
+class UnreadCounter(models.Model):
+    """Per-user unread totals, adjusted in place by ``messaging.counters`` instead of re-counted"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name='unread_counter')
+    messages = models.PositiveIntegerField(default=0)
+    notifications = models.PositiveIntegerField(default=0)
     
     def __str__(self):
-        return f"Notification for {self.user.email}: {self.text}"
\ No newline at end of file
+        return f"Unread for {self.user_id}: {self.messages} messages, {self.notifications} notifications"
@@ -0,0 +1,164 @@
+"""
+In-process publish/subscribe for pushing messaging events to open streams.
+
+Publishers (the model signals, after commit) call ``publish(user_id, event)``
+from ordinary synchronous code; each open stream holds a ``Subscription``
+whose bounded asyncio queue is fed on its own event loop with
+``call_soon_threadsafe``. The broker is chosen by ``REALTIME_BROKER``:
+``LocalBroker`` delivers within this process, which is all a single ASGI
+server needs and what the tests use. A multi-process deployment plugs in a
+broker with the same two methods that relays through an external bus and
+hands received events to a ``LocalBroker`` for the local fan-out.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+class Broker:
+    """Interface every realtime broker implements"""
+
+    def subscribe(self, channels):
+        """Return a ``Subscription`` to ``channels``; must be called on the consuming event loop"""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, channel, event):
+        """Deliver ``event`` (a JSON-serializable dict) to every subscriber of ``channel``; thread-safe"""
+        raise NotImplementedError
+
+
+class Subscription:
+    """An async iterator of events for one open stream"""
+
+    def __init__(self, broker, channels, max_queue):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def deliver(self, event):
+        """Called from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The consuming loop is gone; the stream ended without closing
+            self.close()
+
+    def _put(self, event):
+        if self.queue.full():
+            # A slow client loses its oldest events rather than growing memory without bound
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """Return the next event, or None if ``timeout`` seconds pass first"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker(Broker):
+    """Fans events out to subscriptions in this process"""
+
+    def __init__(self, max_queue=None):
+        self.max_queue = max_queue or settings.REALTIME_MAX_QUEUE
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, self.max_queue)
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscribers[channel]
+
+    def publish(self, channel, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return len(subscribers)
+
+    def connection_count(self):
+        with self.lock:
+            return len({s for subscribers in self.subscribers.values() for s in subscribers})
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.REALTIME_BROKER)()
+        return _broker
+
+
+def publish_to_users(user_ids, event):
+    broker = get_broker()
+    for user_id in user_ids:
+        broker.publish(user_channel(user_id), event)
+
+
+def message_event(message):
+    return {
+        'type': 'message',
+        'id': message.id,
+        'sender_id': message.sender_id,
+        'subject': message.subject,
+        'content': message.content[:200],
+        'sent_at': message.sent_at.isoformat(),
+    }
+
+
+def group_message_event(group_message):
+    return {
+        'type': 'group_message',
+        'id': group_message.id,
+        'conversation_id': group_message.conversation_id,
+        'sender_id': group_message.sender_id,
+        'content': group_message.content[:200],
+        'sent_at': group_message.sent_at.isoformat(),
+    }
+
+
+def notification_event(notification):
+    return {
+        'type': 'notification',
+        'id': notification.id,
+        'notification_type': notification.notification_type,
+        'message_id': notification.message_id,
+        'group_message_id': notification.group_message_id,
+        'topic_id': notification.topic_id,
+        'text': notification.text,
+        'count': notification.count,
+        'created_at': notification.created_at.isoformat(),
+    }
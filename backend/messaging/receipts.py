@@ -0,0 +1,63 @@
+"""
+Set-based read receipts.
+
+Marking things read is one ``UPDATE ... WHERE is_read = false AND id <= N``
+per call, stamping ``read_at``; the number of rows it changed is then
+subtracted from the user's unread counter. ``N`` is the watermark the
+client has seen (the newest id on its screen), so rows that arrive while
+the request is in flight stay unread. Group conversations keep a
+per-user watermark instead of flags (``messaging.watermarks``).
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import adjust_unread
+from .models import Message, GroupMessage, Notification
+from .watermarks import advance_watermark
+
+
+def mark_messages_read(user, messages, up_to=None):
+    """Mark ``messages`` received by ``user`` read up to message id ``up_to``"""
+    messages = messages.filter(receiver=user, is_read=False)
+    if up_to is not None:
+        messages = messages.filter(id__lte=up_to)
+    with transaction.atomic():
+        changed = messages.update(is_read=True, read_at=timezone.now())
+        adjust_unread(user.id, messages=-changed)
+    return changed
+
+
+def mark_notifications_read(user, notifications=None, up_to=None):
+    """Mark ``user``'s notifications (all, or the given queryset) read up to id ``up_to``"""
+    if notifications is None:
+        notifications = Notification.objects.all()
+    notifications = notifications.filter(user=user, is_read=False)
+    if up_to is not None:
+        notifications = notifications.filter(id__lte=up_to)
+    with transaction.atomic():
+        changed = notifications.update(is_read=True, read_at=timezone.now())
+        adjust_unread(user.id, notifications=-changed)
+    return changed
+
+
+def mark_thread_read(user, other_id, up_to=None):
+    return mark_messages_read(user, Message.objects.filter(sender_id=other_id), up_to)
+
+
+def mark_conversation_read(user, conversation, up_to=None):
+    """
+    Advance the user's read watermark in a group conversation and clear its notifications.
+    
+    Returns ``(watermark, notifications_marked_read)``.
+    """
+    if up_to is None:
+        up_to = GroupMessage.objects.filter(conversation=conversation).order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+    with transaction.atomic():
+        advance_watermark(user.id, conversation.id, up_to)
+        changed = mark_notifications_read(
+            user, Notification.objects.filter(group_message__conversation=conversation, group_message_id__lte=up_to)
+        )
+    return up_to, changed
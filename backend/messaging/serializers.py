@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+
+from accounts.serializers import ProfileThumbnailsMixin
+from .models import Message, Conversation, GroupMessage, Notification
+
+User = get_user_model()
+
+
+class ParticipantSerializer(ProfileThumbnailsMixin, serializers.ModelSerializer):
+    """Compact user representation for message lists"""
+    full_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = User
+        fields = ['id', 'first_name', 'last_name', 'full_name', 'role', 'profile_thumbnails']
+    
+    def get_full_name(self, obj):
+        return obj.full_name
+
+
+class MessageSerializer(serializers.ModelSerializer):
+    """Serializer for direct messages"""
+    sender = ParticipantSerializer(read_only=True)
+    receiver = ParticipantSerializer(read_only=True)
+    receiver_id = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(), source='receiver', write_only=True
+    )
+    
+    class Meta:
+        model = Message
+        fields = ['id', 'sender', 'receiver', 'receiver_id', 'subject', 'content', 'is_read', 'sent_at', 'read_at']
+        read_only_fields = ['id', 'is_read', 'sent_at', 'read_at']
+
+
+class GroupMessageSerializer(serializers.ModelSerializer):
+    """Serializer for messages in a group conversation"""
+    sender = ParticipantSerializer(read_only=True)
+    
+    class Meta:
+        model = GroupMessage
+        fields = ['id', 'conversation', 'sender', 'content', 'sent_at']
+        read_only_fields = ['id', 'conversation', 'sent_at']
+
+
+class InboxThreadSerializer(serializers.Serializer):
+    """A direct-message thread with another user, built from ``messaging.inbox`` rows"""
+    other_id = serializers.IntegerField()
+    unread_count = serializers.IntegerField()
+    last_sent_at = serializers.DateTimeField()
+    last_message = MessageSerializer()
+
+
+class ConversationListSerializer(serializers.ModelSerializer):
+    """Serializer for conversation lists with the latest message"""
+    participants = ParticipantSerializer(many=True, read_only=True)
+    last_message = GroupMessageSerializer(source='latest_message', read_only=True)
+    last_activity_at = serializers.DateTimeField(read_only=True)
+    unread_count = serializers.IntegerField(read_only=True)
+    read_watermark = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Conversation
+        fields = ['id', 'title', 'participants', 'last_message', 'last_activity_at',
+                  'unread_count', 'read_watermark', 'created_at']
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """Serializer for messaging notifications"""
+    conversation = serializers.IntegerField(source='group_message.conversation_id', read_only=True, default=None)
+    
+    class Meta:
+        model = Notification
+        fields = ['id', 'notification_type', 'message', 'group_message', 'conversation', 'topic', 'text',
+                  'count', 'is_read', 'read_at', 'created_at']
+        read_only_fields = fields
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .counters import adjust_unread
+from .fanout import schedule_group_message_notifications
+from .models import Message, GroupMessage, Conversation, Notification
+from .realtime import publish_to_users, message_event, group_message_event, notification_event
+from .watermarks import advance_watermark
+
+
+@receiver(post_save, sender=Message)
+def count_new_message(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        adjust_unread(instance.receiver_id, messages=1)
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        adjust_unread(instance.user_id, notifications=1)
+
+
+@receiver(post_delete, sender=Message)
+def uncount_deleted_message(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.receiver_id, messages=-1)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.user_id, notifications=-1)
+
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, **kwargs):
+    if created:
+        event = message_event(instance)
+        transaction.on_commit(lambda: publish_to_users([instance.receiver_id], event))
+
+
+@receiver(post_save, sender=GroupMessage)
+def push_new_group_message(sender, instance, created, **kwargs):
+    if created:
+        event = group_message_event(instance)
+        
+        def fan_out():
+            participant_ids = Conversation.participants.through.objects.filter(
+                conversation_id=instance.conversation_id
+            ).exclude(user_id=instance.sender_id).values_list('user_id', flat=True)
+            publish_to_users(participant_ids, event)
+        
+        transaction.on_commit(fan_out)
+
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+    if created:
+        event = notification_event(instance)
+        transaction.on_commit(lambda: publish_to_users([instance.user_id], event))
+
+
+@receiver(post_save, sender=GroupMessage)
+def advance_sender_watermark(sender, instance, created, **kwargs):
+    """Posting in a conversation means having read it"""
+    if created:
+        advance_watermark(instance.sender_id, instance.conversation_id, instance.id)
+
+
+@receiver(post_save, sender=GroupMessage)
+def notify_participants(sender, instance, created, **kwargs):
+    """Participants are notified off-request, in batches"""
+    if created:
+        schedule_group_message_notifications(instance)
@@ -0,0 +1,48 @@
+"""
+Server-sent events stream of a user's new messages and notifications.
+
+The view is async and needs the ASGI application (``techiekraft.asgi``): an
+idle connection then costs a coroutine and a small queue instead of a
+worker thread. When the client disconnects Django cancels the generator,
+which closes the subscription.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .realtime import get_broker, user_channel
+
+
+def format_event(event):
+    return f"id: {event['type']}-{event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_events(subscription):
+    try:
+        # Clients reconnect after this many milliseconds if the stream drops
+        yield 'retry: 3000\n\n'
+        while True:
+            event = await subscription.get(timeout=settings.REALTIME_HEARTBEAT)
+            # Comment lines keep proxies from closing an idle connection
+            yield ': keep-alive\n\n' if event is None else format_event(event)
+    finally:
+        subscription.close()
+
+
+async def event_stream(request):
+    """Stream new messages, group messages and notifications for the current user"""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"message": "Streaming requires the ASGI application"}, status=501)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"message": "Authentication credentials were not provided."}, status=403)
+
+    subscription = get_broker().subscribe([user_channel(user.id)])
+    response = StreamingHttpResponse(stream_events(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,315 @@
-from django.test import TestCase
+import asyncio
+import json
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .counters import recount_unread
+from .fanout import deliver_notifications
+from .models import Message, Conversation, GroupMessage, Notification, UnreadCounter, ConversationReadState
+from .realtime import LocalBroker, get_broker
+
+User = get_user_model()
+
+
+@override_settings(BACKGROUND_WORKERS=0)
+class MessagingTestCase(TestCase):
+    """Creates a few users and an authenticated client for the first one"""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                email=f'user{i}@example.com', password='pass', first_name=f'User{i}', last_name='Test',
+                role='student', username=f'user{i}'
+            )
+            for i in range(4)
+        ]
+        self.me = self.users[0]
+        self.client = APIClient()
+        self.client.force_authenticate(self.me)
+
+
+class InboxTests(MessagingTestCase):
+    """Threads come back newest first with unread counts, in constant queries"""
+
+    def test_inbox_threads(self):
+        a, b, c = self.users[1:]
+        Message.objects.create(sender=a, receiver=self.me, content='hi from a')
+        Message.objects.create(sender=self.me, receiver=b, content='hi b')
+        Message.objects.create(sender=a, receiver=self.me, content='again from a')
+        Message.objects.create(sender=c, receiver=self.me, content='hi from c', is_read=True)
+        Message.objects.create(sender=b, receiver=c, content='not mine')
+
+        # One aggregate query for the threads and one for their latest messages
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('message-inbox'))
+        threads = response.data['results']
+        self.assertEqual([t['other_id'] for t in threads], [c.id, a.id, b.id])
+        self.assertEqual([t['unread_count'] for t in threads], [0, 2, 0])
+        self.assertEqual(threads[1]['last_message']['content'], 'again from a')
+
+        # Keyset pages cover every thread exactly once
+        first = self.client.get(reverse('message-inbox'), {'page_size': 2}).data
+        second = self.client.get(first['next']).data
+        self.assertEqual([t['other_id'] for t in first['results'] + second['results']], [c.id, a.id, b.id])
+        self.assertIsNone(second['next'])
+
+    def test_send_and_read_thread(self):
+        other = self.users[1]
+        response = self.client.post(reverse('message-create'), {'receiver_id': other.id, 'content': 'hello'})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(reverse('message-thread', args=[other.id]))
+        self.assertEqual([m['content'] for m in response.data['results']], ['hello'])
+
+
+class ConversationListTests(MessagingTestCase):
+    """Conversations are ordered by their latest message without a query per row"""
+
+    def test_conversation_list(self):
+        quiet = Conversation.objects.create(title='Quiet')
+        busy = Conversation.objects.create(title='Busy')
+        elsewhere = Conversation.objects.create(title='Not mine')
+        quiet.participants.add(self.me, self.users[1])
+        busy.participants.add(self.me, *self.users[1:])
+        elsewhere.participants.add(self.users[2])
+        for i in range(3):
+            GroupMessage.objects.create(conversation=busy, sender=self.users[1 + i], content=f'message {i}')
+
+        # Conversations, their latest messages and participants
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('conversation-list'))
+        results = response.data['results']
+        self.assertEqual([c['title'] for c in results], ['Busy', 'Quiet'])
+        self.assertEqual(results[0]['last_message']['content'], 'message 2')
+        self.assertIsNone(results[1]['last_message'])
+        self.assertEqual(len(results[0]['participants']), 4)
+
+    def test_create_and_post(self):
+        response = self.client.post(reverse('conversation-list'), {
+            'title': 'Study group', 'participant_ids': [self.users[1].id, self.users[2].id]
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        url = reverse('conversation-messages', args=[response.data['id']])
+        self.assertEqual(self.client.post(url, {'content': 'hello all'}).status_code, 201)
+        self.assertEqual(self.client.get(url).data['results'][0]['content'], 'hello all')
+
+        outsider = APIClient()
+        outsider.force_authenticate(self.users[3])
+        self.assertEqual(outsider.get(url).status_code, 404)
+
+    def test_create_rejects_malformed_participants(self):
+        for participant_ids in ({'id': 1}, 5, ['a'], [self.users[1].id, 0], []):
+            response = self.client.post(reverse('conversation-list'), {'participant_ids': participant_ids}, format='json')
+            self.assertEqual(response.status_code, 400, participant_ids)
+        self.assertFalse(Conversation.objects.exists())
+
+
+class ReadReceiptTests(MessagingTestCase):
+    """Reads are one UPDATE up to a watermark and adjust counters without counting"""
+
+    def setUp(self):
+        super().setUp()
+        self.other = self.users[1]
+        self.messages = [
+            Message.objects.create(sender=self.other, receiver=self.me, content=f'message {i}') for i in range(5)
+        ]
+        self.conversation = Conversation.objects.create(title='Class')
+        self.conversation.participants.add(self.me, self.other)
+        for i in range(3):
+            group_message = GroupMessage.objects.create(conversation=self.conversation, sender=self.other, content=str(i))
+            Notification.objects.create(user=self.me, notification_type='group_message',
+                                        group_message=group_message, text='New group message')
+
+    def unread(self):
+        data = self.client.get(reverse('message-unread')).data
+        return data['unread_messages'], data['unread_notifications']
+
+    def test_thread_read_up_to_watermark(self):
+        self.assertEqual(self.unread(), (5, 3))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('message-thread-read', args=[self.other.id]),
+                                        {'up_to': self.messages[2].id})
+        self.assertEqual(response.data['marked_read'], 3)
+        self.assertEqual(response.data['unread_messages'], 2)
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql']])
+        self.assertEqual(Message.objects.filter(is_read=True, read_at__isnull=False).count(), 3)
+
+        # Messages arriving later stay unread, and counters keep up without a recount
+        Message.objects.create(sender=self.other, receiver=self.me, content='late')
+        self.client.post(reverse('message-thread-read', args=[self.other.id]))
+        self.assertEqual(self.unread(), (0, 3))
+
+    def test_conversation_and_notifications_read(self):
+        self.unread()
+        first, second, third = Notification.objects.order_by('id')
+        response = self.client.post(reverse('conversation-read', args=[self.conversation.id]),
+                                    {'up_to': second.group_message_id})
+        self.assertEqual(response.data['marked_read'], 2)
+        self.assertEqual(self.unread(), (5, 1))
+
+        self.client.post(reverse('notification-read'))
+        self.assertEqual(self.unread(), (5, 0))
+        third.refresh_from_db()
+        self.assertIsNotNone(third.read_at)
+
+    def test_recount_repairs_drift(self):
+        self.unread()
+        UnreadCounter.objects.filter(user=self.me).update(messages=42)
+        self.assertEqual(recount_unread([self.me.id]), 1)
+        self.assertEqual(self.unread(), (5, 3))
+
+
+class RealtimeTests(MessagingTestCase):
+    """New rows are pushed to subscribed participants once their transaction commits"""
+
+    async def test_local_broker_fan_out(self):
+        broker = LocalBroker(max_queue=2)
+        first, second = broker.subscribe(['user:1']), broker.subscribe(['user:1', 'user:2'])
+        self.assertEqual(broker.publish('user:1', {'n': 1}), 2)
+        broker.publish('user:2', {'n': 2})
+        self.assertEqual(await first.get(timeout=1), {'n': 1})
+        self.assertEqual([await second.get(timeout=1) for _ in range(2)], [{'n': 1}, {'n': 2}])
+        self.assertIsNone(await first.get(timeout=0.01))
+
+        # A slow consumer keeps only the newest events
+        for n in range(3, 6):
+            broker.publish('user:1', {'n': n})
+        await asyncio.sleep(0)
+        self.assertEqual([await first.get(timeout=1) for _ in range(2)], [{'n': 4}, {'n': 5}])
+        self.assertEqual(first.dropped, 1)
+
+        first.close()
+        second.close()
+        self.assertEqual(broker.connection_count(), 0)
+
+    def test_signals_publish_after_commit(self):
+        conversation = Conversation.objects.create(title='Class')
+        conversation.participants.add(*self.users)
+        published = []
+        broker = get_broker()
+        original, broker.publish = broker.publish, lambda channel, event: published.append((channel, event['type']))
+        try:
+            with self.captureOnCommitCallbacks() as callbacks:
+                Message.objects.create(sender=self.users[1], receiver=self.me, content='hi')
+                GroupMessage.objects.create(conversation=conversation, sender=self.me, content='hello all')
+            self.assertEqual(published, [])
+            for callback in callbacks:
+                callback()
+        finally:
+            broker.publish = original
+        others = [f'user:{user.id}' for user in self.users[1:]]
+        self.assertEqual(published, [(f'user:{self.me.id}', 'message')] + [
+            (channel, 'group_message') for channel in others
+        ] + [
+            # Notifications from the fan-out job
+            (channel, 'notification') for channel in others
+        ])
+
+    @override_settings(REALTIME_HEARTBEAT=0.05)
+    async def test_event_stream(self):
+        await self.async_client.aforce_login(self.me)
+        response = await self.async_client.get(reverse('message-stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content
+        self.assertEqual(await anext(chunks), b'retry: 3000\n\n')
+
+        get_broker().publish(f'user:{self.me.id}', {'type': 'message', 'id': 7})
+        event = (await anext(chunks)).decode()
+        self.assertIn('event: message', event)
+        self.assertEqual(json.loads(event.split('data: ')[1]), {'type': 'message', 'id': 7})
+        self.assertEqual(await anext(chunks), b': keep-alive\n\n')
+        self.assertEqual(get_broker().connection_count(), 1)
+
+        # The ASGI handler cancels the response task when the client disconnects
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(get_broker().connection_count(), 0)
+
+    def test_stream_requires_asgi(self):
+        self.assertEqual(self.client.get(reverse('message-stream')).status_code, 501)
+
+
+class ReadWatermarkTests(MessagingTestCase):
+    """Group read state is one watermark row per participant"""
+
+    def setUp(self):
+        super().setUp()
+        self.conversation = Conversation.objects.create(title='Class')
+        self.conversation.participants.add(*self.users)
+        self.posts = [
+            GroupMessage.objects.create(conversation=self.conversation, sender=self.users[1 + i % 3], content=str(i))
+            for i in range(6)
+        ]
+
+    def listed_unread(self):
+        return self.client.get(reverse('conversation-list')).data['results'][0]['unread_count']
+
+    def test_unread_counts_follow_the_watermark(self):
+        self.assertEqual(self.listed_unread(), 6)
+        url = reverse('conversation-read', args=[self.conversation.id])
+        response = self.client.post(url, {'up_to': self.posts[3].id})
+        self.assertEqual((response.data['last_read_message_id'], response.data['unread_count']), (self.posts[3].id, 2))
+        self.assertEqual(self.listed_unread(), 2)
+
+        # Watermarks never move backwards, and stay one row per participant
+        self.client.post(url, {'up_to': self.posts[0].id})
+        self.client.post(url)
+        self.assertEqual(self.listed_unread(), 0)
+        self.assertEqual(ConversationReadState.objects.filter(user=self.me).count(), 1)
+        self.assertEqual(self.conversation.unread_count(self.me), 0)
+
+    def test_posting_marks_conversation_read(self):
+        self.client.post(reverse('conversation-messages', args=[self.conversation.id]), {'content': 'caught up'})
+        self.assertEqual(self.listed_unread(), 0)
+        # users[1] last posted message 3, so messages 4, 5 and the new one are unread
+        self.assertEqual(self.conversation.unread_count(self.users[1]), 3)
+
+
+class NotificationFanOutTests(MessagingTestCase):
+    """Fan-out writes notifications in batches and coalesces bursts per recipient"""
+
+    def setUp(self):
+        super().setUp()
+        self.conversation = Conversation.objects.create(title='Class')
+        self.conversation.participants.add(*self.users)
+
+    def post(self, sender, content='hi'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return GroupMessage.objects.create(conversation=self.conversation, sender=sender, content=content)
+
+    def test_group_message_bursts_are_coalesced(self):
+        self.client.get(reverse('message-unread'))  # Creates my counter row
+        for i in range(3):
+            latest = self.post(self.users[1], f'message {i}')
+
+        notifications = Notification.objects.filter(user=self.me)
+        self.assertEqual(notifications.count(), 1)
+        notification = notifications.get()
+        self.assertEqual((notification.count, notification.group_message_id), (3, latest.id))
+        self.assertEqual(notification.text, 'New messages in Class')
+        # The sender is not notified, and the counter counts rows, not events
+        self.assertFalse(Notification.objects.filter(user=self.users[1]).exists())
+        self.assertEqual(self.client.get(reverse('message-unread')).data['unread_notifications'], 1)
+
+        # Once read, the next message starts a fresh notification
+        self.client.post(reverse('conversation-read', args=[self.conversation.id]))
+        self.post(self.users[2])
+        self.assertEqual(notifications.filter(is_read=False).get().count, 1)
+
+    def test_batches_use_constant_queries(self):
+        recipients = [user.id for user in self.users]
+        with override_settings(NOTIFICATION_BATCH_SIZE=2):
+            # Per chunk: coalesce lookup, update, insert, counter bump and savepoints
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(deliver_notifications(recipients, 'mention', 'Hello', group_key='x'), 4)
+        inserts = [q for q in queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(Notification.objects.filter(group_key='x').count(), 4)
@@ -1,3 +1,26 @@
 from django.urls import path
+from .views import (
+    InboxView, MessageCreateView, ThreadView, ThreadReadView,
+    ConversationListView, ConversationMessageListView, ConversationReadView,
+    NotificationListView, NotificationReadView, UnreadCountView
+)
+from .streams import event_stream
 
-urlpatterns = []
\ No newline at end of file
+urlpatterns = [
+    # Direct message endpoints
+    path('', MessageCreateView.as_view(), name='message-create'),
+    path('inbox/', InboxView.as_view(), name='message-inbox'),
+    path('threads/<int:user_id>/', ThreadView.as_view(), name='message-thread'),
+    path('threads/<int:user_id>/read/', ThreadReadView.as_view(), name='message-thread-read'),
+    path('unread/', UnreadCountView.as_view(), name='message-unread'),
+    path('stream/', event_stream, name='message-stream'),
+    
+    # Group conversation endpoints
+    path('conversations/', ConversationListView.as_view(), name='conversation-list'),
+    path('conversations/<int:pk>/messages/', ConversationMessageListView.as_view(), name='conversation-messages'),
+    path('conversations/<int:pk>/read/', ConversationReadView.as_view(), name='conversation-read'),
+    
+    # Notification endpoints
+    path('notifications/', NotificationListView.as_view(), name='notification-list'),
+    path('notifications/read/', NotificationReadView.as_view(), name='notification-read'),
+]
@@ -1,3 +1,210 @@
-from django.shortcuts import render
+from django.contrib.auth import get_user_model
+from django.db.models import Q, prefetch_related_objects
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from techiekraft.pagination import KeysetPagination
+from .counters import get_unread
+from .inbox import inbox_threads, attach_last_messages, conversation_list, attach_last_group_messages
+from .models import Message, Conversation, GroupMessage, Notification
+from .receipts import mark_thread_read, mark_conversation_read, mark_notifications_read
+from .serializers import (
+    MessageSerializer, GroupMessageSerializer, InboxThreadSerializer, ConversationListSerializer,
+    NotificationSerializer
+)
+from .watermarks import unread_count
+
+User = get_user_model()
+
+
+def read_watermark(request):
+    """The ``up_to`` id a client has seen; None marks everything read"""
+    value = request.data.get('up_to')
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return False
+
+
+def read_response(request, changed):
+    counter = get_unread(request.user.id)
+    return Response({
+        "marked_read": changed,
+        "unread_messages": counter.messages,
+        "unread_notifications": counter.notifications,
+    })
+
+
+def invalid_watermark():
+    return Response({"message": "up_to must be a message or notification id"}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class InboxView(APIView):
+    """View for listing the current user's direct-message threads, latest first"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        paginator = KeysetPagination(ordering=('-last_sent_at', '-other_id'))
+        page = paginator.paginate_queryset(inbox_threads(request.user), request, view=self)
+        serializer = InboxThreadSerializer(attach_last_messages(page), many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class MessageCreateView(APIView):
+    """View for sending a direct message"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = MessageSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            if serializer.validated_data['receiver'] == request.user:
+                return Response({"message": "You cannot send a message to yourself"}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+            serializer.save(sender=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ThreadView(APIView):
+    """View for listing the direct messages between the current user and another user"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, user_id):
+        other = get_object_or_404(User, pk=user_id)
+        messages = Message.objects.filter(
+            Q(sender=request.user, receiver=other) | Q(sender=other, receiver=request.user)
+        ).select_related('sender', 'receiver')
+        
+        paginator = KeysetPagination(ordering=('-sent_at', '-id'))
+        page = paginator.paginate_queryset(messages, request, view=self)
+        serializer = MessageSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ThreadReadView(APIView):
+    """View for marking the messages received from another user as read"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, user_id):
+        up_to = read_watermark(request)
+        if up_to is False:
+            return invalid_watermark()
+        return read_response(request, mark_thread_read(request.user, user_id, up_to))
+
+
+class ConversationListView(APIView):
+    """View for listing and creating group conversations"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        paginator = KeysetPagination(ordering=('-last_activity_at', '-id'))
+        page = paginator.paginate_queryset(conversation_list(request.user), request, view=self)
+        attach_last_group_messages(page)
+        prefetch_related_objects(page, 'participants')
+        serializer = ConversationListSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+    
+    def post(self, request):
+        participant_ids = request.data.get('participant_ids')
+        if not isinstance(participant_ids, list) or not all(
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in participant_ids
+        ):
+            return Response({"message": "participant_ids must be a list of user ids"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        participant_ids = set(participant_ids)
+        participants = list(User.objects.filter(pk__in=participant_ids))
+        if not participants or len(participants) != len(participant_ids):
+            return Response({"message": "participant_ids must list existing users"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        conversation = Conversation.objects.create(title=request.data.get('title'))
+        conversation.participants.add(request.user, *participants)
+        conversation = conversation_list(request.user).get(pk=conversation.pk)
+        attach_last_group_messages([conversation])
+        serializer = ConversationListSerializer(conversation, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ConversationMessageListView(APIView):
+    """View for listing and posting messages in a group conversation"""
+    permission_classes = [IsAuthenticated]
+    
+    def get_conversation(self, request, pk):
+        return get_object_or_404(Conversation, pk=pk, participants=request.user)
+    
+    def get(self, request, pk):
+        conversation = self.get_conversation(request, pk)
+        messages = GroupMessage.objects.filter(conversation=conversation).select_related('sender')
+        
+        paginator = KeysetPagination(ordering=('-sent_at', '-id'))
+        page = paginator.paginate_queryset(messages, request, view=self)
+        serializer = GroupMessageSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+    
+    def post(self, request, pk):
+        conversation = self.get_conversation(request, pk)
+        serializer = GroupMessageSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            serializer.save(conversation=conversation, sender=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ConversationReadView(APIView):
+    """View for marking a group conversation as read"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        conversation = get_object_or_404(Conversation, pk=pk, participants=request.user)
+        up_to = read_watermark(request)
+        if up_to is False:
+            return invalid_watermark()
+        watermark, changed = mark_conversation_read(request.user, conversation, up_to)
+        counter = get_unread(request.user.id)
+        return Response({
+            "marked_read": changed,
+            "last_read_message_id": watermark,
+            "unread_count": unread_count(request.user.id, conversation.id),
+            "unread_messages": counter.messages,
+            "unread_notifications": counter.notifications,
+        })
+
+
+class NotificationListView(APIView):
+    """View for listing the current user's notifications, newest first"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        notifications = Notification.objects.filter(user=request.user).select_related('group_message')
+        if request.query_params.get('unread') == '1':
+            notifications = notifications.filter(is_read=False)
+        
+        paginator = KeysetPagination(ordering=('-id',))
+        page = paginator.paginate_queryset(notifications, request, view=self)
+        serializer = NotificationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class NotificationReadView(APIView):
+    """View for marking notifications as read up to a watermark"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        up_to = read_watermark(request)
+        if up_to is False:
+            return invalid_watermark()
+        return read_response(request, mark_notifications_read(request.user, up_to=up_to))
+
+
+class UnreadCountView(APIView):
+    """View for the current user's unread message and notification totals"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        counter = get_unread(request.user.id)
+        return Response({"unread_messages": counter.messages, "unread_notifications": counter.notifications})
@@ -0,0 +1,60 @@
+"""
+Per-user read watermarks for group conversations.
+
+A participant's read state is the id of the newest group message they have
+read (``ConversationReadState``), so reading is a single-row upsert however
+many messages or participants a conversation has, and unread counts are one
+range count over the ``(conversation, id)`` index. Watermarks only move
+forward, and posting a message moves the sender's past it.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import GroupMessage, ConversationReadState
+
+
+def advance_watermark(user_id, conversation_id, message_id):
+    """Move the user's watermark in the conversation forward to ``message_id``"""
+    read_state = ConversationReadState.objects.filter(conversation_id=conversation_id, user_id=user_id)
+    changes = {
+        'last_read_message_id': Greatest(F('last_read_message_id'), Value(message_id)),
+        'last_read_at': timezone.now(),
+    }
+    if read_state.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            ConversationReadState.objects.create(
+                conversation_id=conversation_id, user_id=user_id, last_read_message_id=message_id
+            )
+    except IntegrityError:
+        # Another request created the row first
+        read_state.update(**changes)
+
+
+def get_watermark(user_id, conversation_id):
+    return ConversationReadState.objects.filter(
+        conversation_id=conversation_id, user_id=user_id
+    ).values_list('last_read_message_id', flat=True).first() or 0
+
+
+def unread_count(user_id, conversation_id):
+    return GroupMessage.objects.filter(
+        conversation_id=conversation_id, id__gt=get_watermark(user_id, conversation_id)
+    ).count()
+
+
+def annotate_unread_counts(conversations, user):
+    """Annotate ``read_watermark`` and ``unread_count`` on a Conversation queryset, in the same query"""
+    watermark = ConversationReadState.objects.filter(conversation=OuterRef('pk'), user=user)
+    unread = (
+        GroupMessage.objects.filter(conversation=OuterRef('pk'), id__gt=OuterRef('read_watermark'))
+        .order_by().values('conversation').annotate(total=Count('pk')).values('total')[:1]
+    )
+    return conversations.annotate(
+        read_watermark=Coalesce(Subquery(watermark.values('last_read_message_id')[:1]), Value(0)),
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0)),
+    )
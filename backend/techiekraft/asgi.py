@@ -2,6 +2,9 @@
 ASGI config for techiekraft project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (uvicorn, daphne) so the messaging event stream
+(``messaging.streams``) can hold many idle connections on one event loop;
+``manage.py benchmark_realtime`` measures connections per core.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
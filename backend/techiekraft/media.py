@@ -0,0 +1,149 @@
+"""
+Serving stored files with HTTP range and conditional request support.
+
+``serve_file`` answers ``If-None-Match``/``If-Modified-Since`` with 304,
+serves a single ``Range`` with 206 (honouring ``If-Range``) and otherwise
+streams the whole file. In the default ``django`` mode the response wraps the
+open file, so WSGI servers with a ``wsgi.file_wrapper`` (gunicorn, uWSGI)
+send it with ``sendfile()``; the ``x-accel`` and ``x-sendfile`` modes hand
+the transfer to nginx or Apache entirely after Django has checked access.
+"""
+
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+from uploads.storage import is_blob
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of an open file starting at ``start``"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # Lets wsgi.file_wrapper sendfile() from the current offset for Content-Length bytes
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(name, stat):
+    if is_blob(name):
+        # Blob names carry the SHA-256 of the content
+        return quote_etag(os.path.splitext(os.path.basename(name))[0])
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def parse_range(header, size):
+    """Return ``(start, end)`` inclusive for a single satisfiable range, None to ignore it, or False"""
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        # Multiple or malformed ranges: serve the whole file, as RFC 9110 allows
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def range_applies(request, etag):
+    # If-Range with a stale validator means the client wants the full new file
+    if_range = request.headers.get('If-Range')
+    return if_range is None or if_range == etag
+
+
+def content_type_for(filename):
+    content_type, encoding = mimetypes.guess_type(filename)
+    # Compressed files are served as they are, not decoded by the browser
+    return 'application/octet-stream' if encoding or not content_type else content_type
+
+
+def serve_file(request, storage, name, filename=None, as_attachment=False):
+    """Serve the file ``name`` of a file system ``storage``, honouring Range and validators"""
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (NotImplementedError, OSError):
+        raise Http404("File not found")
+    if not os.path.isfile(path):
+        raise Http404("File not found")
+
+    etag = file_etag(name, stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    filename = filename or os.path.basename(name)
+    mode = settings.MEDIA_SERVE_MODE
+    if mode == 'x-accel':
+        # nginx handles ranges and transfers the bytes itself
+        response = HttpResponse(content_type=content_type_for(filename))
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + name
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type_for(filename))
+        response['X-Sendfile'] = path
+    else:
+        byte_range = None
+        header = request.headers.get('Range')
+        if header and range_applies(request, etag):
+            byte_range = parse_range(header, stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+        file = open(path, 'rb')
+        if byte_range:
+            start, end = byte_range
+            response = FileResponse(RangeFile(file, start, end - start + 1), status=206,
+                                    content_type=content_type_for(filename))
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        else:
+            response = FileResponse(file, content_type=content_type_for(filename))
+            start, end = 0, stat.st_size - 1
+        response['Content-Length'] = end - start + 1
+        response.block_size = settings.MEDIA_BLOCK_SIZE
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def serve_media(request, path):
+    """Development replacement for ``django.views.static.serve`` with range support"""
+    name = posixpath.normpath(path).lstrip('/')
+    if name.startswith('..'):
+        raise Http404("File not found")
+    return serve_file(request, default_storage, name)
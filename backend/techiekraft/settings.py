@@ -52,6 +52,7 @@ INSTALLED_APPS = [
     'messaging',
     'forum',
     'labs',
+    'uploads',
 ]
 
 MIDDLEWARE = [
@@ -104,6 +105,29 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'techiekraft',
+    },
+    # Seen by every worker process; create its table with `manage.py createcachetable`
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'techiekraft_cache',
+        # Culling drops keys regardless of timeout; keep it rare
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Seconds a rendered course tree stays cached; invalidation is signal-driven
+COURSE_CACHE_TIMEOUT = 60 * 60
+# Cache holding the course tree version tokens; must be shared by all workers
+COURSE_CACHE_VERSION_ALIAS = 'shared'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -146,6 +170,46 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Attachments are stored once per distinct content under MEDIA_ROOT/blobs
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'attachments': {'BACKEND': 'uploads.storage.ContentAddressedStorage'},
+}
+
+# Protected media downloads (techiekraft.media)
+# 'django' streams files itself (sendfile via wsgi.file_wrapper); 'x-accel' hands them to nginx,
+# which needs an internal location for MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT; 'x-sendfile' to Apache
+MEDIA_SERVE_MODE = os.getenv('MEDIA_SERVE_MODE', 'django')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_BLOCK_SIZE = 64 * 1024
+
+# Background worker pool (techiekraft.workers); 0 runs jobs inline
+BACKGROUND_WORKERS = 4
+
+# Profile image thumbnails (accounts.thumbnails), square edge length in pixels
+PROFILE_THUMBNAIL_SIZES = {'small': 64, 'medium': 256}
+PROFILE_THUMBNAIL_QUALITY = 80
+
+# Notification fan-out (messaging.fanout): rows written per bulk INSERT
+NOTIFICATION_BATCH_SIZE = 500
+
+# Forum topic views (forum.view_counts) are buffered per process and flushed
+# after this many seconds or this many pending views, whichever comes first
+FORUM_VIEW_FLUSH_INTERVAL = 10
+FORUM_VIEW_FLUSH_THRESHOLD = 1000
+
+# Realtime messaging streams (messaging.realtime); served only under ASGI
+REALTIME_BROKER = 'messaging.realtime.LocalBroker'
+REALTIME_MAX_QUEUE = 100  # Events buffered per connection before the oldest are dropped
+REALTIME_HEARTBEAT = 25  # Seconds between keep-alive comments on idle streams
+
+# Chunked uploads
+# Chunks are kept next to MEDIA_ROOT so finished files can be moved into place with a rename
+UPLOAD_CHUNK_ROOT = os.path.join(MEDIA_ROOT, 'chunked_uploads')
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_FILE_SIZE = 5 * 1024 * 1024 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
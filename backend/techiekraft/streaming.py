@@ -0,0 +1,36 @@
+"""
+Newline-delimited JSON streaming for large list endpoints.
+"""
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+def wants_ndjson(request):
+    """Return True when the client opted in to a streamed response"""
+    return (
+        request.query_params.get('stream') == 'ndjson' or
+        NDJSON_CONTENT_TYPE in request.headers.get('Accept', '')
+    )
+
+
+def iter_ndjson(queryset, serializer_class, chunk_size=500, context=None):
+    """Serialize ``queryset`` one row at a time, reading it from the database in chunks"""
+    # Serializers expect a dict context, as they get from views
+    context = {} if context is None else context
+    encoder = JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        data = serializer_class(obj, context=context).data
+        yield encoder.encode(data) + '\n'
+
+
+def ndjson_response(queryset, serializer_class, chunk_size=500, context=None):
+    """Build a streaming response whose memory use does not grow with the queryset"""
+    response = StreamingHttpResponse(
+        iter_ndjson(queryset, serializer_class, chunk_size=chunk_size, context=context),
+        content_type=NDJSON_CONTENT_TYPE,
+    )
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -15,9 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from .media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,8 +28,11 @@ urlpatterns = [
     path('api/messages/', include('messaging.urls')),
     path('api/forum/', include('forum.urls')),
     path('api/labs/', include('labs.urls')),
+    path('api/uploads/', include('uploads.urls')),
 ]
 
-# Serve media files in development
+# Serve media files in development, with range requests so videos can seek
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+    ]
@@ -0,0 +1,50 @@
+"""
+A small in-process worker pool for work that should not hold up a request.
+
+Jobs are submitted after the current transaction commits, so a worker never
+sees rows that might still roll back, and each job closes its database
+connection when it finishes. ``BACKGROUND_WORKERS = 0`` runs jobs inline,
+which tests and management commands rely on.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.BACKGROUND_WORKERS, thread_name_prefix='techiekraft-worker')
+        return _executor
+
+
+def run_job(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background job %s failed", getattr(func, '__name__', func))
+    finally:
+        close_old_connections()
+
+
+def submit(func, *args, **kwargs):
+    """Run ``func`` on the worker pool, or inline when no workers are configured"""
+    if settings.BACKGROUND_WORKERS <= 0:
+        func(*args, **kwargs)
+        return None
+    return get_executor().submit(run_job, func, *args, **kwargs)
+
+
+def submit_on_commit(func, *args, **kwargs):
+    """Schedule ``func`` once the current transaction commits"""
+    transaction.on_commit(lambda: submit(func, *args, **kwargs))
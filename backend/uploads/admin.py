@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import UploadSession, Blob
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'user', 'size', 'status', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('filename', 'user__email')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'ref_count', 'last_used_at')
+    search_fields = ('name', 'digest')
+    readonly_fields = ('name', 'digest', 'size', 'ref_count', 'created_at', 'last_used_at')
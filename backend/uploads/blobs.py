@@ -0,0 +1,135 @@
+"""
+Reference counting and garbage collection for content-addressed blobs.
+
+Every model field stored with ``ContentAddressedStorage`` is tracked: saving
+or deleting a row adjusts the ``ref_count`` of the blobs it gains or drops
+with an ``F()`` update in the same transaction. Writes that bypass signals
+(``bulk_create``, ``update``) are corrected by ``reconcile_ref_counts``, and
+``sweep_blobs`` deletes blobs that have been unreferenced for a grace period.
+"""
+
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, F, FileField, Sum
+from django.utils import timezone
+
+from .models import Blob
+from .storage import BLOB_DIR, ContentAddressedStorage, attachment_storage, is_blob
+
+SWEEP_BATCH_SIZE = 500
+DEFAULT_GRACE = timedelta(hours=24)
+
+
+def tracked_fields():
+    """``[(model, field), ...]`` for every file field stored as blobs"""
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def adjust_ref_counts(names, delta):
+    for name, count in Counter(name for name in names if is_blob(name)).items():
+        Blob.objects.filter(name=name).update(ref_count=F('ref_count') + delta * count)
+
+
+def blob_names(instance, fields):
+    # Reads __dict__ so deferred file fields are not fetched just to be tracked
+    return {field.attname: str(instance.__dict__.get(field.attname) or '') for field in fields}
+
+
+def remember_blobs(sender, instance, fields, **kwargs):
+    instance._blob_names = blob_names(instance, fields)
+
+
+def count_saved_blobs(sender, instance, fields, **kwargs):
+    previous = getattr(instance, '_blob_names', {})
+    current = blob_names(instance, fields)
+    added = [name for attname, name in current.items() if name != previous.get(attname)]
+    removed = [name for attname, name in previous.items() if name != current.get(attname)]
+    adjust_ref_counts(added, 1)
+    adjust_ref_counts(removed, -1)
+    instance._blob_names = current
+
+
+def count_deleted_blobs(sender, instance, fields, **kwargs):
+    adjust_ref_counts(blob_names(instance, fields).values(), -1)
+
+
+def reconcile_ref_counts():
+    """Recount references from the tracked tables; returns the number of blobs corrected"""
+    counts = Counter()
+    for model, field in tracked_fields():
+        rows = (
+            model._base_manager.filter(**{f'{field.attname}__startswith': BLOB_DIR + '/'})
+            .values(field.attname).annotate(refs=Count('pk')).order_by()
+        )
+        for row in rows:
+            counts[row[field.attname]] += row['refs']
+
+    corrected = []
+    for blob in Blob.objects.only('id', 'name', 'ref_count').iterator():
+        if blob.ref_count != counts[blob.name]:
+            blob.ref_count = counts[blob.name]
+            corrected.append(blob)
+    Blob.objects.bulk_update(corrected, ['ref_count'], batch_size=SWEEP_BATCH_SIZE)
+    return len(corrected)
+
+
+def purge_unreferenced(names):
+    storage = attachment_storage()
+    # An upload may have recreated a blob between the delete and the commit
+    still_used = set(Blob.objects.filter(name__in=names).values_list('name', flat=True))
+    for name in names:
+        if name not in still_used:
+            storage.purge(name)
+
+
+def sweep_blobs(grace=DEFAULT_GRACE, dry_run=False):
+    """
+    Delete blobs unreferenced for longer than ``grace`` along with their files.
+    
+    Returns ``(blob_count, bytes_freed)``.
+    """
+    cutoff = timezone.now() - grace
+    if dry_run:
+        totals = Blob.objects.filter(ref_count__lte=0, last_used_at__lt=cutoff).aggregate(
+            blobs=Count('id'), size=Sum('size')
+        )
+        return totals['blobs'], totals['size'] or 0
+
+    deleted = freed = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Blob.objects.select_for_update(skip_locked=True)
+                .filter(ref_count__lte=0, last_used_at__lt=cutoff)
+                .values_list('pk', 'name', 'size')[:SWEEP_BATCH_SIZE]
+            )
+            if not batch:
+                break
+            deleted += len(batch)
+            freed += sum(size for _, _, size in batch)
+            Blob.objects.filter(pk__in=[pk for pk, _, _ in batch]).delete()
+            names = [name for _, name, _ in batch]
+            transaction.on_commit(lambda names=names: purge_unreferenced(names))
+
+    remove_stale_temp_files(cutoff)
+    return deleted, freed
+
+
+def remove_stale_temp_files(cutoff):
+    """Remove temporary files left behind by interrupted uploads"""
+    temp_dir = attachment_storage().path(os.path.join(BLOB_DIR, 'tmp'))
+    if not os.path.isdir(temp_dir):
+        return
+    oldest = cutoff.timestamp()
+    for entry in os.scandir(temp_dir):
+        if entry.is_file() and entry.stat().st_mtime < oldest:
+            os.remove(entry.path)
@@ -0,0 +1,147 @@
+"""
+On-disk chunk storage for resumable uploads.
+
+Each chunk is streamed from the request straight into its own part file,
+named after its byte offset, so a dropped connection only loses the chunk in
+flight and chunks may arrive in any order. Completing an upload concatenates
+the parts in the kernel (``copy_file_range``/``sendfile``) without copying
+them through Python buffers.
+"""
+
+import hashlib
+import os
+import shutil
+
+from django.conf import settings
+
+READ_SIZE = 64 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ChunkError(Exception):
+    """Raised when a chunk or the assembled file is invalid"""
+
+
+class ChecksumMismatch(ChunkError):
+    """Raised when the assembled file does not match the declared SHA-256"""
+
+
+def session_dir(session):
+    return os.path.join(settings.UPLOAD_CHUNK_ROOT, str(session.id))
+
+
+def part_path(session, offset):
+    return os.path.join(session_dir(session), f'{offset:020d}.part')
+
+
+def list_parts(session):
+    """Return ``[(offset, length), ...]`` for every stored chunk, sorted by offset"""
+    directory = session_dir(session)
+    if not os.path.isdir(directory):
+        return []
+    parts = []
+    for name in os.listdir(directory):
+        if name.endswith('.part'):
+            parts.append((int(name[:-5]), os.path.getsize(os.path.join(directory, name))))
+    return sorted(parts)
+
+
+def received_ranges(parts):
+    """Merge adjacent parts into ``[start, end)`` ranges the client can resume from"""
+    ranges = []
+    for offset, length in parts:
+        if ranges and ranges[-1][1] == offset:
+            ranges[-1][1] = offset + length
+        else:
+            ranges.append([offset, offset + length])
+    return ranges
+
+
+def write_chunk(session, offset, stream, length):
+    """Copy exactly ``length`` bytes from ``stream`` into the part file for ``offset``"""
+    if offset < 0 or length <= 0 or offset + length > session.size:
+        raise ChunkError("Chunk lies outside the declared file size")
+    os.makedirs(session_dir(session), exist_ok=True)
+
+    final_path = part_path(session, offset)
+    temp_path = final_path + '.tmp'
+    remaining = length
+    with open(temp_path, 'wb') as part:
+        while remaining:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            part.write(data)
+            remaining -= len(data)
+    if remaining:
+        os.remove(temp_path)
+        raise ChunkError("Connection closed before the whole chunk arrived")
+    # Only complete chunks become visible, so a retry can simply resend
+    os.replace(temp_path, final_path)
+
+
+def copy_range(source, destination, count):
+    """Append ``count`` bytes of ``source`` to ``destination`` inside the kernel where possible"""
+    in_fd, out_fd = source.fileno(), destination.fileno()
+    copied = 0
+    try:
+        if hasattr(os, 'copy_file_range'):
+            while copied < count:
+                sent = os.copy_file_range(in_fd, out_fd, count - copied)
+                if sent == 0:
+                    break
+                copied += sent
+        else:
+            while copied < count:
+                sent = os.sendfile(out_fd, in_fd, copied, count - copied)
+                if sent == 0:
+                    break
+                copied += sent
+    except OSError:
+        # Cross-device or unsupported file systems fall back to a buffered copy
+        pass
+    if copied < count:
+        source.seek(copied)
+        destination.seek(0, os.SEEK_END)
+        shutil.copyfileobj(source, destination, READ_SIZE)
+        # Later parts write through the descriptor, so nothing may stay buffered
+        destination.flush()
+
+
+def assemble(session):
+    """
+    Concatenate the parts of ``session`` into one file and verify it.
+
+    Returns the path of the assembled file, which the caller owns.
+    """
+    parts = list_parts(session)
+    expected = 0
+    for offset, length in parts:
+        if offset != expected:
+            raise ChunkError(f"Missing or overlapping data at byte {expected}")
+        expected += length
+    if expected != session.size:
+        raise ChunkError(f"Received {expected} of {session.size} bytes")
+
+    assembled_path = os.path.join(session_dir(session), 'assembled')
+    with open(assembled_path, 'wb') as destination:
+        for offset, length in parts:
+            with open(part_path(session, offset), 'rb') as source:
+                copy_range(source, destination, length)
+
+    if session.checksum:
+        digest = hashlib.sha256()
+        with open(assembled_path, 'rb') as assembled:
+            for block in iter(lambda: assembled.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        if digest.hexdigest() != session.checksum.lower():
+            os.remove(assembled_path)
+            raise ChecksumMismatch("Checksum mismatch")
+
+    for offset, _ in parts:
+        os.remove(part_path(session, offset))
+    return assembled_path
+
+
+def discard(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from uploads.blobs import reconcile_ref_counts, sweep_blobs
+
+
+class Command(BaseCommand):
+    help = 'Delete attachment blobs that nothing has referenced for the grace period; meant to run from cron'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help='Only delete blobs unreferenced for at least this long')
+        parser.add_argument('--reconcile', action='store_true',
+                            help='Recount references from the attachment tables first')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+
+    def handle(self, *args, **options):
+        if options['reconcile']:
+            corrected = reconcile_ref_counts()
+            self.stdout.write(f'Corrected reference counts of {corrected} blobs')
+
+        deleted, freed = sweep_blobs(timedelta(hours=options['grace_hours']), dry_run=options['dry_run'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} blobs ({freed / 1024 / 1024:.1f} MB)'))
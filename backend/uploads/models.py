@@ -0,0 +1,50 @@
+import uuid
+
+from django.db import models
+from django.conf import settings
+
+
+class UploadSession(models.Model):
+    """A resumable, chunked upload of a single file"""
+    
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField()  # Expected size in bytes
+    checksum = models.CharField(max_length=64, blank=True)  # Expected SHA-256, hex encoded
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
+
+class Blob(models.Model):
+    """
+    A unique file stored once by ``ContentAddressedStorage``.
+    
+    ``ref_count`` is the number of attachment rows pointing at the blob; blobs
+    left at zero are removed by the ``sweep_blobs`` command.
+    """
+    name = models.CharField(max_length=255, unique=True)  # Storage path, derived from the digest
+    digest = models.CharField(max_length=64, db_index=True)  # SHA-256, hex encoded
+    size = models.PositiveBigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)  # Refreshed whenever an upload reuses the blob
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'last_used_at'], name='blob_sweep_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
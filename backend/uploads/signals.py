@@ -0,0 +1,21 @@
+from functools import partial
+
+from django.db.models.signals import post_init, post_save, post_delete
+
+from .blobs import tracked_fields, remember_blobs, count_saved_blobs, count_deleted_blobs
+
+
+def connect_blob_tracking():
+    """Keep blob reference counts in step with every model stored as blobs"""
+    fields_by_model = {}
+    for model, field in tracked_fields():
+        fields_by_model.setdefault(model, []).append(field)
+
+    for model, fields in fields_by_model.items():
+        label = model._meta.label_lower
+        post_init.connect(partial(remember_blobs, fields=fields), sender=model, weak=False,
+                          dispatch_uid=f'remember-blobs-{label}')
+        post_save.connect(partial(count_saved_blobs, fields=fields), sender=model, weak=False,
+                          dispatch_uid=f'count-saved-blobs-{label}')
+        post_delete.connect(partial(count_deleted_blobs, fields=fields), sender=model, weak=False,
+                            dispatch_uid=f'count-deleted-blobs-{label}')
@@ -0,0 +1,100 @@
+"""
+Content-addressed storage for attachments.
+
+Uploads are hashed while they are streamed to disk and stored under a name
+derived from their SHA-256, so the same PDF attached to a hundred courses
+occupies the disk once. Every stored file has a ``Blob`` row whose
+``ref_count`` tracks the attachment rows using it (see ``uploads.blobs``);
+files are never deleted through the storage, only by the ``sweep_blobs``
+garbage collector once nothing references them.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.storage import FileSystemStorage, storages
+from django.utils import timezone
+
+BLOB_DIR = 'blobs'
+COPY_SIZE = 64 * 1024
+
+
+def blob_name(digest, original_name):
+    # The extension is kept so the web server still sends the right Content-Type
+    extension = os.path.splitext(original_name)[1].lower()[:16]
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_DIR + '/')
+
+
+def attachment_storage():
+    return storages['attachments']
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that keeps one copy of each distinct file"""
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is chosen from the content in _save
+        return name
+
+    def _save(self, name, content):
+        temp_dir = self.path(os.path.join(BLOB_DIR, 'tmp'))
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with tempfile.NamedTemporaryFile(dir=temp_dir, delete=False) as temp:
+            for chunk in content.chunks(COPY_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                temp.write(chunk)
+        return self.adopt(temp.name, name, digest.hexdigest(), size)
+
+    def adopt(self, path, name, digest=None, size=None):
+        """
+        Move the local file at ``path`` into the store and return its blob name.
+        
+        The file is renamed, not copied, and simply removed when an identical
+        blob already exists.
+        """
+        from .models import Blob
+
+        if digest is None:
+            hasher = hashlib.sha256()
+            with open(path, 'rb') as source:
+                for block in iter(lambda: source.read(COPY_SIZE), b''):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+        if size is None:
+            size = os.path.getsize(path)
+
+        final_name = blob_name(digest, name)
+        destination = self.path(final_name)
+        blob, created = Blob.objects.get_or_create(name=final_name, defaults={'digest': digest, 'size': size})
+        if not created:
+            # Keeps the sweeper away from a blob that is about to be referenced again
+            Blob.objects.filter(pk=blob.pk).update(last_used_at=timezone.now())
+
+        if os.path.exists(destination):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.move(path, destination)
+            if self.file_permissions_mode is not None:
+                os.chmod(destination, self.file_permissions_mode)
+        return final_name
+
+    def delete(self, name):
+        # Other rows may share the file; unreferenced blobs are swept instead
+        if not is_blob(name):
+            super().delete(name)
+
+    def purge(self, name):
+        """Actually remove a blob from disk; only the sweeper calls this"""
+        super().delete(name)
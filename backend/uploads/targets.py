@@ -0,0 +1,110 @@
+"""
+Models a completed upload can be attached to.
+
+Each target names the model, the field holding the file, the parent object
+it hangs off and who may attach files to that parent. Attaching moves the
+assembled file into the field's ``upload_to`` directory with a rename when
+the storage is on the local file system, so large files are never copied;
+attachment storage takes the file over by content hash instead.
+"""
+
+import os
+import shutil
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+from assignments.models import Assignment, AssignmentFile, Submission, SubmissionFile
+from courses.models import Course, CourseResource
+from forum.models import ForumPost, ForumAttachment
+from messaging.models import Message, GroupMessage, MessageAttachment
+
+from .storage import ContentAddressedStorage
+
+ADMIN_ROLES = ['admin', 'admin_teacher']
+
+
+def teaches(user, course):
+    return user.role in ADMIN_ROLES or course.teacher_id == user.id
+
+
+class Target:
+    """Describes how to attach an upload to one kind of model"""
+
+    def __init__(self, model, parent_model, parent_field, can_attach, extra_fields=None):
+        self.model = model
+        self.parent_model = parent_model
+        self.parent_field = parent_field
+        self.can_attach = can_attach
+        self.extra_fields = extra_fields or (lambda session, data: {'title': data.get('title') or session.filename})
+
+    def get_parent(self, parent_id):
+        return self.parent_model.objects.filter(pk=parent_id).first()
+
+    def attach(self, session, assembled_path, parent, data):
+        instance = self.model(**{self.parent_field: parent}, **self.extra_fields(session, data))
+        field = self.model._meta.get_field('file')
+        name = field.generate_filename(instance, session.filename)
+        storage = field.storage
+
+        if isinstance(storage, ContentAddressedStorage):
+            # assemble() already verified the checksum, so it is the digest
+            name = storage.adopt(assembled_path, name, digest=session.checksum.lower() or None, size=session.size)
+        elif isinstance(storage, FileSystemStorage):
+            name = storage.get_available_name(name, max_length=field.max_length)
+            destination = storage.path(name)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            # A rename when both paths share a file system
+            shutil.move(assembled_path, destination)
+        else:
+            with open(assembled_path, 'rb') as assembled:
+                name = storage.save(name, File(assembled), max_length=field.max_length)
+            os.remove(assembled_path)
+
+        instance.file.name = name
+        instance.save()
+        return instance
+
+
+def attachment_fields(session, data):
+    return {
+        'filename': session.filename,
+        'file_type': session.content_type or 'application/octet-stream',
+        'size': session.size,
+    }
+
+
+TARGETS = {
+    'submission_file': Target(
+        SubmissionFile, Submission, 'submission',
+        lambda user, submission: submission.student_id == user.id,
+    ),
+    'assignment_file': Target(
+        AssignmentFile, Assignment, 'assignment',
+        lambda user, assignment: teaches(user, assignment.course),
+    ),
+    'course_resource': Target(
+        CourseResource, Course, 'course',
+        teaches,
+        lambda session, data: {
+            'title': data.get('title') or session.filename,
+            'description': data.get('description'),
+            'resource_type': data.get('resource_type') or 'Document',
+        },
+    ),
+    'forum_attachment': Target(
+        ForumAttachment, ForumPost, 'post',
+        lambda user, post: post.creator_id == user.id,
+        attachment_fields,
+    ),
+    'message_attachment': Target(
+        MessageAttachment, Message, 'message',
+        lambda user, message: message.sender_id == user.id,
+        attachment_fields,
+    ),
+    'group_message_attachment': Target(
+        MessageAttachment, GroupMessage, 'group_message',
+        lambda user, message: message.sender_id == user.id,
+        attachment_fields,
+    ),
+}
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from courses.models import Subject, Course, CourseResource
+from .blobs import reconcile_ref_counts, sweep_blobs
+from .models import UploadSession, Blob
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='uploads-tests-')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, UPLOAD_CHUNK_ROOT=os.path.join(MEDIA_ROOT, 'chunked_uploads'),
+                   UPLOAD_CHUNK_SIZE=4)
+class UploadTestCase(TestCase):
+    """Creates a teacher with one course and an authenticated client"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            email='teacher@example.com', password='pass', role='teacher', username='teacher'
+        )
+        self.course = Course.objects.create(
+            name='Intro', code='CS101', description='Basics',
+            subject=Subject.objects.create(name='Computing', category='Science'), teacher=self.teacher
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.content = b'hello chunked world'
+
+
+class ChunkedUploadTests(UploadTestCase):
+    """Chunks can arrive in any order, be resumed and are verified on completion"""
+
+    def start(self, checksum=None):
+        response = self.client.post(reverse('upload-create'), {
+            'filename': 'notes.txt',
+            'size': len(self.content),
+            'checksum': hashlib.sha256(self.content).hexdigest() if checksum is None else checksum,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def send(self, upload_id, offset, length=4):
+        data = self.content[offset:offset + length]
+        return self.client.put(
+            reverse('upload-detail', args=[upload_id]), data, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {offset}-{offset + len(data) - 1}/{len(self.content)}',
+        )
+
+    def complete(self, upload_id):
+        return self.client.post(reverse('upload-complete', args=[upload_id]), {
+            'target': 'course_resource', 'parent_id': self.course.id, 'title': 'Notes',
+        }, format='json')
+
+    def test_out_of_order_chunks_resume_and_attach(self):
+        upload_id = self.start()
+        for offset in (8, 0, 16):
+            self.assertEqual(self.send(upload_id, offset).status_code, 200)
+
+        # The client asks what arrived and fills in the gaps
+        response = self.client.get(reverse('upload-detail', args=[upload_id]))
+        self.assertEqual(response.data['received'], [[0, 4], [8, 12], [16, 19]])
+        self.assertEqual(self.complete(upload_id).status_code, 400)
+
+        for offset in (4, 12):
+            self.send(upload_id, offset)
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 201)
+
+        resource = CourseResource.objects.get(pk=response.data['object_id'])
+        self.assertEqual(resource.title, 'Notes')
+        with resource.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).status, 'complete')
+        self.assertFalse(os.path.exists(os.path.join(MEDIA_ROOT, 'chunked_uploads', upload_id)))
+
+    def test_checksum_mismatch_is_rejected(self):
+        upload_id = self.start(checksum='0' * 64)
+        for offset in range(0, len(self.content), 4):
+            self.send(upload_id, offset)
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['message'], 'Checksum mismatch')
+        self.assertFalse(CourseResource.objects.exists())
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).status, 'failed')
+
+    def test_malformed_checksum_is_refused_at_start(self):
+        for checksum in ('not-a-digest', 'a' * 63, 'g' * 64):
+            response = self.client.post(reverse('upload-create'), {
+                'filename': 'notes.txt', 'size': len(self.content), 'checksum': checksum,
+            }, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_malformed_or_unknown_parent_is_refused(self):
+        upload_id = self.start()
+        url = reverse('upload-complete', args=[upload_id])
+        for parent_id, expected in (('abc', 400), (None, 400), (self.course.id + 1000, 404)):
+            response = self.client.post(url, {'target': 'course_resource', 'parent_id': parent_id}, format='json')
+            self.assertEqual(response.status_code, expected)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).status, 'pending')
+
+    def test_oversized_chunk_and_foreign_target_are_refused(self):
+        upload_id = self.start()
+        self.assertEqual(self.send(upload_id, 0, length=8).status_code, 413)
+
+        other = User.objects.create_user(email='other@example.com', password='pass', role='teacher', username='other')
+        self.course.teacher = other
+        self.course.save()
+        for offset in range(0, len(self.content), 4):
+            self.send(upload_id, offset)
+        self.assertEqual(self.complete(upload_id).status_code, 403)
+
+
+class BlobStorageTests(UploadTestCase):
+    """Identical attachments share one blob that is swept once unreferenced"""
+
+    def add_resource(self, content=b'same pdf bytes'):
+        return CourseResource.objects.create(course=self.course, title='Slides', file=ContentFile(content, 'slides.PDF'))
+
+    def test_identical_files_are_stored_once(self):
+        first, second = self.add_resource(), self.add_resource()
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertTrue(first.file.name.startswith('blobs/') and first.file.name.endswith('.pdf'))
+
+        blob = Blob.objects.get()
+        self.assertEqual((blob.ref_count, blob.size), (2, len(b'same pdf bytes')))
+
+        # Replacing one file moves its reference to the new blob
+        second.file = ContentFile(b'other bytes', 'other.pdf')
+        second.save()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+
+        CourseResource.objects.filter(pk=first.pk).delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 0)
+
+    def test_sweep_removes_only_unreferenced_blobs(self):
+        kept, dropped = self.add_resource(b'kept'), self.add_resource(b'dropped')
+        dropped_path = dropped.file.path
+        dropped.delete()
+
+        # Nothing is old enough yet
+        self.assertEqual(sweep_blobs()[0], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sweep_blobs(grace=timedelta(0)), (1, len(b'dropped')))
+        self.assertFalse(os.path.exists(dropped_path))
+        self.assertTrue(os.path.exists(kept.file.path))
+        self.assertEqual(list(Blob.objects.values_list('name', flat=True)), [kept.file.name])
+
+    def test_reconcile_counts_rows_written_without_signals(self):
+        resource = self.add_resource()
+        CourseResource.objects.bulk_create([
+            CourseResource(course=self.course, title=f'Copy {i}', file=resource.file.name) for i in range(3)
+        ])
+        self.assertEqual(reconcile_ref_counts(), 1)
+        self.assertEqual(Blob.objects.get().ref_count, 4)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import UploadSessionCreateView, UploadSessionDetailView, UploadCompleteView
+
+urlpatterns = [
+    path('', UploadSessionCreateView.as_view(), name='upload-create'),
+    path('<uuid:pk>/', UploadSessionDetailView.as_view(), name='upload-detail'),
+    path('<uuid:pk>/complete/', UploadCompleteView.as_view(), name='upload-complete'),
+]
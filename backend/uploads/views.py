@@ -0,0 +1,153 @@
+import re
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import chunks
+from .models import UploadSession
+from .targets import TARGETS
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+CHECKSUM_RE = re.compile(r'^[0-9a-fA-F]{64}$')
+
+
+def session_data(session):
+    return {
+        'id': str(session.id),
+        'filename': session.filename,
+        'size': session.size,
+        'status': session.status,
+        'chunk_size': settings.UPLOAD_CHUNK_SIZE,
+        'received': chunks.received_ranges(chunks.list_parts(session)),
+    }
+
+
+class UploadSessionCreateView(APIView):
+    """View for starting a chunked upload"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        filename = request.data.get('filename')
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            size = 0
+        
+        if not filename or size <= 0:
+            return Response({"message": "filename and a positive size are required"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        if size > settings.UPLOAD_MAX_FILE_SIZE:
+            return Response({"message": "File is too large"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        checksum = request.data.get('checksum') or ''
+        if checksum and not (isinstance(checksum, str) and CHECKSUM_RE.match(checksum)):
+            return Response({"message": "checksum must be a hex-encoded SHA-256 digest"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        session = UploadSession.objects.create(
+            user=request.user,
+            filename=filename[:255],
+            content_type=(request.data.get('content_type') or '')[:100],
+            size=size,
+            checksum=checksum.lower(),
+        )
+        return Response(session_data(session), status=status.HTTP_201_CREATED)
+
+
+class UploadSessionDetailView(APIView):
+    """View for checking, uploading chunks to, and cancelling a chunked upload"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        return Response(session_data(session))
+    
+    def put(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        if session.status != 'pending':
+            return Response({"message": "This upload is no longer accepting chunks"}, 
+                           status=status.HTTP_409_CONFLICT)
+        
+        # Chunk position comes from Content-Range, or ?offset= with Content-Length
+        content_range = CONTENT_RANGE_RE.match(request.headers.get('Content-Range', ''))
+        try:
+            length = int(request.headers.get('Content-Length') or 0)
+            if content_range:
+                offset = int(content_range.group(1))
+                if int(content_range.group(2)) - offset + 1 != length:
+                    raise ValueError
+            else:
+                offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response({"message": "Invalid Content-Range or offset"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if length > settings.UPLOAD_CHUNK_SIZE:
+            return Response({"message": f"Chunks may be at most {settings.UPLOAD_CHUNK_SIZE} bytes"}, 
+                           status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        
+        try:
+            # Read the raw body stream; request.data would buffer and parse it
+            chunks.write_chunk(session, offset, request.stream, length)
+        except chunks.ChunkError as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(session_data(session))
+    
+    def delete(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        chunks.discard(session)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadCompleteView(APIView):
+    """View for assembling a chunked upload and attaching it to a model"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        if session.status != 'pending':
+            return Response({"message": "This upload has already been completed"}, 
+                           status=status.HTTP_409_CONFLICT)
+        
+        target = TARGETS.get(request.data.get('target'))
+        if target is None:
+            return Response({"message": f"target must be one of {', '.join(TARGETS)}"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        try:
+            parent_id = int(request.data.get('parent_id'))
+        except (TypeError, ValueError):
+            return Response({"message": "parent_id must be an object id"}, status=status.HTTP_400_BAD_REQUEST)
+        parent = target.get_parent(parent_id)
+        if parent is None:
+            return Response({"message": "Parent object not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not target.can_attach(request.user, parent):
+            return Response({"message": "You don't have permission to attach files here"}, 
+                           status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            assembled_path = chunks.assemble(session)
+        except chunks.ChecksumMismatch as error:
+            # The stored bytes are corrupt and cannot be resumed; start again
+            chunks.discard(session)
+            session.status = 'failed'
+            session.save(update_fields=['status', 'updated_at'])
+            return Response({"message": str(error), **session_data(session)}, status=status.HTTP_400_BAD_REQUEST)
+        except chunks.ChunkError as error:
+            return Response({"message": str(error), **session_data(session)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        instance = target.attach(session, assembled_path, parent, request.data)
+        chunks.discard(session)
+        session.status = 'complete'
+        session.save(update_fields=['status', 'updated_at'])
+        
+        return Response({
+            "id": str(session.id),
+            "target": request.data.get('target'),
+            "object_id": instance.pk,
+            "file": instance.file.url,
+        }, status=status.HTTP_201_CREATED)